@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+板块重叠分析模块
+把一个批次的成分股构造成稀疏的 板块×股票 关联矩阵，用一次稀疏矩阵乘积算出所有板块对的
+共同成分股数和Jaccard相似度，每个板块保留相似度最高的K个相关板块，
+结果写入 板块重叠 表（MySQL/SQLite）或 板块重叠_*.parquet
+依赖可选的numpy/scipy（pip install numpy scipy），未安装时 available() 返回False
+
+用法:
+  python3 analytics.py -B 2 -s csv -k 10
+  python3 analytics.py -B 2 -s mysql --batch 120 -k 20 --stocks 30
+"""
+
+import argparse
+import logging
+import sys
+from time import time
+from typing import NamedTuple
+
+from database import BOARD_CONFIGS
+
+try:
+    import numpy as np
+    import scipy.sparse as sp
+except ImportError:
+    np = None
+    sp = None
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+
+
+def available() -> bool:
+    """是否已安装numpy和scipy"""
+    return sp is not None
+
+
+class Incidence(NamedTuple):
+    """板块×股票关联矩阵"""
+    matrix: object          # scipy.sparse.csr_matrix，int32，行为板块、列为股票
+    boards: list[str]       # 行对应的板块名称
+    codes: list[str]        # 列对应的股票代码
+    names: list[str]        # 列对应的股票名称
+
+
+class OverlapPair(NamedTuple):
+    """一个板块与一个相关板块的重叠"""
+    board: str              # 板块名称
+    other: str              # 相关板块
+    shared: int             # 共同成分股数
+    jaccard: float          # 共同成分股数 / 两板块成分股并集
+    rank: int               # 在该板块的相关板块中的排名（从1开始）
+
+
+def incidence_matrix(previous: dict) -> Incidence:
+    """
+    构造关联矩阵（板块内重复的股票代码只计一次）
+
+    Args:
+        previous: {板块名称: {'stocks': StockTable, ...}}（load_previous_*的返回值）
+
+    Returns:
+        Incidence
+    """
+    if not available():
+        raise RuntimeError("板块重叠分析需要numpy和scipy，请执行: pip install numpy scipy")
+
+    boards = sorted(previous)
+    code_index: dict[str, int] = {}
+    names: list[str] = []
+    indptr = [0]
+    indices = []
+    for board in boards:
+        stocks = previous[board]['stocks']
+        for code, name in zip(stocks.codes, stocks.names):
+            column = code_index.get(code)
+            if column is None:
+                column = code_index[code] = len(names)
+                names.append(name)
+            indices.append(column)
+        indptr.append(len(indices))
+
+    matrix = sp.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(boards), len(names))
+    )
+    # 重复的代码在同一位置累加，压回0/1
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return Incidence(matrix, boards, list(code_index), names)
+
+
+def top_pairs(incidence: Incidence, top_k: int = DEFAULT_TOP_K, min_shared: int = 1) -> list[OverlapPair]:
+    """
+    每个板块相似度最高的K个相关板块
+
+    共同成分股数为 M·Mᵀ 的非对角元素，排序和截取前K个都在数组上完成
+
+    Args:
+        incidence: 关联矩阵
+        top_k: 每个板块保留的相关板块数
+        min_shared: 至少有多少只共同成分股才算相关
+
+    Returns:
+        按 (板块, 排名) 排序的OverlapPair列表
+    """
+    matrix = incidence.matrix
+    co = (matrix @ matrix.T).tocsr()
+    sizes = np.diff(matrix.indptr)
+
+    rows = np.repeat(np.arange(co.shape[0]), np.diff(co.indptr))
+    cols = co.indices
+    shared = co.data
+    keep = (rows != cols) & (shared >= min_shared)
+    rows, cols, shared = rows[keep], cols[keep], shared[keep]
+    jaccard = shared / (sizes[rows] + sizes[cols] - shared)
+
+    # 行内按相似度、共同成分股数降序，再按相关板块名称（列号）升序
+    order = np.lexsort((cols, -shared, -jaccard, rows))
+    rows, cols, shared, jaccard = rows[order], cols[order], shared[order], jaccard[order]
+    counts = np.bincount(rows, minlength=co.shape[0])
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(rows)) - starts[rows]
+    keep = rank < top_k
+
+    boards = incidence.boards
+    return [
+        OverlapPair(boards[row], boards[col], int(count), float(score), int(position) + 1)
+        for row, col, count, score, position in zip(
+            rows[keep].tolist(), cols[keep].tolist(), shared[keep].tolist(),
+            jaccard[keep].tolist(), rank[keep].tolist()
+        )
+    ]
+
+
+def top_stocks(incidence: Incidence, limit: int = 20) -> list[tuple[str, str, int]]:
+    """
+    所属板块最多的股票
+
+    Args:
+        incidence: 关联矩阵
+        limit: 返回数量
+
+    Returns:
+        [(股票代码, 股票名称, 所属板块数), ...]，按板块数降序
+    """
+    degrees = np.bincount(incidence.matrix.indices, minlength=incidence.matrix.shape[1])
+    order = np.lexsort((np.arange(len(degrees)), -degrees))[:limit]
+    return [(incidence.codes[i], incidence.names[i], int(degrees[i])) for i in order.tolist()]
+
+
+def write_parquet(path: str, pairs: list[OverlapPair]) -> None:
+    """
+    写入 板块重叠_*.parquet（先写.tmp再改名）
+
+    Args:
+        path: 输出路径
+        pairs: top_pairs的结果
+    """
+    from os import replace
+    import parquet_store
+
+    if not parquet_store.available():
+        raise RuntimeError("Parquet输出需要pyarrow，请执行: pip install pyarrow")
+    pa = parquet_store.pa
+    table = pa.table({
+        '板块名称': pa.array([pair.board for pair in pairs], type=pa.string()).dictionary_encode(),
+        '相关板块': pa.array([pair.other for pair in pairs], type=pa.string()).dictionary_encode(),
+        '共同成分股数': pa.array([pair.shared for pair in pairs], type=pa.int32()),
+        '相似度': pa.array([pair.jaccard for pair in pairs], type=pa.float64()),
+        '排名': pa.array([pair.rank for pair in pairs], type=pa.int16()),
+    })
+    parquet_store.pq.write_table(table, path + '.tmp', compression=parquet_store.DEFAULT_COMPRESSION)
+    replace(path + '.tmp', path)
+
+
+def analyze(previous: dict, top_k: int = DEFAULT_TOP_K, min_shared: int = 1) -> tuple[Incidence, list[OverlapPair]]:
+    """
+    构造关联矩阵并计算每个板块的前K个相关板块
+
+    Args:
+        previous: {板块名称: {'stocks': StockTable, ...}}
+        top_k: 每个板块保留的相关板块数
+        min_shared: 至少有多少只共同成分股才算相关
+
+    Returns:
+        (关联矩阵, 重叠列表)
+    """
+    start = time()
+    incidence = incidence_matrix(previous)
+    pairs = top_pairs(incidence, top_k, min_shared)
+    logger.info(
+        f"✓ 板块重叠: {len(incidence.boards)} 个板块 × {len(incidence.codes)} 只股票, "
+        f"{incidence.matrix.nnz} 条关系, {len(pairs)} 个相关板块对（{(time() - start) * 1000:.0f}ms）"
+    )
+    return incidence, pairs
+
+
+def main() -> None:
+    from encrypt import PATH, path_join, exists
+    from snapshot import DatabaseSource, CSVSource, ParquetSource
+    import toml
+
+    boards = list(BOARD_CONFIGS)
+    parser = argparse.ArgumentParser(description='板块重叠分析（共同成分股数、Jaccard相似度）')
+    parser.add_argument('-B', '--board-type', type=int, choices=[1, 2, 3], default=2,
+                        help='板块: 1=同花顺行业 2=概念 3=地域')
+    parser.add_argument('-s', '--source', type=str, choices=['mysql', 'sqlite', 'csv', 'parquet'], default='csv',
+                        help='数据来源（mysql/sqlite结果写入板块重叠表，csv/parquet写入批次目录的Parquet文件）')
+    parser.add_argument('-c', '--config', type=str, default='config.toml', help='配置文件（mysql/sqlite连接）')
+    parser.add_argument('--batch', type=str, help='批次ID（mysql/sqlite）或时间戳（csv/parquet），默认最近一次成功批次')
+    parser.add_argument('-k', '--top-k', type=int, default=DEFAULT_TOP_K, help='每个板块保留的相关板块数')
+    parser.add_argument('--min-shared', type=int, default=1, help='至少有多少只共同成分股才算相关')
+    parser.add_argument('--stocks', type=int, default=20, help='输出所属板块最多的前N只股票')
+    parser.add_argument('--dry-run', action='store_true', help='只输出统计，不写入')
+    args = parser.parse_args()
+
+    if not available():
+        logger.error("板块重叠分析需要numpy和scipy，请执行: pip install numpy scipy")
+        sys.exit(1)
+
+    board_type = boards[args.board_type - 1]
+    config = {}
+    if exists(path_join(PATH, args.config)):
+        with open(path_join(PATH, args.config), 'r', encoding='utf-8') as f:
+            config = toml.load(f)
+
+    db = None
+    result_dir = path_join(PATH, 'result')
+    if args.source == 'mysql':
+        from database import Database
+        db = Database(config.get('database', {}), board_type)
+        source = DatabaseSource(db)
+    elif args.source == 'sqlite':
+        from sqlite_database import SQLiteDatabase
+        sqlite_config = dict(config.get('sqlite', {}))
+        sqlite_config['dir'] = path_join(PATH, sqlite_config.get('dir', 'sqlite'))
+        db = SQLiteDatabase(sqlite_config, board_type)
+        source = DatabaseSource(db)
+    elif args.source == 'parquet':
+        source = ParquetSource(board_type, result_dir)
+    else:
+        source = CSVSource(board_type, result_dir)
+
+    try:
+        version = args.batch if args.batch is not None else source.latest_version()
+        if db is not None and version is not None:
+            version = int(version)
+        previous = source.load(version) if version is not None else None
+        if not previous:
+            logger.error(f"没有可用的批次: {source}")
+            sys.exit(1)
+
+        incidence, pairs = analyze(previous, args.top_k, args.min_shared)
+        for code, name, degree in top_stocks(incidence, args.stocks):
+            print(f'{code} {name}: {degree} 个板块')
+
+        if args.dry_run:
+            return
+        if db is not None:
+            db.replace_board_overlaps(version, pairs)
+        else:
+            path = path_join(result_dir, BOARD_CONFIGS[board_type]['database'], version[:8], f'板块重叠_{version}.parquet')
+            write_parquet(path, pairs)
+            logger.info(f"✓ 板块重叠已保存: {path}")
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
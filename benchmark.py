@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+各子命令对比优化前后的实现，输出表格结果
+
+用法:
+  python3 benchmark.py js -n 2000 -T 8
+  python3 benchmark.py parse [-f fixtures/ | --synthetic]
+  python3 benchmark.py e2e -E thread -H 32 --latency 0.05 --redirect-rate 0.01
+  python3 benchmark.py db -n 50000 --board 概念
+  python3 benchmark.py records --boards 1000 --stocks 100
+  python3 benchmark.py overlap --boards 400 --universe 5000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from os import devnull, sep, walk
+from os.path import relpath
+from re import compile
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from urllib.request import urlopen
+
+from tabulate import tabulate
+
+from encrypt import PATH, path_join, exists
+
+
+def _timed_calls(fn, calls: int, threads: int) -> float:
+    """
+    用指定线程数执行calls次fn
+
+    Returns:
+        总耗时（秒）
+    """
+    start = perf_counter()
+    if threads == 1:
+        for _ in range(calls):
+            fn()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for _ in executor.map(lambda _: fn(), range(calls)):
+                pass
+    return perf_counter() - start
+
+
+def bench_js(args) -> None:
+    """v参数生成：execjs逐次启动进程 vs 常驻Node进程池"""
+    from v_runtime import ExecJSVRuntime, NodeVRuntime
+
+    js_path = path_join(PATH, 'v_new.js')
+    rows = []
+
+    legacy = ExecJSVRuntime(js_path)
+    elapsed = _timed_calls(legacy.get_v, args.execjs_calls, 1)
+    rows.append(['execjs（原实现）', args.execjs_calls, 1, f'{elapsed:.2f}', f'{args.execjs_calls / elapsed:.1f}'])
+
+    for threads in sorted({1, args.threads}):
+        runtime = NodeVRuntime(js_path, size=max(1, min(threads, args.workers)))
+        try:
+            elapsed = _timed_calls(runtime.get_v, args.calls, threads)
+        finally:
+            runtime.close()
+        rows.append([f'常驻Node×{runtime.size}', args.calls, threads, f'{elapsed:.2f}', f'{args.calls / elapsed:.1f}'])
+
+    print(tabulate(rows, headers=['运行时', '调用次数', '线程数', '耗时(秒)', '次/秒']))
+
+
+# 原正则解析链（对照组）
+tbody_pattern = compile(r'<tbody>([\w\W]+?)</tbody>')
+tr_pattern = compile(r'<tr>([\w\W]+?)</tr>')
+date_pattern = compile(r'<td>([0-9-]{10})</td>')
+link_pattern = compile(r'<td>.+?href="(.+?)".+?>(.+?)</a></td>')
+total_pattern = compile(r'</td>[\w\W]+?<td>([0-9]+?)</td>')
+seq_pattern = compile(r'<td>([0-9]+?)</td>[\w\W]+?_blank')
+code_name = compile(r'<td>.+?_blank">(.+?)</a>')
+
+
+def regex_index_rows(html: str) -> list[tuple]:
+    """原store_index_rows的正则解析"""
+    rows = []
+    tbody = tbody_pattern.findall(html)
+    if len(tbody) != 1:
+        return rows
+    for td in tr_pattern.findall(tbody[0]):
+        link = link_pattern.findall(td)
+        if len(link) == 0: continue
+        date = date_pattern.findall(td)
+        pages = total_pattern.findall(td)
+        rows.append((
+            date[0] if len(date) == 1 else '--',
+            link[0][1],
+            link[0][0],
+            link[1][1] if len(link) == 2 else '--',
+            pages[0] if len(pages) == 1 else '--'
+        ))
+    return rows
+
+
+def regex_code_rows(html: str) -> list[tuple]:
+    """原parse_code_rows的正则解析"""
+    rows = []
+    tbody = tbody_pattern.findall(html)
+    if len(tbody) == 0:
+        return rows
+    for td in tr_pattern.findall(tbody[0]):
+        c_name = code_name.findall(td)
+        if len(c_name) < 2: continue
+        seq_results = seq_pattern.findall(td)
+        if not seq_results: continue
+        rows.append((seq_results[0], c_name[0], c_name[1]))
+    return rows
+
+
+def synthetic_pages(count: int) -> tuple[list[bytes], list[bytes]]:
+    """
+    生成与10jqka结构一致的GBK列表页/详情页（--synthetic时使用）
+
+    Returns:
+        (列表页, 详情页)
+    """
+    index_pages = []
+    detail_pages = []
+    for page in range(count):
+        rows = []
+        for i in range(50):
+            code = 300000 + page * 100 + i
+            rows.append(
+                f'<tr>\n<td>2025-11-{i % 28 + 1:02d}</td>\n'
+                f'<td><a href="http://q.10jqka.com.cn/gn/detail/code/{code}/" target="_blank">概念板块{page}_{i}</a></td>\n'
+                f'<td><a href="http://news.10jqka.com.cn/20251123/c{code}.shtml" target="_blank">驱动事件说明{code}</a></td>\n'
+                f'<td><a href="http://stockpage.10jqka.com.cn/600000/" target="_blank">浦发银行</a></td>\n'
+                f'<td>{20 + i}</td>\n</tr>'
+            )
+        index_pages.append((
+            '<table class="m-table m-pager-table"><thead><tr><th>日期</th><th>概念名称</th>'
+            '<th>驱动事件</th><th>龙头股</th><th>成分股数量</th></tr></thead>\n<tbody>\n'
+            + '\n'.join(rows) +
+            f'\n</tbody></table>\n<div class="m-pager" id="m-page"><span class="page_info">{page + 1}/{count}</span></div>'
+        ).encode('gbk'))
+
+        rows = []
+        for i in range(20):
+            code = f'{600000 + page * 20 + i:06d}'
+            rows.append(
+                f'<tr>\n<td>{page * 20 + i + 1}</td>\n'
+                f'<td><a href="http://stockpage.10jqka.com.cn/{code}/" target="_blank">{code}</a></td>\n'
+                f'<td><a href="http://stockpage.10jqka.com.cn/{code}" target="_blank">股票名称{code}</a></td>\n'
+                '<td class="c-rise">10.25</td>\n<td class="c-rise">1.23</td>\n<td class="c-rise">0.12</td>\n'
+                '<td>1.05</td>\n<td>2.31</td>\n<td>0.87</td>\n<td>12.3亿</td>\n<td>45.6亿</td>\n<td>23.45</td>\n'
+                f'<td><a class="j_addStock" title="加自选" href="javascript:void(0);">'
+                f'<img src="http://i.thsi.cn/images/q/plus_logo.png" alt=""></a></td>\n</tr>'
+            )
+        detail_pages.append((
+            '<table class="m-table m-pager-table"><thead><tr><th>序号</th><th>代码</th><th>名称</th></tr></thead>\n'
+            '<tbody>\n' + '\n'.join(rows) + '\n</tbody></table>\n'
+            f'<div class="m-pager" id="m-page"><span class="page_info">{page + 1}/{count}</span></div>'
+        ).encode('gbk'))
+    return index_pages, detail_pages
+
+
+def load_fixture_pages(folder: str) -> tuple[list[tuple[str, bytes]], list[tuple[str, bytes]]]:
+    """
+    读取保存的GBK页面：replay.Recorder的目录结构（<url_type>/index/<页码>.html、
+    <url_type>/detail/<代码>/<页码>.html），或文件名为index*.html/detail*.html的平铺目录
+
+    Returns:
+        (列表页, 详情页)，每项为 (相对路径, 页面内容)
+    """
+    index_pages = []
+    detail_pages = []
+    for root, dirs, files in walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith('.html'):
+                continue
+            path = path_join(root, name)
+            parts = relpath(path, folder).split(sep)
+            if 'index' in parts[:-1] or name.startswith('index'):
+                pages = index_pages
+            elif 'detail' in parts[:-1] or name.startswith('detail'):
+                pages = detail_pages
+            else:
+                continue
+            with open(path, 'rb') as f:
+                pages.append(('/'.join(parts), f.read()))
+    return index_pages, detail_pages
+
+
+def _parse_rate(parse, pages: list[bytes], repeat: int) -> tuple[float, int, list]:
+    """
+    重复解析全部页面（含GBK解码）
+
+    Returns:
+        (耗时秒数, 行数, 最后一轮的解析结果)
+    """
+    rows = []
+    start = perf_counter()
+    for _ in range(repeat):
+        rows = [parse(page.decode('gbk', errors='ignore')) for page in pages]
+    elapsed = perf_counter() - start
+    return elapsed, sum(len(r) for r in rows) * repeat, rows
+
+
+def bench_parse(args) -> None:
+    """表格解析：正则链 vs 单遍扫描（默认使用fixtures/中保存的页面，逐页核对两者结果）"""
+    from table_parser import parse_index_rows, parse_code_rows
+
+    if args.synthetic:
+        index_pages, detail_pages = (
+            [(f'模拟页面{i + 1}', page) for i, page in enumerate(pages)] for pages in synthetic_pages(args.pages)
+        )
+    else:
+        if not exists(args.fixtures):
+            raise FileNotFoundError(f"页面目录不存在: {args.fixtures}（可用 main.py --record 录制，或加 --synthetic）")
+        index_pages, detail_pages = load_fixture_pages(args.fixtures)
+
+    rows = []
+    mismatched = []
+    for kind, pages, legacy, parser in (
+        ('列表页', index_pages, regex_index_rows, lambda html: parse_index_rows(html) or []),
+        ('详情页', detail_pages, regex_code_rows, parse_code_rows)
+    ):
+        if not pages:
+            continue
+        contents = [content for _, content in pages]
+        legacy_time, count, legacy_rows = _parse_rate(legacy, contents, args.repeat)
+        parser_time, _, parser_rows = _parse_rate(parser, contents, args.repeat)
+        bad = [
+            name for (name, _), expected, actual in zip(pages, legacy_rows, parser_rows)
+            if [tuple(r) for r in actual] != expected
+        ]
+        mismatched.extend(bad)
+        rows.append([
+            kind, len(pages), count,
+            f'{count / legacy_time:,.0f}', f'{count / parser_time:,.0f}',
+            f'{legacy_time / parser_time:.2f}x', '一致' if not bad else f'{len(bad)} 页不一致'
+        ])
+
+    print(tabulate(rows, headers=['页面', '页数', '行数', '正则 行/秒', '单遍 行/秒', '加速比', '结果']))
+    if mismatched:
+        print(f'与原正则解析结果不一致的页面: {", ".join(mismatched)}')
+        sys.exit(1)
+
+
+class _ReplayCookies:
+    """回放测试用的cookies对象：真实生成v值，重新登录直接返回固定cookies"""
+
+    def __init__(self, v_workers: int, v_pool_size: int):
+        from v_runtime import create_v_runtime, VTokenPool
+
+        self.v_runtime = create_v_runtime(path_join(PATH, 'v_new.js'), v_workers)
+        self.v_pool = VTokenPool(self.v_runtime, v_pool_size) if v_pool_size > 0 else None
+
+    def get_v(self, generate: bool = True) -> str | None:
+        if self.v_pool:
+            return self.v_pool.get(generate)
+        return self.v_runtime.get_v() if generate else None
+
+    def v_stats(self) -> dict:
+        return self.v_pool.stats() if self.v_pool else {}
+
+    def get_cookies(self) -> dict:
+        return {'replay': '1'}
+
+    def close(self) -> None:
+        if self.v_pool:
+            self.v_pool.close()
+        self.v_runtime.close()
+
+
+def _start_replay_server(args) -> tuple[subprocess.Popen, str]:
+    """
+    在子进程中启动replay.py回放服务器（不占用被测进程的GIL和内存）
+
+    Returns:
+        (进程, 服务地址)
+    """
+    command = [
+        sys.executable, path_join(PATH, 'replay.py'), 'serve', '-p', '0',
+        '--boards', str(args.boards), '--stocks', str(args.stocks),
+        '--latency', str(args.latency), '--jitter', str(args.jitter),
+        '--redirect-rate', str(args.redirect_rate), '--forbidden-rate', str(args.forbidden_rate),
+        '--rate-limit', str(args.rate_limit)
+    ]
+    if args.recordings:
+        command += ['-r', args.recordings]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return process, process.stdout.readline().strip()
+
+
+def bench_e2e(args) -> None:
+    """完整fetch_pages流程对本地回放服务器的吞吐"""
+    import main
+    from rate_controller import RateController
+    from worker_pool import WorkerPool
+
+    server, server_url = _start_replay_server(args)
+    if not server_url:
+        server.kill()
+        raise RuntimeError('回放服务器启动失败')
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    def observe(url, status, content, elapsed):
+        latencies.append(elapsed)
+        statuses[status] = statuses.get(status, 0) + 1
+
+    cookies = _ReplayCookies(args.v_workers, args.v_pool_size)
+    try:
+        with TemporaryDirectory() as tmp:
+            # 输出（CSV、cookies.json）写到临时目录
+            main.PATH = tmp
+            main.base_url = server_url
+            main.cookies_obj = cookies
+            main.storage_mode = 'csv'
+            main.engine = args.engine
+            main.thread_count = args.threads
+            main.async_concurrency = args.concurrency
+            main.interval = args.interval
+            main.rate_controller = RateController(args.rate, max_rate=args.max_rate)
+            if args.engine == 'thread':
+                main.worker_pool = WorkerPool(args.threads)
+            main.request_observers.append(observe)
+
+            config = {'scraper': {'enable_csv_backup': True}}
+            start = perf_counter()
+            with open(devnull, 'w') as null, redirect_stdout(null):
+                if args.sequential:
+                    # 原方式：各板块类型依次抓取
+                    states = [main.fetch_pages(board_type, config) for board_type in args.board_type]
+                else:
+                    states = main.crawl_boards(args.board_type, config)
+            elapsed = perf_counter() - start
+            boards = sum(state.writer.boards for state in states)
+            stocks = sum(state.writer.stocks for state in states)
+            failed = sum(len(state.failed_items) for state in states)
+    finally:
+        if main.worker_pool:
+            main.worker_pool.shutdown(wait=False)
+        cookies.close()
+        with urlopen(f'{server_url}/__stats') as resp:
+            server_stats = json.loads(resp.read())
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    # Linux下ru_maxrss单位为KB
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    rows = [
+        ['引擎', f'{args.engine}（{args.threads if args.engine == "thread" else args.concurrency} 并发）'],
+        ['板块类型', f'{", ".join(args.board_type)}（{"依次" if args.sequential else "同时"}抓取）'],
+        ['板块 / 成分股', f'{boards} / {stocks}'],
+        ['抓取失败的板块', f'{failed}（只写入板块信息）' if failed else '0'],
+        ['耗时(秒)', f'{elapsed:.2f}'],
+        ['板块/秒', f'{boards / elapsed:.1f}'],
+        ['请求/秒', f'{len(latencies) / elapsed:.1f}'],
+        ['请求数', f'{len(latencies)}（{", ".join(f"{k}×{v}" for k, v in sorted(statuses.items()))}）'],
+        ['延迟 p50 / p95 (ms)', f'{p50 * 1000:.1f} / {p95 * 1000:.1f}'],
+        ['峰值RSS (MB)', f'{peak_rss:.1f}'],
+        ['收敛速率(次/秒)', f'{main.rate_controller.rate:.2f}'],
+        ['服务端统计', ', '.join(f'{k}={v}' for k, v in server_stats.items())]
+    ]
+    print(tabulate(rows, headers=['指标', '值']))
+
+
+def bench_db(args) -> None:
+    """成分股插入：executemany vs 多行INSERT vs LOAD DATA LOCAL INFILE（本地MySQL/MariaDB）"""
+    import toml
+    from database import Database
+
+    config = {}
+    config_file = path_join(PATH, args.config)
+    if exists(config_file):
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = toml.load(f).get('database', {})
+    for key in ('host', 'port', 'user', 'password'):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    config.setdefault('host', 'localhost')
+    config.setdefault('port', 3306)
+    config['stock_insert_mode'] = 'auto'
+    config['insert_chunk_size'] = args.chunk_size
+
+    stocks = [
+        {
+            'board_name': f'基准板块{i // 50}',
+            'stock_code': f'{600000 + i % 4000:06d}',
+            'stock_name': f'股票{i % 4000}',
+            'sequence_num': i % 50 + 1
+        }
+        for i in range(args.rows)
+    ]
+
+    db = Database(config, args.board)
+    rows = []
+    try:
+        for mode in ('executemany', 'multirow', 'load_data'):
+            # 每种方式写入独立批次，测完删除（外键级联删除成分股）
+            batch_id = db.create_batch()
+            try:
+                start = perf_counter()
+                with db.transaction():
+                    db.insert_stocks(batch_id, stocks, mode=mode)
+                elapsed = perf_counter() - start
+                actual = mode if mode != 'load_data' or db._load_data_available else 'multirow（LOCAL INFILE不可用）'
+                rows.append([actual, args.rows, f'{elapsed:.2f}', f'{args.rows / elapsed:,.0f}'])
+            finally:
+                db.delete_batch_data(batch_id)
+    finally:
+        db.close()
+
+    print(tabulate(rows, headers=['插入方式', '行数', '耗时(秒)', '行/秒']))
+
+
+def _legacy_board_data(boards: int, stocks: int, universe: int) -> dict:
+    """原board_data结构：[日期, 来源链接, 驱动事件, 成分股数量, [[序号, 代码, 名称], ...]]"""
+    board_data = {}
+    for b in range(boards):
+        board_data[f'基准板块{b}'] = [
+            '2025-11-23', f'http://q.10jqka.com.cn/gn/detail/code/{300000 + b}/', '--', str(stocks),
+            [[str(i + 1), f'{600000 + (b * 7 + i) % universe:06d}', f'股票{(b * 7 + i) % universe}']
+             for i in range(stocks)]
+        ]
+    return board_data
+
+
+def _record_board_data(boards: int, stocks: int, universe: int) -> dict:
+    """BoardRecord + StockTable（解析结果同样是每行新建的字符串）"""
+    from records import BoardRecord, StockTable
+
+    board_data = {}
+    for b in range(boards):
+        board_data[f'基准板块{b}'] = (
+            BoardRecord('2025-11-23', f'http://q.10jqka.com.cn/gn/detail/code/{300000 + b}/', None, stocks),
+            StockTable.from_rows(
+                (str(i + 1), f'{600000 + (b * 7 + i) % universe:06d}', f'股票{(b * 7 + i) % universe}')
+                for i in range(stocks)
+            )
+        )
+    return board_data
+
+
+def _traced(fn):
+    """
+    执行fn并统计内存
+
+    Returns:
+        (返回值, 保留的内存字节数, 峰值字节数, 耗时秒数)
+    """
+    tracemalloc.start()
+    start = perf_counter()
+    result = fn()
+    elapsed = perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def bench_records(args) -> None:
+    """板块数据结构：位置列表+成分股字符串列表 vs BoardRecord+StockTable（内存和转换为插入行的耗时）"""
+    from records import MISSING_SEQ
+
+    def legacy_rows(board_data):
+        # 原save_to_mysql：先构造字典，insert_stocks再转成元组
+        stock_rows = []
+        for name, value in board_data.items():
+            for stock in value[4]:
+                stock_rows.append({
+                    'board_name': name, 'sequence_num': stock[0], 'stock_code': stock[1], 'stock_name': stock[2]
+                })
+        return [(1, s['board_name'], s['stock_code'], s['stock_name'], s.get('sequence_num')) for s in stock_rows]
+
+    def record_rows(board_data):
+        # MySQLSink + insert_stock_rows：直接生成元组
+        stock_rows = []
+        for name, (_, table) in board_data.items():
+            stock_rows.extend(
+                (name, code, stock_name, None if seq == MISSING_SEQ else seq) for seq, code, stock_name in table
+            )
+        return [(1, name, code, stock_name, seq) for name, code, stock_name, seq in stock_rows]
+
+    rows = []
+    for label, build, convert in (
+        ('位置列表（原实现）', _legacy_board_data, legacy_rows),
+        ('BoardRecord+StockTable', _record_board_data, record_rows)
+    ):
+        board_data, held, peak, build_time = _traced(lambda: build(args.boards, args.stocks, args.universe))
+        convert_time = min(_traced(lambda: convert(board_data))[3] for _ in range(args.repeat))
+        rows.append([
+            label, args.boards * args.stocks, f'{held / 1048576:.1f}', f'{peak / 1048576:.1f}',
+            f'{build_time:.2f}', f'{convert_time * 1000:.0f}'
+        ])
+        del board_data
+
+    print(tabulate(rows, headers=['结构', '成分股行数', '保留内存(MB)', '峰值内存(MB)', '构造耗时(秒)', '转为插入行(ms)']))
+
+
+def _overlap_batch(boards: int, universe: int, max_stocks: int, seed: int) -> dict:
+    """随机生成一个批次（成分股数在10~max_stocks之间，热门股票被更多板块包含）"""
+    import random
+    from records import StockTable
+
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) ** 0.6 for i in range(universe)]
+    previous = {}
+    for b in range(boards):
+        picked = set(rng.choices(range(universe), weights, k=rng.randint(10, max_stocks)))
+        previous[f'基准板块{b}'] = {'stocks': StockTable.from_rows(
+            (i + 1, f'{600000 + code:06d}', f'股票{code}') for i, code in enumerate(sorted(picked))
+        )}
+    return previous
+
+
+def bench_overlap(args) -> None:
+    """板块重叠：集合两两求交的双重循环 vs 稀疏矩阵乘积"""
+    import analytics
+
+    if not analytics.available():
+        print('需要numpy和scipy: pip install numpy scipy')
+        sys.exit(1)
+    previous = _overlap_batch(args.boards, args.universe, args.max_stocks, args.seed)
+
+    def naive():
+        # 逐对求交集，再对每个板块排序取前K个
+        sets = {name: set(entry['stocks'].codes) for name, entry in previous.items()}
+        names = sorted(sets)
+        pairs = []
+        for board in names:
+            candidates = []
+            for other in names:
+                if other == board:
+                    continue
+                shared = len(sets[board] & sets[other])
+                if shared:
+                    jaccard = shared / (len(sets[board]) + len(sets[other]) - shared)
+                    candidates.append((-jaccard, -shared, other))
+            candidates.sort()
+            pairs.extend(
+                (board, other, -shared, -jaccard, rank + 1)
+                for rank, (jaccard, shared, other) in enumerate(candidates[:args.top_k])
+            )
+        return pairs
+
+    def sparse():
+        return analytics.top_pairs(analytics.incidence_matrix(previous), args.top_k)
+
+    rows = []
+    results = []
+    for label, fn in (('集合双重循环（原方式）', naive), ('稀疏矩阵 M·Mᵀ', sparse)):
+        elapsed = []
+        for _ in range(args.repeat):
+            start = perf_counter()
+            result = fn()
+            elapsed.append(perf_counter() - start)
+        results.append([(p[0], p[1], p[2], round(p[3], 9), p[4]) for p in result])
+        rows.append([label, args.boards, len(result), f'{min(elapsed) * 1000:.0f}'])
+
+    same = '一致' if results[0] == results[1] else '不一致'
+    base = float(rows[0][3]) or 1
+    for row in rows:
+        row.append(f'{base / max(float(row[3]), 1):.1f}x')
+        row.append(same)
+    print(tabulate(rows, headers=['实现', '板块数', '相关板块对', '耗时(ms)', '加速比', '结果']))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='10jqka爬虫性能基准测试')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    js = subparsers.add_parser('js', help='v参数生成速度（execjs vs 常驻Node进程池）')
+    js.add_argument('-n', '--calls', type=int, default=2000, help='常驻进程池调用次数')
+    js.add_argument('-e', '--execjs-calls', type=int, default=20, help='execjs调用次数（较慢）')
+    js.add_argument('-T', '--threads', type=int, default=8, help='并发线程数')
+    js.add_argument('-w', '--workers', type=int, default=8, help='Node进程数上限')
+    js.set_defaults(func=bench_js)
+
+    parse = subparsers.add_parser('parse', help='表格解析速度（正则链 vs 单遍扫描）')
+    parse.add_argument('-f', '--fixtures', type=str, default=path_join(PATH, 'fixtures'),
+                       help='保存的GBK页面目录（--record的录制目录，或index*.html/detail*.html），默认fixtures/')
+    parse.add_argument('--synthetic', action='store_true', help='改用生成的模拟页面（-n指定页数）')
+    parse.add_argument('-n', '--pages', type=int, default=100, help='模拟页面数')
+    parse.add_argument('-r', '--repeat', type=int, default=20, help='重复次数')
+    parse.set_defaults(func=bench_parse)
+
+    from replay import add_server_arguments
+    e2e = subparsers.add_parser('e2e', help='完整fetch_pages流程对本地回放服务器的吞吐')
+    e2e.add_argument('-E', '--engine', type=str, choices=['thread', 'async'], default='thread', help='抓取引擎')
+    e2e.add_argument('-H', '--threads', type=int, default=16, help='thread引擎线程数')
+    e2e.add_argument('-C', '--concurrency', type=int, default=256, help='async引擎在途请求数上限')
+    e2e.add_argument('-b', '--interval', type=float, default=0.1, help='重试休眠基准（秒）')
+    e2e.add_argument('--rate', type=float, default=200, help='初始请求速率（次/秒）')
+    e2e.add_argument('--max-rate', type=float, default=2000, help='请求速率上限（次/秒）')
+    e2e.add_argument('--board-type', type=str, nargs='+', default=['概念'], choices=['同花顺行业', '概念', '地域'],
+                     help='板块类型（可多选，默认同时抓取）')
+    e2e.add_argument('--sequential', action='store_true', help='各板块类型依次抓取（对比同时抓取）')
+    e2e.add_argument('--v-workers', type=int, default=4, help='Node进程数')
+    e2e.add_argument('--v-pool-size', type=int, default=64, help='v值池容量（0为关闭）')
+    add_server_arguments(e2e)
+    e2e.set_defaults(func=bench_e2e)
+
+    db = subparsers.add_parser('db', help='成分股插入速度（executemany/multirow/load_data，需要本地MySQL）')
+    db.add_argument('-n', '--rows', type=int, default=50000, help='插入行数')
+    db.add_argument('--board', type=str, default='概念', choices=['同花顺行业', '概念', '地域'], help='写入的数据库（测完删除测试批次）')
+    db.add_argument('--chunk-size', type=int, default=1000, help='multirow每条语句的行数')
+    db.add_argument('-c', '--config', type=str, default='config.toml', help='读取[database]连接配置')
+    db.add_argument('--host', type=str, help='覆盖配置的主机')
+    db.add_argument('--port', type=int, help='覆盖配置的端口')
+    db.add_argument('--user', type=str, help='覆盖配置的用户名')
+    db.add_argument('--password', type=str, help='覆盖配置的密码')
+    db.set_defaults(func=bench_db)
+
+    records = subparsers.add_parser('records', help='板块数据结构的内存占用和转换耗时（位置列表 vs BoardRecord/StockTable）')
+    records.add_argument('--boards', type=int, default=1000, help='板块数')
+    records.add_argument('--stocks', type=int, default=100, help='每个板块的成分股数')
+    records.add_argument('--universe', type=int, default=5000, help='不同股票的数量（各板块共享）')
+    records.add_argument('-r', '--repeat', type=int, default=3, help='转换重复次数（取最快）')
+    records.set_defaults(func=bench_records)
+
+    overlap = subparsers.add_parser('overlap', help='板块重叠计算（集合双重循环 vs 稀疏矩阵乘积，需要numpy/scipy）')
+    overlap.add_argument('--boards', type=int, default=400, help='板块数')
+    overlap.add_argument('--universe', type=int, default=5000, help='不同股票的数量')
+    overlap.add_argument('--max-stocks', type=int, default=300, help='每个板块的成分股数上限')
+    overlap.add_argument('-k', '--top-k', type=int, default=10, help='每个板块保留的相关板块数')
+    overlap.add_argument('--seed', type=int, default=1, help='随机种子')
+    overlap.add_argument('-r', '--repeat', type=int, default=3, help='重复次数（取最快）')
+    overlap.set_defaults(func=bench_overlap)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+板块流式写入模块
+每个板块抓取完成后立即交给写入线程，按批写入CSV和/或MySQL，
+内存只保留在途板块的成分股，运行中途崩溃时已完成的板块不会丢失
+"""
+
+import gzip
+import io
+import json
+import logging
+from csv import writer as csv_writer
+from datetime import datetime
+from hashlib import sha256
+from os import replace
+from os.path import basename, exists, getsize
+from queue import Queue, Empty
+from threading import Lock, Thread
+from time import monotonic
+from typing import Optional
+
+from records import MISSING_SEQ, BoardRecord, StockTable
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_BOARDS = 20
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 256
+DEFAULT_WRITER_THREADS = 1
+# 去重后的成分股数与列表页成分股数量的最大相对偏差
+DEFAULT_COUNT_TOLERANCE = 0.2
+# CSV压缩方式 -> 文件后缀
+CSV_SUFFIXES = {'none': '.csv', 'gzip': '.csv.gz', 'zstd': '.csv.zst'}
+
+
+class BatchIntegrity:
+    """
+    批次完整性校验（写入前在内存中逐个板块检查）
+
+    规则：
+    1. 每个板块都有成分股
+    2. 去重后的成分股数与列表页的成分股数量偏差不超过count_tolerance（数量未知时跳过）
+    3. 板块内股票代码不重复（重复的只统计，写入MySQL前去重）
+    """
+
+    def __init__(self, count_tolerance: float = DEFAULT_COUNT_TOLERANCE):
+        """
+        Args:
+            count_tolerance: 成分股数允许的相对偏差
+        """
+        self.count_tolerance = count_tolerance
+        self.empty: list[str] = []
+        self.mismatched: list[tuple[str, int, int]] = []   # (板块名称, 实际, 列表页)
+        self.duplicates = 0
+        self._lock = Lock()
+
+    @property
+    def failed(self) -> bool:
+        """是否已有板块违反规则1/2"""
+        return bool(self.empty or self.mismatched)
+
+    def check(self, name: str, info: BoardRecord, unique: Optional[int], total: int) -> bool:
+        """
+        检查一个板块
+
+        Args:
+            name: 板块名称
+            info: 列表页的板块信息
+            unique: 去重后的成分股数，板块抓取失败时为None
+            total: 去重前的成分股数
+
+        Returns:
+            是否通过
+        """
+        with self._lock:
+            self.duplicates += total - (unique or 0)
+            if not unique:
+                self.empty.append(name)
+                return False
+            expected = info.count
+            if expected:
+                if abs(unique - expected) > expected * self.count_tolerance:
+                    self.mismatched.append((name, unique, expected))
+                    return False
+        return True
+
+    def result(self) -> tuple[bool, Optional[str]]:
+        """
+        批次校验结果
+
+        Returns:
+            (is_valid, error_message)
+        """
+        errors = []
+        if self.empty:
+            msg = f"发现 {len(self.empty)} 个板块没有股票数据: {', '.join(self.empty[:5])}"
+            if len(self.empty) > 5:
+                msg += f" 等（共{len(self.empty)}个）"
+            errors.append(msg)
+        if self.mismatched:
+            samples = ', '.join(f'{name}({actual}/{expected})' for name, actual, expected in self.mismatched[:5])
+            msg = f"{len(self.mismatched)} 个板块成分股数与列表页数量不符: {samples}"
+            if len(self.mismatched) > 5:
+                msg += f" 等（共{len(self.mismatched)}个）"
+            errors.append(msg)
+        if errors:
+            return False, '；'.join(errors)
+        return True, None
+
+
+def csv_compression_available(compression: str) -> bool:
+    """压缩方式是否可用（zstd需要zstandard包）"""
+    return compression in CSV_SUFFIXES and (compression != 'zstd' or zstandard is not None)
+
+
+def open_csv(path: str):
+    """
+    按后缀打开（解压）CSV文件用于读取
+
+    Args:
+        path: .csv / .csv.gz / .csv.zst 文件路径
+
+    Returns:
+        文本文件对象
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("读取.csv.zst需要zstandard，请执行: pip install zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+class _HashingWriter(io.RawIOBase):
+    """写入磁盘的同时计算sha256和字节数（压缩后的文件内容）"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = sha256()
+        self.bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self.raw.write(data)
+
+    def flush(self) -> None:
+        self.raw.flush()
+
+
+class _CSVFile:
+    """一个流式写入的CSV文件（可选gzip/zstd压缩），记录行数和校验和"""
+
+    def __init__(self, path: str, header: list[str], compression: str, rows: int = 0):
+        """
+        Args:
+            path: 文件路径
+            header: 表头（新文件时写入）
+            compression: none/gzip/zstd
+            rows: 追加到已有文件时，已有的数据行数（来自上次的清单）
+        """
+        self.path = path
+        self.compression = compression
+        self.rows = rows
+
+        existing = exists(path) and getsize(path) > 0
+        if not existing:
+            self.rows = 0
+        self._raw = open(path, 'ab')
+        self._hashing = _HashingWriter(self._raw)
+        if existing:
+            # 追加到已有文件：校验和覆盖整个文件
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    self._hashing.sha256.update(chunk)
+                    self._hashing.bytes += len(chunk)
+
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._hashing, mode='wb')
+        elif compression == 'zstd':
+            self._stream = io.BufferedWriter(
+                zstandard.ZstdCompressor().stream_writer(self._hashing, closefd=False))
+        else:
+            self._stream = io.BufferedWriter(self._hashing)
+        self._text = io.TextIOWrapper(self._stream, encoding='utf-8', newline='')
+        self.writer = csv_writer(self._text)
+        if not existing:
+            self.writer.writerow(header)
+
+    def flush(self) -> None:
+        """把已写入的行压缩并刷新到磁盘（gzip/zstd同步刷新，已写部分可独立解压）"""
+        self._text.flush()
+        if self.compression == 'zstd':
+            self._stream.flush()
+            self._stream.raw.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._stream.flush()
+        self._raw.flush()
+
+    def close(self) -> dict:
+        """
+        关闭文件
+
+        Returns:
+            清单条目 {file, rows, bytes, sha256, compression}
+        """
+        self._text.close()
+        self._raw.close()
+        return {
+            'file': basename(self.path),
+            'rows': self.rows,
+            'bytes': self._hashing.bytes,
+            'sha256': self._hashing.sha256.hexdigest(),
+            'compression': self.compression,
+        }
+
+
+class CSVSink:
+    """流式写入 板块信息_*.csv / 成分股_*.csv（可选gzip/zstd压缩），关闭时写出清单"""
+
+    def __init__(self, info_path: str, code_path: str, compression: str = 'none',
+                 flush_interval: float = 0.0, manifest_path: str = None):
+        """
+        Args:
+            info_path: 板块信息CSV路径（后缀应与压缩方式对应，见CSV_SUFFIXES）
+            code_path: 成分股CSV路径
+            compression: none/gzip/zstd
+            flush_interval: 刷新到磁盘的最短间隔（秒），0为每批都刷新
+            manifest_path: 清单JSON路径（行数、字节数、sha256），不指定时不写
+        """
+        if not csv_compression_available(compression):
+            raise ValueError(f"不支持的CSV压缩方式: {compression}（zstd需要pip install zstandard）")
+        self.info_path = info_path
+        self.code_path = code_path
+        self.flush_interval = flush_interval
+        self.manifest_path = manifest_path
+        # 同一时间戳重复运行时追加写入，行数接着上次清单继续计
+        rows = {}
+        if manifest_path and exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                rows = {entry['file']: entry['rows'] for entry in json.load(f)['files']}
+        self._info = _CSVFile(info_path, ['日期', '板块名称', '来源链接', '驱动事件', '成分股量'], compression,
+                              rows.get(basename(info_path), 0))
+        self._code = _CSVFile(code_path, ['原始序号', '板块名称', '股票代码', '股票名称'], compression,
+                              rows.get(basename(code_path), 0))
+        self._last_flush = monotonic()
+        # 多个写入线程时串行写文件
+        self._lock = Lock()
+
+    def write(self, boards: list[tuple]) -> None:
+        """
+        写入一批板块，距上次刷新超过flush_interval时刷新到磁盘
+
+        Args:
+            boards: [(板块名称, BoardRecord, StockTable或None), ...]
+        """
+        with self._lock:
+            for name, info, stocks in boards:
+                self._info.writer.writerow([
+                    info.date, name, info.link,
+                    '--' if info.event is None else info.event,
+                    '--' if info.count is None else info.count
+                ])
+                self._info.rows += 1
+                if stocks:
+                    self._code.writer.writerows(
+                        ['' if seq == MISSING_SEQ else seq, name, code, stock_name]
+                        for seq, code, stock_name in stocks
+                    )
+                    self._code.rows += len(stocks)
+            if monotonic() - self._last_flush >= self.flush_interval:
+                self._info.flush()
+                self._code.flush()
+                self._last_flush = monotonic()
+
+    def close(self) -> None:
+        files = [self._info.close(), self._code.close()]
+        if self.manifest_path:
+            with open(self.manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'files': files},
+                          f, ensure_ascii=False, indent=2)
+            replace(self.manifest_path + '.tmp', self.manifest_path)
+        logger.info(f"✓ CSV保存成功: {self.info_path}（{files[0]['rows']} 个板块, {files[1]['rows']} 条成分股）")
+
+
+def verify_manifest(manifest_path: str) -> list[str]:
+    """
+    按清单校验CSV文件（每个文件只读一遍，计算字节数和sha256）
+
+    Args:
+        manifest_path: 清单JSON路径
+
+    Returns:
+        不一致的文件名列表，全部一致时为空
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    folder = manifest_path[:len(manifest_path) - len(basename(manifest_path))]
+    bad = []
+    for entry in manifest['files']:
+        digest = sha256()
+        size = 0
+        try:
+            with open(folder + entry['file'], 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+                    size += len(chunk)
+        except FileNotFoundError:
+            bad.append(entry['file'])
+            continue
+        if size != entry['bytes'] or digest.hexdigest() != entry['sha256']:
+            bad.append(entry['file'])
+    return bad
+
+
+class MySQLSink:
+    """按批写入 板块信息 / 成分股 表（每批一个事务，多个写入线程各自从连接池借出连接）"""
+
+    # 批次已确定无法通过完整性校验后不再写入
+    skip_when_invalid = True
+
+    def __init__(self, db, batch_id: int):
+        """
+        Args:
+            db: Database实例
+            batch_id: 批次ID
+        """
+        self.db = db
+        self.batch_id = batch_id
+
+    def write(self, boards: list[tuple]) -> None:
+        """
+        写入一批板块（板块内成分股按代码去重）
+
+        Args:
+            boards: [(板块名称, BoardRecord, StockTable或None), ...]
+        """
+        board_rows = []
+        stock_rows = []
+        for name, info, stocks in boards:
+            board_rows.append({
+                'board_name': name,
+                'source_url': info.link,
+                'driving_event': info.event,
+                'stock_count': info.count
+            })
+            if stocks:
+                stocks = stocks.deduped()
+                stock_rows.extend(
+                    (name, code, stock_name, None if seq == MISSING_SEQ else seq)
+                    for seq, code, stock_name in stocks
+                )
+
+        with self.db.transaction():
+            self.db.insert_boards(self.batch_id, board_rows)
+            self.db.insert_stock_rows(self.batch_id, stock_rows)
+
+    def close(self) -> None:
+        pass
+
+
+class BoardWriter:
+    """写入线程：从有界队列取出完成的板块，攒批后写入各个sink"""
+
+    def __init__(self, sinks: list, flush_boards: int = DEFAULT_FLUSH_BOARDS,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_pending: int = DEFAULT_MAX_PENDING,
+                 threads: int = DEFAULT_WRITER_THREADS, integrity: Optional[BatchIntegrity] = None):
+        """
+        启动写入线程
+
+        Args:
+            sinks: 写入目标（CSVSink/MySQLSink）
+            flush_boards: 攒够多少个板块写入一次
+            flush_interval: 最长多久写入一次（秒）
+            max_pending: 队列中等待写入的板块上限，满时put阻塞（背压）
+            threads: 写入线程数，各线程分别攒批并行写入（MySQL需要连接池有足够的连接）
+            integrity: 完整性校验，不指定时创建默认规则；有板块不通过后跳过skip_when_invalid的sink
+        """
+        self.sinks = sinks
+        self.integrity = integrity if integrity is not None else BatchIntegrity()
+        self.flush_boards = flush_boards
+        self.flush_interval = flush_interval
+
+        self.written: set[str] = set()
+        self.boards = 0
+        self.stocks = 0
+        self.error: Optional[BaseException] = None
+
+        self._queue: Queue = Queue(maxsize=max_pending)
+        self._lock = Lock()
+        self._closed = False
+        self._threads = [
+            Thread(target=self._run, name=f'board-writer-{i}', daemon=True)
+            for i in range(max(1, threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, name: str, info: BoardRecord, stocks: Optional[StockTable]) -> None:
+        """
+        提交一个板块
+
+        Args:
+            name: 板块名称
+            info: 列表页的板块信息
+            stocks: 成分股，板块抓取失败时为None（只写板块信息）
+        """
+        unique = len(set(stocks.codes)) if stocks else None
+        with self._lock:
+            if name in self.written:
+                return
+            self.written.add(name)
+            self.boards += 1
+            self.stocks += unique or 0
+        self.integrity.check(name, info, unique, len(stocks) if stocks else 0)
+        self._queue.put((name, info, stocks))
+
+    def _flush(self, batch: list[tuple]) -> None:
+        """写入一批（出错后只丢弃，避免生产者在满队列上阻塞）"""
+        if not batch or self.error is not None:
+            return
+        try:
+            for sink in self.sinks:
+                if self.integrity.failed and getattr(sink, 'skip_when_invalid', False):
+                    continue
+                sink.write(batch)
+        except Exception as e:
+            if self.error is None:
+                self.error = e
+            logger.error(f"板块写入失败: {e}")
+
+    def _run(self) -> None:
+        batch = []
+        deadline = monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - monotonic()))
+            except Empty:
+                item = False
+
+            if item is None:
+                self._flush(batch)
+                return
+            if item:
+                batch.append(item)
+            if len(batch) >= self.flush_boards or monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = monotonic() + self.flush_interval
+
+    def close(self) -> None:
+        """
+        写完队列中剩余的板块并关闭各sink
+
+        Raises:
+            写入过程中的第一个异常
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"关闭写入目标失败: {e}")
+        if self.error is not None:
+            raise self.error
@@ -3,27 +3,45 @@ from requests.utils import cookiejar_from_dict, dict_from_cookiejar
 from encrypt import get_id, rsa_enc, passwd_salt, md5, sha256, PATH, path_join, mkdir, exists, getpid
 from time import time
 from json import loads, dumps
-import execjs
+from v_runtime import create_v_runtime, VTokenPool, DEFAULT_V_WORKERS, DEFAULT_V_POOL_SIZE, DEFAULT_V_MAX_AGE
 import random
 import ddddocr
 
 class _10jqka_Cookies:
-    def __init__(self, session: Session, user: bytes, pwd: bytes) -> None:
-        self.js_ctx = None
+    def __init__(self, session: Session, user: bytes, pwd: bytes, v_workers: int = DEFAULT_V_WORKERS,
+                 v_pool_size: int = DEFAULT_V_POOL_SIZE, v_max_age: float = DEFAULT_V_MAX_AGE) -> None:
         self.user = user
         self.pwd = pwd
         self.session = session
 
-        with open(path_join(PATH, 'v_new.js'), 'r') as f:
-            self.js_ctx = execjs.compile(f.read())
+        # 常驻JS运行时，v_new.js只加载一次
+        self.v_runtime = create_v_runtime(path_join(PATH, 'v_new.js'), v_workers)
+        # 预生成v值池（v_pool_size为0时每次同步生成）
+        self.v_pool = VTokenPool(self.v_runtime, v_pool_size, v_max_age) if v_pool_size > 0 else None
 
         self.session.cookies.set('v', self.get_v())
         self.det = ddddocr.DdddOcr(ocr = False, det = False)
 
 
-    def get_v(self) -> str:
-        """生成v参数（反爬虫签名）"""
-        return self.js_ctx.call('get_v') # type: ignore
+    def get_v(self, generate: bool = True) -> str | None:
+        """
+        获取v参数（反爬虫签名），优先取预生成的值，可多线程并发调用
+
+        generate为False时只取预生成的值，需要同步生成时返回None（async引擎先不经线程直接取，取不到再进线程）
+        """
+        if self.v_pool:
+            return self.v_pool.get(generate)
+        return self.v_runtime.get_v() if generate else None
+
+    def v_stats(self) -> dict:
+        """v值池统计（未启用时为空）"""
+        return self.v_pool.stats() if self.v_pool else {}
+
+    def close(self) -> None:
+        """停止v值池并释放JS运行时进程"""
+        if self.v_pool:
+            self.v_pool.close()
+        self.v_runtime.close()
 
     def get_crnd(self):
         """生成16位随机字符串（crnd参数）"""
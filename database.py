@@ -10,6 +10,10 @@ import pymysql
 from pymysql.cursors import DictCursor
 from contextlib import contextmanager
 from datetime import datetime
+from os import unlink
+from tempfile import NamedTemporaryFile
+from threading import Condition, Lock, get_ident
+from time import monotonic
 from typing import List, Dict, Optional
 import logging
 
@@ -38,49 +42,92 @@ BOARD_CONFIGS = {
 }
 
 
-class Database:
-    """MySQL数据库操作类（支持多数据库）"""
+# 成分股存储方式：snapshot每批次写入完整成分股，interval只记录成员区间的开始和结束
+STOCK_STORAGE_MODES = ('snapshot', 'interval')
+# 成分股插入方式
+STOCK_INSERT_MODES = ('auto', 'executemany', 'multirow', 'load_data')
+# auto模式下行数达到该值时使用LOAD DATA LOCAL INFILE
+DEFAULT_BULK_THRESHOLD = 2000
+# multirow模式每条INSERT语句的行数
+DEFAULT_INSERT_CHUNK_SIZE = 1000
+# 服务端/客户端禁用LOCAL INFILE时的错误码
+LOCAL_INFILE_DISABLED_ERRORS = (1148, 2068, 3948)
 
-    def __init__(self, config: dict, board_type: str):
-        """
-        初始化数据库连接
 
+# 连接池默认参数（每个数据库）
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 4
+# 空闲超过该秒数的连接取出前先ping
+DEFAULT_POOL_PING_INTERVAL = 30
+# 连接全部被占用时等待的秒数
+DEFAULT_POOL_TIMEOUT = 30
+# 按批次分区时的最后一个分区（新批次从中拆出p<批次ID>）
+BATCH_PARTITION_MAX = 'p_max'
+
+
+def _tsv_field(value) -> str:
+    """转义为LOAD DATA默认格式的字段（NULL写作\\N）"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+class ConnectionPool:
+    """
+    线程安全的MySQL连接池
+    一个池服务同一MySQL服务器上的多个数据库（同花顺行业板块/概念板块/地域板块），
+    每个数据库单独计数：warm()预先建立min_size个连接，最多打开max_size个，归还的连接留作空闲复用
+    """
+
+    def __init__(self, config: dict, min_size: int = None, max_size: int = None,
+                 ping_interval: float = None, timeout: float = None):
+        """
         Args:
-            config: 数据库配置字典，包含host, port, user, password等
-            board_type: 板块类型（同花顺行业/概念/地域）
+            config: 数据库配置字典（host, port, user, password等），未指定的池参数读取
+                    pool_min_size / pool_max_size / pool_ping_interval / pool_timeout
+            min_size: 每个数据库预先建立的连接数
+            max_size: 每个数据库的最大连接数
+            ping_interval: 空闲超过该秒数的连接取出前先ping，失效则重建
+            timeout: 连接全部被占用时等待的秒数
         """
-        if board_type not in BOARD_CONFIGS:
-            raise ValueError(f"不支持的板块类型: {board_type}，必须是：{list(BOARD_CONFIGS.keys())}")
-
-        self.board_type = board_type
-        self.database_name = BOARD_CONFIGS[board_type]['database']
         self.config = config
-        self.connection = None
-        self._in_transaction = False
+        self.min_size = config.get('pool_min_size', DEFAULT_POOL_MIN_SIZE) if min_size is None else min_size
+        self.max_size = config.get('pool_max_size', DEFAULT_POOL_MAX_SIZE) if max_size is None else max_size
+        self.ping_interval = config.get('pool_ping_interval', DEFAULT_POOL_PING_INTERVAL) if ping_interval is None else ping_interval
+        self.timeout = config.get('pool_timeout', DEFAULT_POOL_TIMEOUT) if timeout is None else timeout
+        if self.max_size < 1 or self.min_size < 0 or self.min_size > self.max_size:
+            raise ValueError(f"连接池大小无效: min_size={self.min_size}, max_size={self.max_size}")
+        # LOAD DATA LOCAL INFILE需要客户端开启local_infile
+        self.local_infile = config.get('stock_insert_mode', 'auto') in ('auto', 'load_data')
 
-        # 建立数据库连接
-        self._connect()
+        self._idle: dict[str, list[tuple]] = {}   # 数据库 -> [(连接, 归还时间), ...]
+        self._opened: dict[str, int] = {}         # 数据库 -> 已打开连接数（空闲+借出）
+        self._owner: dict[int, str] = {}          # id(连接) -> 数据库
+        self._cond = Condition()
+        self._closed = False
 
-    def _connect(self):
-        """建立数据库连接"""
+    def _create(self, database: str):
+        """建立一个到指定数据库的连接"""
         try:
-            self.connection = pymysql.connect(
+            connection = pymysql.connect(
                 host=self.config.get('host', 'localhost'),
                 port=self.config.get('port', 3306),
                 user=self.config.get('user', 'root'),
                 password=self.config.get('password', ''),
-                database=self.database_name,
+                database=database,
                 charset=self.config.get('charset', 'utf8mb4'),
                 connect_timeout=self.config.get('connection_timeout', 5),
                 cursorclass=DictCursor,
-                autocommit=False  # 手动控制事务
+                autocommit=False,  # 手动控制事务
+                local_infile=self.local_infile
             )
-            logger.info(f"✓ MySQL连接成功: {self.config['host']}:{self.config['port']}/{self.database_name}")
+            logger.debug(f"新建MySQL连接: {self.config.get('host', 'localhost')}:{self.config.get('port', 3306)}/{database}")
+            return connection
 
         except pymysql.err.OperationalError as e:
             # 数据库不存在
             if e.args[0] == 1049:
-                logger.error(f"✗ 数据库 {self.database_name} 不存在，请先执行 init_databases.sql 初始化")
+                logger.error(f"✗ 数据库 {database} 不存在，请先执行 init_databases.sql 初始化")
                 raise Exception(f"数据库未初始化，请执行: mysql -u root -p < init_databases.sql")
             else:
                 logger.error(f"✗ MySQL连接失败: {e}")
@@ -90,6 +137,210 @@ class Database:
             logger.error(f"✗ MySQL连接失败: {e}")
             raise
 
+    def _healthy(self, connection, idle_since: float) -> bool:
+        """空闲较久的连接ping一次（不自动重连，失效的连接由调用方丢弃）"""
+        if monotonic() - idle_since < self.ping_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.warning(f"丢弃失效的MySQL连接: {e}")
+            return False
+
+    def _discard(self, database: str, connection) -> None:
+        """关闭连接并释放名额（调用方持有_cond）"""
+        self._opened[database] -= 1
+        self._owner.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self._cond.notify()
+
+    def warm(self, database: str) -> None:
+        """
+        预先建立min_size个空闲连接
+
+        Args:
+            database: 数据库名称
+        """
+        with self._cond:
+            while self._opened.get(database, 0) < self.min_size:
+                connection = self._create(database)
+                self._opened[database] = self._opened.get(database, 0) + 1
+                self._owner[id(connection)] = database
+                self._idle.setdefault(database, []).append((connection, monotonic()))
+
+    def acquire(self, database: str):
+        """
+        借出一个连接（优先复用空闲连接，达到max_size时等待归还）
+
+        Args:
+            database: 数据库名称
+
+        Returns:
+            pymysql连接
+
+        Raises:
+            TimeoutError: 等待超过timeout秒仍无可用连接
+        """
+        deadline = monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("连接池已关闭")
+                idle = self._idle.get(database)
+                while idle:
+                    connection, idle_since = idle.pop()
+                    if self._healthy(connection, idle_since):
+                        return connection
+                    self._discard(database, connection)
+                if self._opened.get(database, 0) < self.max_size:
+                    # 先占名额，建连接时不持锁
+                    self._opened[database] = self._opened.get(database, 0) + 1
+                    break
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待 {database} 连接超时（{self.max_size} 个连接均被占用）")
+                self._cond.wait(remaining)
+
+        try:
+            connection = self._create(database)
+        except Exception:
+            with self._cond:
+                self._opened[database] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._owner[id(connection)] = database
+        return connection
+
+    def release(self, connection) -> None:
+        """
+        归还连接（未提交的事务回滚，回滚失败的连接直接关闭）
+
+        Args:
+            connection: acquire()借出的连接
+        """
+        with self._cond:
+            database = self._owner.get(id(connection))
+            if database is None:
+                return
+            try:
+                connection.rollback()
+            except Exception:
+                self._discard(database, connection)
+                return
+            if self._closed:
+                self._discard(database, connection)
+                return
+            self._idle.setdefault(database, []).append((connection, monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, database: str):
+        """
+        借出连接的上下文管理器
+        用法: with pool.connection('概念板块') as conn: ...
+        """
+        connection = self.acquire(database)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self) -> dict:
+        """各数据库的已打开/空闲连接数"""
+        with self._cond:
+            return {
+                database: {'opened': opened, 'idle': len(self._idle.get(database, []))}
+                for database, opened in self._opened.items()
+            }
+
+    def close(self) -> None:
+        """关闭所有空闲连接，之后归还的连接直接关闭"""
+        with self._cond:
+            self._closed = True
+            for database, idle in self._idle.items():
+                for connection, _ in idle:
+                    self._discard(database, connection)
+                idle.clear()
+            self._cond.notify_all()
+        logger.info("MySQL连接池已关闭")
+
+
+class Database:
+    """MySQL数据库操作类（支持多数据库）"""
+
+    def __init__(self, config: dict, board_type: str, pool: ConnectionPool = None):
+        """
+        初始化数据库连接
+
+        每个线程首次使用时从连接池借出自己的连接，多个线程可同时使用同一个实例
+
+        Args:
+            config: 数据库配置字典，包含host, port, user, password等
+            board_type: 板块类型（同花顺行业/概念/地域）
+            pool: 共享连接池，不指定时创建本实例独占的连接池
+        """
+        if board_type not in BOARD_CONFIGS:
+            raise ValueError(f"不支持的板块类型: {board_type}，必须是：{list(BOARD_CONFIGS.keys())}")
+
+        self.board_type = board_type
+        self.database_name = BOARD_CONFIGS[board_type]['database']
+        self.config = config
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else ConnectionPool(config)
+        self._held: dict[int, object] = {}   # 线程ID -> 借出的连接
+        self._held_lock = Lock()
+        self._transactions: set[int] = set()  # 处于transaction()中的线程ID
+
+        # 成分股存储方式
+        self.stock_storage = config.get('stock_storage', 'snapshot')
+        if self.stock_storage not in STOCK_STORAGE_MODES:
+            raise ValueError(f"不支持的成分股存储方式: {self.stock_storage}，必须是：{list(STOCK_STORAGE_MODES)}")
+
+        # 成分股插入方式
+        self.stock_insert_mode = config.get('stock_insert_mode', 'auto')
+        if self.stock_insert_mode not in STOCK_INSERT_MODES:
+            raise ValueError(f"不支持的成分股插入方式: {self.stock_insert_mode}，必须是：{list(STOCK_INSERT_MODES)}")
+        self.bulk_threshold = config.get('bulk_threshold', DEFAULT_BULK_THRESHOLD)
+        self.insert_chunk_size = config.get('insert_chunk_size', DEFAULT_INSERT_CHUNK_SIZE)
+        # 服务端禁用LOCAL INFILE后不再尝试
+        self._load_data_available = self.stock_insert_mode in ('auto', 'load_data') and self.pool.local_infile
+
+        # 建立数据库连接（当前线程借出一个，并预热连接池）
+        self.connection
+        self.pool.warm(self.database_name)
+
+        # 板块信息/成分股是否已按批次ID分区（partition_databases.sql）
+        self.partitioned = self._detect_partitioning()
+        logger.info(f"✓ MySQL连接成功: {self.config.get('host', 'localhost')}:{self.config.get('port', 3306)}/{self.database_name}")
+
+    @property
+    def connection(self):
+        """当前线程的连接（首次使用时从连接池借出，release()或close()时归还）"""
+        ident = get_ident()
+        connection = self._held.get(ident)
+        if connection is None:
+            connection = self.pool.acquire(self.database_name)
+            with self._held_lock:
+                self._held[ident] = connection
+        return connection
+
+    @property
+    def _in_transaction(self) -> bool:
+        """当前线程是否处于transaction()中"""
+        return get_ident() in self._transactions
+
+    def release(self):
+        """把当前线程的连接归还连接池（未提交的修改会回滚）"""
+        with self._held_lock:
+            connection = self._held.pop(get_ident(), None)
+        if connection is not None:
+            self.pool.release(connection)
+
     def test_connection(self):
         """测试数据库连接是否有效"""
         try:
@@ -105,8 +356,11 @@ class Database:
         """
         事务上下文管理器
         用法: with db.transaction(): ...
+        进入前当前线程没有借出连接时，事务结束后归还连接池（供写入线程等短期使用）
         """
-        self._in_transaction = True
+        ident = get_ident()
+        held = ident in self._held
+        self._transactions.add(ident)
         try:
             yield
             self.connection.commit()
@@ -116,18 +370,22 @@ class Database:
             logger.error(f"事务回滚: {e}")
             raise
         finally:
-            self._in_transaction = False
+            self._transactions.discard(ident)
+            if not held:
+                self.release()
 
     def rollback(self):
         """手动回滚事务"""
-        if self.connection:
-            self.connection.rollback()
+        connection = self._held.get(get_ident())
+        if connection:
+            connection.rollback()
             logger.info("事务已回滚")
 
     def commit(self):
         """手动提交事务"""
-        if self.connection:
-            self.connection.commit()
+        connection = self._held.get(get_ident())
+        if connection:
+            connection.commit()
             logger.debug("事务已提交")
 
     def create_batch(self) -> int:
@@ -146,15 +404,79 @@ class Database:
                 cursor.execute(sql)
                 self.connection.commit()
                 batch_id = cursor.lastrowid
+                if self.partitioned:
+                    self._add_batch_partition(cursor, batch_id)
                 logger.info(f"✓ 创建批次 #{batch_id} (类型: {self.board_type})")
                 return batch_id
         except Exception as e:
             logger.error(f"创建批次失败: {e}")
             raise
 
+    def _partition_names(self, cursor) -> set[str]:
+        """板块信息和成分股共有的分区名（未分区时为空）"""
+        cursor.execute("""
+            SELECT `TABLE_NAME` AS `表名`, `PARTITION_NAME` AS `分区名`
+            FROM information_schema.`PARTITIONS`
+            WHERE `TABLE_SCHEMA` = %s AND `TABLE_NAME` IN ('板块信息', '成分股')
+              AND `PARTITION_NAME` IS NOT NULL
+        """, (self.database_name,))
+        tables = {'板块信息': set(), '成分股': set()}
+        for row in cursor.fetchall():
+            tables[row['表名']].add(row['分区名'])
+        return tables['板块信息'] & tables['成分股']
+
+    def _detect_partitioning(self) -> bool:
+        """两张表都有p_max分区时视为已按批次分区"""
+        try:
+            with self.connection.cursor() as cursor:
+                partitioned = BATCH_PARTITION_MAX in self._partition_names(cursor)
+            if partitioned:
+                logger.info(f"✓ {self.database_name} 板块信息/成分股已按批次分区")
+            return partitioned
+        except Exception as e:
+            logger.warning(f"检测分区失败，按未分区处理: {e}")
+            return False
+
+    def _add_batch_partition(self, cursor, batch_id: int):
+        """
+        从p_max拆出本批次的分区p<批次ID>
+
+        p_max中没有数据（此前的批次都在各自分区），拆分只修改表定义
+        """
+        for table in ('板块信息', '成分股'):
+            cursor.execute(f"""
+                ALTER TABLE `{table}` REORGANIZE PARTITION `{BATCH_PARTITION_MAX}` INTO (
+                    PARTITION `p{batch_id}` VALUES LESS THAN ({batch_id + 1}),
+                    PARTITION `{BATCH_PARTITION_MAX}` VALUES LESS THAN MAXVALUE
+                )
+            """)
+
+    def _drop_batches(self, cursor, batch_ids: List[int]):
+        """
+        删除批次的板块信息、成分股和批次记录
+
+        已分区时有独立分区的批次直接DROP PARTITION（不逐行删除），
+        其余批次（分区前的历史数据）逐表删除；未分区时依赖外键级联删除
+        """
+        placeholders = ', '.join(['%s'] * len(batch_ids))
+        if self.partitioned:
+            names = self._partition_names(cursor)
+            dropped = [f'p{batch_id}' for batch_id in batch_ids if f'p{batch_id}' in names]
+            remaining = [batch_id for batch_id in batch_ids if f'p{batch_id}' not in names]
+            for table in ('板块信息', '成分股'):
+                if dropped:
+                    cursor.execute(
+                        f"ALTER TABLE `{table}` DROP PARTITION {', '.join(f'`{name}`' for name in dropped)}")
+                if remaining:
+                    cursor.execute(
+                        f"DELETE FROM `{table}` WHERE `批次ID` IN ({', '.join(['%s'] * len(remaining))})",
+                        remaining)
+        cursor.execute(f"DELETE FROM `爬取记录` WHERE `批次ID` IN ({placeholders})", batch_ids)
+
     def update_batch_status(self, batch_id: int, status: str,
                            total_boards: int = None, total_stocks: int = None,
-                           elapsed_seconds: float = None, error_message: str = None):
+                           elapsed_seconds: float = None, error_message: str = None,
+                           request_rate: float = None):
         """
         更新批次状态
 
@@ -165,6 +487,7 @@ class Database:
             total_stocks: 股票总数
             elapsed_seconds: 耗时（秒）
             error_message: 错误信息（失败时）
+            request_rate: 本次抓取收敛的请求速率（次/秒）
         """
         try:
             with self.connection.cursor() as cursor:
@@ -175,10 +498,12 @@ class Database:
                         `板块总数` = COALESCE(%s, `板块总数`),
                         `股票总数` = COALESCE(%s, `股票总数`),
                         `爬取耗时秒数` = COALESCE(%s, `爬取耗时秒数`),
+                        `请求速率` = COALESCE(%s, `请求速率`),
                         `错误信息` = %s
                     WHERE `批次ID` = %s
                 """
-                cursor.execute(sql, (status, total_boards, total_stocks, elapsed_seconds, error_message, batch_id))
+                cursor.execute(sql, (status, total_boards, total_stocks, elapsed_seconds,
+                                     request_rate, error_message, batch_id))
                 self.connection.commit()
                 logger.info(f"✓ 批次 #{batch_id} 状态更新为: {status}")
         except Exception as e:
@@ -218,39 +543,210 @@ class Database:
             logger.error(f"插入板块数据失败: {e}")
             raise
 
-    def insert_stocks(self, batch_id: int, stocks: List[Dict]):
+    def insert_stocks(self, batch_id: int, stocks: List[Dict], mode: str = None):
         """
         批量插入股票数据
 
         Args:
             batch_id: 批次ID
             stocks: 股票数据列表 [{board_name, stock_code, stock_name, sequence_num}, ...]
+            mode: 插入方式，同insert_stock_rows
+        """
+        self.insert_stock_rows(batch_id, [
+            (s['board_name'], s['stock_code'], s['stock_name'], s.get('sequence_num'))
+            for s in stocks
+        ], mode)
+
+    def insert_stock_rows(self, batch_id: int, stocks: List[tuple], mode: str = None):
+        """
+        批量插入股票数据（写入线程直接传元组，不构造字典）
+
+        Args:
+            batch_id: 批次ID
+            stocks: [(板块名称, 股票代码, 股票名称, 原始序号), ...]
+            mode: 插入方式（executemany/multirow/load_data/auto），默认使用配置的stock_insert_mode
+                  （interval存储方式下不使用，只写入变化的成员区间）
         """
         if not stocks:
             return
 
+        if self.stock_storage == 'interval':
+            try:
+                opened, closed = self._merge_stock_intervals(batch_id, stocks)
+                if not self._in_transaction:
+                    self.connection.commit()
+                logger.info(f"✓ {len(stocks)} 条股票数据: 新增区间 {opened}，结束区间 {closed}")
+                return
+            except Exception as e:
+                logger.error(f"写入成分股区间失败: {e}")
+                raise
+
+        mode = mode or self.stock_insert_mode
+        if mode == 'auto':
+            mode = 'load_data' if len(stocks) >= self.bulk_threshold else 'executemany'
+        if mode == 'load_data' and not self._load_data_available:
+            mode = 'multirow'
+
+        values = [(batch_id, name, code, stock_name, seq) for name, code, stock_name, seq in stocks]
+
         try:
-            with self.connection.cursor() as cursor:
+            if mode == 'load_data':
+                try:
+                    self._load_stocks(values)
+                except (pymysql.err.OperationalError, pymysql.err.InternalError) as e:
+                    if e.args[0] not in LOCAL_INFILE_DISABLED_ERRORS:
+                        raise
+                    logger.warning(f"服务端未开启LOCAL INFILE，改用multirow插入: {e}")
+                    self._load_data_available = False
+                    mode = 'multirow'
+            if mode == 'multirow':
+                self._insert_stocks_multirow(values)
+            elif mode == 'executemany':
+                with self.connection.cursor() as cursor:
+                    sql = """
+                        INSERT INTO `成分股`
+                        (`批次ID`, `板块名称`, `股票代码`, `股票名称`, `原始序号`)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """
+                    cursor.executemany(sql, values)
+
+            if not self._in_transaction:
+                self.connection.commit()
+
+            logger.info(f"✓ 插入 {len(stocks)} 条股票数据（{mode}）")
+        except Exception as e:
+            logger.error(f"插入股票数据失败: {e}")
+            raise
+
+    def _merge_stock_intervals(self, batch_id: int, stocks: List[tuple]) -> tuple[int, int]:
+        """
+        与这些板块当前有效的成分股区间对比，只插入新出现的成员、结束消失的成员
+
+        成员以 (板块名称, 股票代码, 股票名称) 区分，原始序号保留区间开始时的值
+
+        Args:
+            batch_id: 批次ID
+            stocks: [(板块名称, 股票代码, 股票名称, 原始序号), ...]
+
+        Returns:
+            (新增区间数, 结束区间数)
+        """
+        members: dict[str, dict[tuple, object]] = {}
+        for name, code, stock_name, seq in stocks:
+            members.setdefault(name, {}).setdefault((code, stock_name), seq)
+
+        chunk_size = max(1, self.insert_chunk_size)
+        names = list(members)
+        to_close = []
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(names), chunk_size):
+                chunk = names[start:start + chunk_size]
+                sql = f"""
+                    SELECT `记录ID`, `板块名称`, `股票代码`, `股票名称`
+                    FROM `成分股区间`
+                    WHERE `截止批次ID` IS NULL AND `板块名称` IN ({', '.join(['%s'] * len(chunk))})
+                """
+                cursor.execute(sql, chunk)
+                for row in cursor.fetchall():
+                    current = members[row['板块名称']]
+                    key = (row['股票代码'], row['股票名称'])
+                    if key in current:
+                        # 仍有效的成员不写入
+                        del current[key]
+                    else:
+                        to_close.append(row['记录ID'])
+
+            for start in range(0, len(to_close), chunk_size):
+                chunk = to_close[start:start + chunk_size]
+                sql = f"""
+                    UPDATE `成分股区间` SET `截止批次ID` = %s
+                    WHERE `记录ID` IN ({', '.join(['%s'] * len(chunk))})
+                """
+                cursor.execute(sql, [batch_id] + chunk)
+
+            to_open = [
+                (name, code, stock_name, seq, batch_id)
+                for name, current in members.items()
+                for (code, stock_name), seq in current.items()
+            ]
+            if to_open:
                 sql = """
-                    INSERT INTO `成分股`
-                    (`批次ID`, `板块名称`, `股票代码`, `股票名称`, `原始序号`)
+                    INSERT INTO `成分股区间`
+                    (`板块名称`, `股票代码`, `股票名称`, `原始序号`, `起始批次ID`)
                     VALUES (%s, %s, %s, %s, %s)
                 """
-                values = [
-                    (batch_id, s['board_name'], s['stock_code'],
-                     s['stock_name'], s.get('sequence_num'))
-                    for s in stocks
-                ]
-                cursor.executemany(sql, values)
+                cursor.executemany(sql, to_open)
 
+        return len(to_open), len(to_close)
+
+    def close_removed_boards(self, batch_id: int) -> int:
+        """
+        结束本批次中已不存在的板块的成分股区间（interval存储方式，批次成功后调用）
+
+        抓取失败的板块仍写入了板块信息，其区间保持有效
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            结束的区间数
+        """
+        if self.stock_storage != 'interval':
+            return 0
+        try:
+            with self.connection.cursor() as cursor:
+                sql = """
+                    UPDATE `成分股区间` s
+                    SET s.`截止批次ID` = %s
+                    WHERE s.`截止批次ID` IS NULL AND s.`起始批次ID` < %s
+                      AND NOT EXISTS (
+                          SELECT 1 FROM `板块信息` b
+                          WHERE b.`批次ID` = %s AND b.`板块名称` = s.`板块名称`
+                      )
+                """
+                closed = cursor.execute(sql, (batch_id, batch_id, batch_id))
                 if not self._in_transaction:
                     self.connection.commit()
-
-                logger.info(f"✓ 插入 {len(stocks)} 条股票数据")
+                if closed:
+                    logger.info(f"✓ 批次 #{batch_id} 结束已移除板块的 {closed} 个成分股区间")
+                return closed
         except Exception as e:
-            logger.error(f"插入股票数据失败: {e}")
+            logger.error(f"结束已移除板块的成分股区间失败: {e}")
             raise
 
+    def _insert_stocks_multirow(self, values: List[tuple]):
+        """按insert_chunk_size行拼成一条多行INSERT"""
+        chunk_size = max(1, self.insert_chunk_size)
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(values), chunk_size):
+                chunk = values[start:start + chunk_size]
+                sql = (
+                    "INSERT INTO `成分股` (`批次ID`, `板块名称`, `股票代码`, `股票名称`, `原始序号`) VALUES "
+                    + ', '.join(['(%s, %s, %s, %s, %s)'] * len(chunk))
+                )
+                cursor.execute(sql, [field for row in chunk for field in row])
+
+    def _load_stocks(self, values: List[tuple]):
+        """写入临时TSV文件后用LOAD DATA LOCAL INFILE导入"""
+        with NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', newline='\n', delete=False) as f:
+            path = f.name
+            for row in values:
+                f.write('\t'.join(_tsv_field(field) for field in row))
+                f.write('\n')
+
+        try:
+            with self.connection.cursor() as cursor:
+                sql = """
+                    LOAD DATA LOCAL INFILE %s INTO TABLE `成分股`
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                    LINES TERMINATED BY '\\n'
+                    (`批次ID`, `板块名称`, `股票代码`, `股票名称`, `原始序号`)
+                """
+                cursor.execute(sql, (path,))
+        finally:
+            unlink(path)
+
     def validate_batch_integrity(self, batch_id: int) -> tuple[bool, str]:
         """
         验证批次数据完整性
@@ -267,15 +763,27 @@ class Database:
         try:
             with self.connection.cursor() as cursor:
                 # 检查：查找没有股票数据的板块
-                sql_orphan_boards = """
-                    SELECT b.`板块名称`
-                    FROM `板块信息` b
-                    LEFT JOIN `成分股` s
-                        ON s.`批次ID` = b.`批次ID` AND s.`板块名称` = b.`板块名称`
-                    WHERE b.`批次ID` = %s
-                    GROUP BY b.`板块名称`
-                    HAVING COUNT(s.`记录ID`) = 0
-                """
+                if self.stock_storage == 'interval':
+                    sql_orphan_boards = """
+                        SELECT b.`板块名称`
+                        FROM `板块信息` b
+                        LEFT JOIN `成分股区间` s
+                            ON s.`板块名称` = b.`板块名称` AND s.`起始批次ID` <= b.`批次ID`
+                            AND (s.`截止批次ID` IS NULL OR s.`截止批次ID` > b.`批次ID`)
+                        WHERE b.`批次ID` = %s
+                        GROUP BY b.`板块名称`
+                        HAVING COUNT(s.`记录ID`) = 0
+                    """
+                else:
+                    sql_orphan_boards = """
+                        SELECT b.`板块名称`
+                        FROM `板块信息` b
+                        LEFT JOIN `成分股` s
+                            ON s.`批次ID` = b.`批次ID` AND s.`板块名称` = b.`板块名称`
+                        WHERE b.`批次ID` = %s
+                        GROUP BY b.`板块名称`
+                        HAVING COUNT(s.`记录ID`) = 0
+                    """
                 cursor.execute(sql_orphan_boards, (batch_id,))
                 orphan_boards = cursor.fetchall()
 
@@ -304,15 +812,128 @@ class Database:
         """
         try:
             with self.connection.cursor() as cursor:
-                # 外键级联删除会自动删除关联的板块信息和成分股
-                sql = "DELETE FROM `爬取记录` WHERE `批次ID` = %s"
-                cursor.execute(sql, (batch_id,))
+                if self.stock_storage == 'interval':
+                    # 撤销本批次对成分股区间的修改（只对最新批次成立）
+                    cursor.execute("DELETE FROM `成分股区间` WHERE `起始批次ID` = %s", (batch_id,))
+                    cursor.execute(
+                        "UPDATE `成分股区间` SET `截止批次ID` = NULL WHERE `截止批次ID` = %s", (batch_id,))
+                self._drop_batches(cursor, [batch_id])
                 self.connection.commit()
                 logger.info(f"✓ 删除批次 #{batch_id} 的所有数据")
         except Exception as e:
             logger.error(f"删除批次数据失败: {e}")
             raise
 
+    def _clear_batch_rows(self, cursor, batch_id: int):
+        """
+        清除批次已写入的板块信息/成分股/板块重叠并撤销其成分股区间修改，保留批次记录
+
+        已分区时为TRUNCATE PARTITION（不逐行删除）；区间撤销只对最新批次成立
+        """
+        if self.stock_storage == 'interval':
+            cursor.execute("DELETE FROM `成分股区间` WHERE `起始批次ID` = %s", (batch_id,))
+            cursor.execute("UPDATE `成分股区间` SET `截止批次ID` = NULL WHERE `截止批次ID` = %s", (batch_id,))
+        partitions = self._partition_names(cursor) if self.partitioned else set()
+        for table in ('板块信息', '成分股'):
+            if f'p{batch_id}' in partitions:
+                cursor.execute(f"ALTER TABLE `{table}` TRUNCATE PARTITION `p{batch_id}`")
+            else:
+                cursor.execute(f"DELETE FROM `{table}` WHERE `批次ID` = %s", (batch_id,))
+        cursor.execute("DELETE FROM `板块重叠` WHERE `批次ID` = %s", (batch_id,))
+
+    def discard_batch_data(self, batch_id: int):
+        """
+        清除被中断批次已写入的数据，保留批次记录（已完成的板块在抓取日志中，--resume时重新写入）
+
+        interval存储方式同时撤销本批次打开/结束的成分股区间，不影响下一个批次
+
+        Args:
+            batch_id: 批次ID
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                self._clear_batch_rows(cursor, batch_id)
+                self.connection.commit()
+                logger.info(f"✓ 清除被中断批次 #{batch_id} 已写入的数据")
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"清除批次数据失败: {e}")
+            raise
+
+    def reopen_batch(self, batch_id: int) -> bool:
+        """
+        继续一个未完成的批次（--resume）：清除其已写入的板块信息/成分股，状态改回"进行中"
+
+        已写入的部分由抓取日志重放，清除后重新写入，避免中断时半写的数据重复
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            bool: False表示批次不存在、已成功或不是最新批次（不能继续）
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT `执行状态` FROM `爬取记录` WHERE `批次ID` = %s", (batch_id,))
+                row = cursor.fetchone()
+                if row is None or row['执行状态'] == '成功' or batch_id != self.get_latest_batch_id():
+                    return False
+
+                self._clear_batch_rows(cursor, batch_id)
+                cursor.execute("""
+                    UPDATE `爬取记录`
+                    SET `执行状态` = '进行中', `结束时间` = NULL, `错误信息` = NULL
+                    WHERE `批次ID` = %s
+                """, (batch_id,))
+                self.connection.commit()
+                logger.info(f"✓ 继续批次 #{batch_id} (类型: {self.board_type})")
+                return True
+        except Exception as e:
+            logger.error(f"继续批次失败: {e}")
+            raise
+
+    def purge_batches(self, days: int) -> int:
+        """
+        删除抓取时间早于N天前的批次（保留最近一次成功批次，增量模式依赖它）
+
+        已分区时每个批次是一次DROP PARTITION；interval存储方式同时删除
+        在最早的剩余批次之前就已结束的成分股区间
+
+        Args:
+            days: 保留天数
+
+        Returns:
+            删除的批次数
+        """
+        try:
+            keep = self.get_latest_success_batch_id()
+            with self.connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT `批次ID` FROM `爬取记录`
+                    WHERE `抓取时间` < NOW() - INTERVAL %s DAY
+                    ORDER BY `批次ID`
+                """, (days,))
+                batch_ids = [row['批次ID'] for row in cursor.fetchall() if row['批次ID'] != keep]
+                if not batch_ids:
+                    logger.info(f"✓ {self.database_name} 没有 {days} 天前的批次需要清理")
+                    return 0
+
+                self._drop_batches(cursor, batch_ids)
+                if self.stock_storage == 'interval':
+                    cursor.execute("SELECT MIN(`批次ID`) AS min_id FROM `爬取记录`")
+                    oldest = cursor.fetchone()['min_id']
+                    if oldest is None:
+                        cursor.execute("DELETE FROM `成分股区间` WHERE `截止批次ID` IS NOT NULL")
+                    else:
+                        cursor.execute("DELETE FROM `成分股区间` WHERE `截止批次ID` <= %s", (oldest,))
+                self.connection.commit()
+                logger.info(f"✓ {self.database_name} 清理 {len(batch_ids)} 个 {days} 天前的批次"
+                            f"（#{batch_ids[0]} ~ #{batch_ids[-1]}）")
+                return len(batch_ids)
+        except Exception as e:
+            logger.error(f"清理历史批次失败: {e}")
+            raise
+
     def get_latest_batch_id(self) -> Optional[int]:
         """获取最新的批次ID"""
         try:
@@ -325,8 +946,123 @@ class Database:
             logger.error(f"获取最新批次ID失败: {e}")
             return None
 
+    def get_last_request_rate(self) -> Optional[float]:
+        """获取最近一次成功批次收敛的请求速率"""
+        try:
+            with self.connection.cursor() as cursor:
+                sql = """
+                    SELECT `请求速率` FROM `爬取记录`
+                    WHERE `执行状态` = '成功' AND `请求速率` IS NOT NULL
+                    ORDER BY `批次ID` DESC
+                    LIMIT 1
+                """
+                cursor.execute(sql)
+                result = cursor.fetchone()
+                return float(result['请求速率']) if result else None
+        except Exception as e:
+            logger.error(f"获取上次请求速率失败: {e}")
+            return None
+
+    def get_latest_success_batch_id(self) -> Optional[int]:
+        """获取最近一次成功批次的ID"""
+        try:
+            with self.connection.cursor() as cursor:
+                sql = """
+                    SELECT MAX(`批次ID`) as max_id FROM `爬取记录`
+                    WHERE `执行状态` = '成功'
+                """
+                cursor.execute(sql)
+                result = cursor.fetchone()
+                return result['max_id'] if result and result['max_id'] else None
+        except Exception as e:
+            logger.error(f"获取最近成功批次ID失败: {e}")
+            return None
+
+    def get_batch_boards(self, batch_id: int) -> List[Dict]:
+        """
+        获取批次的板块信息
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            板块信息列表（板块名称、来源链接、驱动事件、成分股数量）
+        """
+        with self.connection.cursor() as cursor:
+            sql = """
+                SELECT `板块名称`, `来源链接`, `驱动事件`, `成分股数量`
+                FROM `板块信息` WHERE `批次ID` = %s
+            """
+            cursor.execute(sql, (batch_id,))
+            return cursor.fetchall()
+
+    def get_batch_stocks(self, batch_id: int) -> List[Dict]:
+        """
+        获取批次的成分股明细
+
+        interval存储方式下由成分股区间还原该批次的完整快照（一次按区间索引的查询）
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            成分股列表（板块名称、股票代码、股票名称、原始序号），按记录ID排序（interval方式按板块名称、原始序号排序）
+        """
+        with self.connection.cursor() as cursor:
+            if self.stock_storage == 'interval':
+                sql = """
+                    SELECT `板块名称`, `股票代码`, `股票名称`, `原始序号`
+                    FROM `成分股区间`
+                    WHERE `起始批次ID` <= %s AND (`截止批次ID` IS NULL OR `截止批次ID` > %s)
+                    ORDER BY `板块名称`, `原始序号`
+                """
+                cursor.execute(sql, (batch_id, batch_id))
+                return cursor.fetchall()
+
+            sql = """
+                SELECT `板块名称`, `股票代码`, `股票名称`, `原始序号`
+                FROM `成分股` WHERE `批次ID` = %s
+                ORDER BY `记录ID`
+            """
+            cursor.execute(sql, (batch_id,))
+            return cursor.fetchall()
+
+    def replace_board_overlaps(self, batch_id: int, pairs: List[tuple]):
+        """
+        写入批次的板块重叠结果（先删除该批次已有的结果）
+
+        Args:
+            batch_id: 批次ID
+            pairs: [(板块名称, 相关板块, 共同成分股数, 相似度, 排名), ...]（analytics.OverlapPair）
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("DELETE FROM `板块重叠` WHERE `批次ID` = %s", (batch_id,))
+                sql = """
+                    INSERT INTO `板块重叠`
+                    (`批次ID`, `板块名称`, `相关板块`, `共同成分股数`, `相似度`, `排名`)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """
+                chunk_size = max(1, self.insert_chunk_size)
+                for start in range(0, len(pairs), chunk_size):
+                    cursor.executemany(sql, [
+                        (batch_id, board, other, shared, round(jaccard, 6), rank)
+                        for board, other, shared, jaccard, rank in pairs[start:start + chunk_size]
+                    ])
+                if not self._in_transaction:
+                    self.connection.commit()
+                logger.info(f"✓ 批次 #{batch_id} 写入 {len(pairs)} 条板块重叠")
+        except Exception as e:
+            logger.error(f"写入板块重叠失败: {e}")
+            raise
+
     def close(self):
-        """关闭数据库连接"""
-        if self.connection:
-            self.connection.close()
-            logger.info(f"数据库连接已关闭: {self.database_name}")
+        """归还所有线程借出的连接（独占的连接池同时关闭）"""
+        with self._held_lock:
+            held = list(self._held.values())
+            self._held.clear()
+        for connection in held:
+            self.pool.release(connection)
+        if self._owns_pool:
+            self.pool.close()
+        logger.info(f"数据库连接已关闭: {self.database_name}")
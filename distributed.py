@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分布式抓取模块
+协调者持有一个批次的全部任务（列表页、板块的详情页范围），经TCP上的JSON行协议租给
+其他机器上的worker进程；租约超时未交回结果的任务重新发放，结果在协调者汇总写入同一个批次
+
+协议（每条消息一行UTF-8 JSON，worker发请求、协调者应答）:
+  {"op": "lease", "worker": 名称}                → {"lease": 租约ID, "unit": 任务, "ttl": 秒}
+                                                 / {"wait": 秒}（暂无任务）/ {"done": true}（批次结束）
+  {"op": "result", "lease": 租约ID, "result": 结果} → {"ok": true}，任务已由其他worker完成或结果无效时 {"ok": false}
+  {"op": "fail", "lease": 租约ID, "error": 说明}    → {"ok": true}（任务重新排队）
+协调者配置了共享令牌时，每条请求须带 "token"，否则应答 {"error": ...}
+
+任务和结果的内容由调用方（main.py）定义，本模块只负责排队、租约和分组完成通知
+"""
+
+import hmac
+import json
+import logging
+import socket
+from collections import deque
+from queue import Queue, Empty
+from ipaddress import ip_address
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from threading import Thread, Lock, Condition, Event
+from time import time, sleep
+from typing import Callable, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9320
+DEFAULT_LEASE_TIMEOUT = 120.0
+DEFAULT_LEASE_PAGES = 5
+DEFAULT_MAX_ATTEMPTS = 3
+# 暂无任务时worker的轮询间隔（秒）
+POLL_INTERVAL = 0.2
+
+
+def parse_address(address: str, default_host: str = '127.0.0.1') -> tuple[str, int]:
+    """
+    解析 [主机:]端口
+
+    Args:
+        address: 如 "9320"、":9320"、"10.0.0.5:9320"
+        default_host: 未指定主机时使用
+
+    Returns:
+        (主机, 端口)
+    """
+    host, _, port = address.rpartition(':')
+    return host or default_host, int(port)
+
+
+class _Task:
+    """一个待完成的任务"""
+
+    __slots__ = ('group', 'unit', 'callback', 'attempts')
+
+    def __init__(self, group, unit: dict, callback: Callable):
+        self.group = group
+        self.unit = unit
+        self.callback = callback
+        self.attempts = 0
+
+
+class _Handler(StreamRequestHandler):
+    """一个worker连接：逐行读取请求并应答"""
+
+    def handle(self) -> None:
+        coordinator: LeaseCoordinator = self.server.coordinator
+        peer = f'{self.client_address[0]}:{self.client_address[1]}'
+        coordinator._connected(peer, +1)
+        try:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('请求不是JSON对象')
+                    reply = coordinator._handle(request, peer)
+                except ValueError as e:
+                    reply = {'error': f'无法解析的请求: {e}'}
+                self.wfile.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            coordinator._connected(peer, -1)
+
+
+class _Server(ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LeaseCoordinator:
+    """
+    协调者：把任务租给远程worker
+
+    用法与 worker_pool.GroupScheduler 相同：任务按组（各板块类型）排队、轮流发放，
+    某组已提交的任务（含回调中再提交的任务）全部完成后，该组出现在 wait() 的返回值中。
+    回调 callback(unit, result) 在协调者收到结果的连接线程中执行；
+    任务失败超过 max_attempts 次时以 result=None 回调
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 lease_timeout: float = DEFAULT_LEASE_TIMEOUT, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 token: Optional[str] = None, validate: Optional[Callable[[dict, object], Optional[str]]] = None):
+        """
+        Args:
+            host: 监听地址（默认只接受本机连接，远程worker需监听对外地址并配置token）
+            port: 监听端口（0为自动分配）
+            lease_timeout: 租约有效秒数，超时未交回的任务重新发放
+            max_attempts: 每个任务最多发放次数（worker报告失败或租约超时都计一次）
+            token: 共享令牌，给出时拒绝不带相同令牌的请求
+            validate: 检查结果 validate(unit, result)，返回错误说明时结果被拒绝、任务按失败重新发放
+        """
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.token = token
+        self.validate = validate
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+        self._tasks: dict[int, _Task] = {}       # 任务ID -> 未完成的任务
+        self._queues: dict = {}                  # 组 -> deque[任务ID]
+        self._turns: deque = deque()             # 有排队任务的组（轮转顺序）
+        self._pending: dict = {}                 # 组 -> 已提交未完成的任务数
+        self._leases: dict[int, tuple] = {}      # 租约ID -> (任务ID, 截止时间, worker)
+        self._lease_tasks: dict[int, int] = {}   # 租约ID -> 任务ID（租约过期后仍接受其结果）
+        self._drained: Queue = Queue()
+        self._cancelled: set = set()             # 已取消的组（新提交的任务被忽略）
+        self._next_task = 0
+        self._next_lease = 0
+        self._finished = False
+        self._connections = 0
+        self._last_seen = time()                 # 最近一次收到worker请求/连接变化的时间
+        self._workers: set[str] = set()
+        self._stats = {'leased': 0, 'completed': 0, 'expired': 0, 'failed': 0, 'duplicates': 0}
+
+        self._server = _Server((host, port), _Handler)
+        self._server.coordinator = self
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """实际监听的 (主机, 端口)"""
+        return self._server.server_address[:2]
+
+    def start(self) -> None:
+        """在后台线程中开始接受worker连接"""
+        self._thread = Thread(target=self._server.serve_forever, name='lease-coordinator', daemon=True)
+        self._thread.start()
+        logger.info(f"✓ 协调者已启动: {self.address[0]}:{self.address[1]}（租约 {self.lease_timeout:.0f} 秒）")
+        if not self.token and not _is_loopback(self.address[0]):
+            logger.warning(f"协调者监听 {self.address[0]} 但未配置token，任何能连接的主机都可以领取任务和交回结果")
+
+    def submit(self, group, unit: dict, callback: Callable, urgent: bool = False) -> None:
+        """
+        提交一个任务
+
+        Args:
+            group: 任务所属的组（可哈希对象）
+            unit: 发给worker的任务内容（可JSON序列化）
+            callback: 收到结果后调用 callback(unit, result)
+            urgent: 排到本组队首
+        """
+        self.submit_many(group, [unit], callback, urgent)
+
+    def submit_many(self, group, units: list[dict], callback: Callable, urgent: bool = False) -> None:
+        """
+        一次提交一组任务（空列表时该组若无未完成任务，立即视为完成）
+
+        Args:
+            group: 任务所属的组
+            units: 任务内容列表
+            callback: 收到每个结果后调用 callback(unit, result)
+            urgent: 排到本组队首
+        """
+        with self._lock:
+            if group in self._cancelled:
+                return
+            if not units:
+                if not self._pending.get(group):
+                    self._drained.put(group)
+                return
+            ids = []
+            for unit in units:
+                self._next_task += 1
+                self._tasks[self._next_task] = _Task(group, unit, callback)
+                ids.append(self._next_task)
+            self._enqueue(group, ids, urgent)
+            self._pending[group] = self._pending.get(group, 0) + len(ids)
+
+    def _enqueue(self, group, ids: list[int], urgent: bool) -> None:
+        """任务ID入队（调用方持有_lock）"""
+        queue = self._queues.setdefault(group, deque())
+        if not queue:
+            self._turns.append(group)
+        if urgent:
+            queue.extendleft(reversed(ids))
+        else:
+            queue.extend(ids)
+
+    def _expire(self, now: float) -> list[_Task]:
+        """
+        收回超时的租约，任务排回本组队首（调用方持有_lock）
+
+        Returns:
+            发放次数已用完、需要以None结果回调的任务
+        """
+        given_up = []
+        for lease_id, (task_id, deadline, worker) in list(self._leases.items()):
+            if deadline > now:
+                continue
+            del self._leases[lease_id]
+            task = self._tasks.get(task_id)
+            if task is None:
+                continue
+            self._stats['expired'] += 1
+            logger.warning(f"租约 #{lease_id} 超时（worker {worker}），重新发放任务 #{task_id}")
+            if task.attempts >= self.max_attempts:
+                given_up.append(self._tasks.pop(task_id))
+            else:
+                self._enqueue(task.group, [task_id], urgent=True)
+        return given_up
+
+    def _abandon(self, now: float) -> list[_Task]:
+        """
+        所有worker断开超过一个租约时长时放弃剩余的任务，避免批次一直等待（调用方持有_lock）
+
+        Returns:
+            需要以None结果回调的任务
+        """
+        if not self._workers or self._connections or self._leases or not self._turns:
+            return []
+        if now - self._last_seen < self.lease_timeout:
+            return []
+        given_up = [self._tasks.pop(task_id) for queue in self._queues.values() for task_id in queue
+                    if task_id in self._tasks]
+        self._queues.clear()
+        self._turns.clear()
+        if given_up:
+            logger.warning(f"所有worker已断开 {now - self._last_seen:.0f} 秒，放弃剩余的 {len(given_up)} 个任务")
+        return given_up
+
+    def _reclaim(self) -> None:
+        """收回超时的租约，发放次数用完或已无worker时以None结果回调"""
+        now = time()
+        with self._lock:
+            given_up = self._expire(now) + self._abandon(now)
+        for task in given_up:
+            self._complete(task, None)
+
+    def _lease(self, worker: str) -> dict:
+        """发放一个任务"""
+        now = time()
+        with self._lock:
+            self._workers.add(worker)
+            given_up = self._expire(now)
+            reply = None
+            while self._turns:
+                group = self._turns.popleft()
+                queue = self._queues[group]
+                task_id = queue.popleft()
+                if queue:
+                    self._turns.append(group)
+                task = self._tasks.get(task_id)
+                if task is None:
+                    # 超时后重新排队、但原worker已交回结果的任务
+                    continue
+                task.attempts += 1
+                self._next_lease += 1
+                self._leases[self._next_lease] = (task_id, now + self.lease_timeout, worker)
+                self._lease_tasks[self._next_lease] = task_id
+                self._stats['leased'] += 1
+                reply = {'lease': self._next_lease, 'unit': task.unit, 'ttl': self.lease_timeout}
+                break
+            if reply is None:
+                reply = {'done': True} if self._finished else {'wait': POLL_INTERVAL}
+        for task in given_up:
+            self._complete(task, None)
+        return reply
+
+    def _take_task(self, lease_id: int) -> Optional[_Task]:
+        """结束租约并取出其任务，任务已完成时返回None"""
+        with self._lock:
+            self._leases.pop(lease_id, None)
+            task_id = self._lease_tasks.pop(lease_id, None)
+            task = self._tasks.pop(task_id, None) if task_id is not None else None
+            if task is None:
+                self._stats['duplicates'] += 1
+                return None
+            # 同一任务重新发放出去的其他租约作废
+            for other, (other_task, _, _) in list(self._leases.items()):
+                if other_task == task_id:
+                    del self._leases[other]
+            return task
+
+    def _fail(self, lease_id: int, worker: str, error: str) -> None:
+        """worker报告任务失败：重新排队，发放次数用完时以None结果回调"""
+        with self._lock:
+            self._leases.pop(lease_id, None)
+            task_id = self._lease_tasks.pop(lease_id, None)
+            task = self._tasks.get(task_id) if task_id is not None else None
+            if task is None:
+                return
+            self._stats['failed'] += 1
+            logger.warning(f"worker {worker} 执行任务 #{task_id} 失败（第 {task.attempts} 次）: {error}")
+            if task.attempts < self.max_attempts:
+                self._enqueue(task.group, [task_id], urgent=False)
+                return
+            del self._tasks[task_id]
+        self._complete(task, None)
+
+    def _complete(self, task: _Task, result: Optional[dict]) -> None:
+        """执行回调并更新组的未完成数"""
+        try:
+            task.callback(task.unit, result)
+        except Exception as e:
+            logger.error(f"任务结果处理异常: {e}")
+        finally:
+            with self._lock:
+                self._stats['completed'] += 1
+                if task.group in self._pending:
+                    self._pending[task.group] -= 1
+                    if self._pending[task.group] == 0:
+                        if task.group in self._cancelled:
+                            self._idle.notify_all()
+                        else:
+                            self._drained.put(task.group)
+
+    def _check(self, lease_id: int, result) -> Optional[str]:
+        """用validate检查租约对应任务的结果，返回错误说明（任务已完成时不检查）"""
+        if self.validate is None:
+            return None
+        with self._lock:
+            task = self._tasks.get(self._lease_tasks.get(lease_id))
+        if task is None:
+            return None
+        try:
+            return self.validate(task.unit, result)
+        except Exception as e:
+            return f'{type(e).__name__}: {e}'
+
+    def _handle(self, request: dict, peer: str) -> dict:
+        """处理一条worker请求"""
+        if self.token and not hmac.compare_digest(str(request.get('token', '')).encode(), self.token.encode()):
+            logger.warning(f"拒绝来自 {peer} 的请求: token不匹配")
+            return {'error': 'token不匹配'}
+        with self._lock:
+            self._last_seen = time()
+        op = request.get('op')
+        worker = str(request.get('worker') or peer)
+        if op == 'lease':
+            return self._lease(worker)
+        lease_id = request.get('lease')
+        if not isinstance(lease_id, int):
+            return {'error': f'无效的租约ID: {lease_id!r}'}
+        if op == 'result':
+            result = request.get('result')
+            error = self._check(lease_id, result)
+            if error is not None:
+                self._fail(lease_id, worker, f'结果无效: {error}')
+                return {'ok': False}
+            task = self._take_task(lease_id)
+            if task is None:
+                return {'ok': False}
+            self._complete(task, result)
+            return {'ok': True}
+        if op == 'fail':
+            self._fail(lease_id, worker, str(request.get('error', '')))
+            return {'ok': True}
+        return {'error': f'未知操作: {op}'}
+
+    def _connected(self, peer: str, delta: int) -> None:
+        with self._lock:
+            self._connections += delta
+            self._last_seen = time()
+        if delta > 0:
+            logger.info(f"worker已连接: {peer}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        等待某一组的任务全部完成
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            完成的组，超时返回None
+        """
+        # 等待期间定时收回超时的租约（所有worker都已退出时不会再有lease请求触发收回）
+        deadline = None if timeout is None else time() + timeout
+        while True:
+            self._reclaim()
+            wait = POLL_INTERVAL if deadline is None else max(0.0, min(POLL_INTERVAL, deadline - time()))
+            try:
+                return self._drained.get(timeout=wait)
+            except Empty:
+                if deadline is not None and time() >= deadline:
+                    return None
+
+    def cancel(self, group, timeout: Optional[float] = None) -> int:
+        """
+        放弃一组尚未完成的任务（被中断的板块类型），之后交回的结果被丢弃；
+        并等待正在执行的结果回调结束，返回后该组不会再写入
+
+        Args:
+            group: 任务所属的组
+            timeout: 等待回调结束的最长秒数，默认一直等待
+
+        Returns:
+            放弃的任务数
+        """
+        with self._idle:
+            self._cancelled.add(group)
+            dropped = [task_id for task_id, task in self._tasks.items() if task.group == group]
+            for task_id in dropped:
+                del self._tasks[task_id]
+            self._queues.pop(group, None)
+            if group in self._turns:
+                self._turns.remove(group)
+            if group in self._pending:
+                self._pending[group] -= len(dropped)
+            if self._idle.wait_for(lambda: not self._pending.get(group), timeout):
+                self._pending.pop(group, None)
+                self._cancelled.discard(group)
+            return len(dropped)
+
+    def queue_depth(self, group=None) -> int:
+        """排队（尚未租出）的任务数，指定group时只统计该组"""
+        with self._lock:
+            if group is not None:
+                return len(self._queues.get(group, ()))
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        """发放/完成/超时/失败/重复结果计数和worker数"""
+        with self._lock:
+            return dict(self._stats, workers=len(self._workers))
+
+    def close(self, linger: float = 2.0) -> None:
+        """
+        通知worker批次已结束并停止监听
+
+        Args:
+            linger: 等待已连接worker收到结束通知的最长秒数
+        """
+        with self._lock:
+            self._finished = True
+        deadline = time() + linger
+        while time() < deadline:
+            with self._lock:
+                if self._connections == 0:
+                    break
+            sleep(POLL_INTERVAL / 2)
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _is_loopback(host: str) -> bool:
+    """监听地址是否只接受本机连接"""
+    if host == 'localhost':
+        return True
+    try:
+        return ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _request(stream, message: dict, token: Optional[str] = None) -> dict:
+    """发送一条请求并读取应答（协调者拒绝请求时抛出PermissionError）"""
+    if token:
+        message = dict(message, token=token)
+    stream.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+    stream.flush()
+    line = stream.readline()
+    if not line:
+        raise ConnectionError('协调者已断开连接')
+    reply = json.loads(line)
+    if 'error' in reply:
+        raise PermissionError(f"协调者拒绝请求: {reply['error']}")
+    return reply
+
+
+def _worker_loop(host: str, port: int, execute: Callable[[dict], dict], name: str,
+                 stop: Event, connect_retries: int, counts: list, index: int, token: Optional[str]) -> None:
+    """单个连接：领取任务 → 执行 → 交回结果，直到协调者通知结束"""
+    failures = 0
+    while not stop.is_set():
+        try:
+            with socket.create_connection((host, port), timeout=None) as sock:
+                stream = sock.makefile('rwb')
+                failures = 0
+                while not stop.is_set():
+                    reply = _request(stream, {'op': 'lease', 'worker': name}, token)
+                    if reply.get('done'):
+                        return
+                    if 'wait' in reply:
+                        stop.wait(reply['wait'])
+                        continue
+                    lease = reply['lease']
+                    try:
+                        result = execute(reply['unit'])
+                    except Exception as e:
+                        if stop.is_set():
+                            return
+                        logger.warning(f"{name} 任务执行失败: {e}")
+                        _request(stream, {'op': 'fail', 'lease': lease, 'worker': name, 'error': str(e)}, token)
+                        continue
+                    if stop.is_set():
+                        # 被中断的任务结果不完整，不交回（租约超时后由其他worker重做）
+                        return
+                    _request(stream, {'op': 'result', 'lease': lease, 'worker': name, 'result': result}, token)
+                    counts[index] += 1
+        except PermissionError as e:
+            logger.error(f"{name} {e}")
+            return
+        except (ConnectionError, OSError) as e:
+            failures += 1
+            if failures > connect_retries:
+                logger.error(f"{name} 无法连接协调者 {host}:{port}: {e}")
+                return
+            stop.wait(min(2 ** failures * 0.1, 5.0))
+
+
+def run_worker(host: str, port: int, execute: Callable[[dict], dict], name: str = None,
+               parallel: int = 1, stop: Event = None, connect_retries: int = 5, token: Optional[str] = None) -> int:
+    """
+    worker：并行 parallel 个连接领取并执行任务，直到协调者通知批次结束
+
+    Args:
+        host: 协调者地址
+        port: 协调者端口
+        execute: 执行一个任务，返回可JSON序列化的结果（抛出异常时报告失败，任务重新排队）
+        name: worker名称（日志用），默认 主机名:进程号
+        parallel: 并行的连接数（每个连接同时执行一个任务）
+        stop: 停止标志（Ctrl+C）
+        connect_retries: 连接失败后的重试次数
+        token: 协调者的共享令牌
+
+    Returns:
+        交回结果的任务数
+    """
+    from os import getpid
+
+    name = name or f'{socket.gethostname()}:{getpid()}'
+    stop = stop or Event()
+    counts = [0] * parallel
+    threads = [
+        Thread(target=_worker_loop, name=f'lease-worker-{index}',
+               args=(host, port, execute, name, stop, connect_retries, counts, index, token), daemon=True)
+        for index in range(parallel)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(timeout=0.5)
+    logger.info(f"✓ worker {name} 结束: 完成 {sum(counts)} 个任务")
+    return sum(counts)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量抓取模块
+对比列表页的成分股数量/来源链接与上一次成功批次，只重新抓取有变化的板块，
+未变化板块沿用上一批次的成分股（另按比例随机抽样重抓用于校验）
+"""
+
+import logging
+import random
+from csv import reader as csv_reader
+from os import listdir
+from typing import Optional
+
+from board_writer import CSV_SUFFIXES, DEFAULT_COUNT_TOLERANCE, open_csv
+from database import BOARD_CONFIGS
+from encrypt import path_join, exists
+from parquet_store import load_latest_batch
+from records import StockTable, parse_count
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 0.05
+
+
+def load_previous_from_db(db, batch_id: int = None) -> Optional[dict]:
+    """
+    从数据库读取最近一次成功批次
+
+    Args:
+        db: Database/SQLiteDatabase实例
+        batch_id: 指定批次ID，不指定时读取最近一次成功批次
+
+    Returns:
+        {板块名称: {'source_url', 'stock_count', 'stocks': StockTable}}，无成功批次时返回None
+    """
+    if batch_id is None:
+        batch_id = db.get_latest_success_batch_id()
+    if batch_id is None:
+        return None
+
+    previous = {}
+    for board in db.get_batch_boards(batch_id):
+        previous[board['板块名称']] = {
+            'source_url': board['来源链接'],
+            'stock_count': parse_count(board['成分股数量']),
+            'stocks': StockTable()
+        }
+    for stock in db.get_batch_stocks(batch_id):
+        entry = previous.get(stock['板块名称'])
+        if entry is not None:
+            entry['stocks'].append(stock['原始序号'], stock['股票代码'], stock['股票名称'])
+
+    logger.info(f"✓ 读取上一成功批次 #{batch_id}: {len(previous)} 个板块")
+    return previous
+
+
+def _csv_batches(board_type: str, result_dir: str):
+    """从新到旧给出CSV输出目录中的 (日期目录, 时间戳, 后缀)，后缀为.csv/.csv.gz/.csv.zst"""
+    board_folder = path_join(result_dir, BOARD_CONFIGS[board_type]['database'])
+    if not exists(board_folder):
+        return
+
+    for date_folder in sorted(listdir(board_folder), reverse=True):
+        folder = path_join(board_folder, date_folder)
+        batches = []
+        for name in listdir(folder):
+            if not name.startswith('板块信息_'):
+                continue
+            for suffix in CSV_SUFFIXES.values():
+                if name.endswith(suffix):
+                    batches.append((name[len('板块信息_'):-len(suffix)], suffix))
+                    break
+        for stamp, suffix in sorted(batches, reverse=True):
+            if exists(path_join(folder, f'成分股_{stamp}{suffix}')):
+                yield folder, stamp, suffix
+
+
+def latest_csv_stamp(board_type: str, result_dir: str, exclude: str = None) -> Optional[str]:
+    """
+    最近一次CSV结果的时间戳
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        result_dir: 结果根目录（result/）
+        exclude: 需要跳过的时间戳（本次运行的today）
+
+    Returns:
+        时间戳（YYYYMMDDHHMMSS），无历史文件时返回None
+    """
+    for _, stamp, _ in _csv_batches(board_type, result_dir):
+        if stamp != exclude:
+            return stamp
+    return None
+
+
+def load_previous_from_csv(board_type: str, result_dir: str, exclude: str = None,
+                           stamp: str = None) -> Optional[dict]:
+    """
+    从CSV输出目录读取最近一次的结果
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        result_dir: 结果根目录（result/）
+        exclude: 需要跳过的时间戳（本次运行的today）
+        stamp: 指定时间戳，不指定时读取最近一次
+
+    Returns:
+        同load_previous_from_db，无历史文件时返回None
+    """
+    for folder, found, suffix in _csv_batches(board_type, result_dir):
+        if found == exclude or (stamp is not None and found != stamp):
+            continue
+        code_path = path_join(folder, f'成分股_{found}{suffix}')
+
+        previous = {}
+        with open_csv(path_join(folder, f'板块信息_{found}{suffix}')) as f:
+            rows = csv_reader(f)
+            next(rows, None)
+            for row in rows:
+                if len(row) < 5:
+                    continue
+                previous[row[1]] = {
+                    'source_url': row[2],
+                    'stock_count': parse_count(row[4]),
+                    'stocks': StockTable()
+                }
+        with open_csv(code_path) as f:
+            rows = csv_reader(f)
+            next(rows, None)
+            for row in rows:
+                if len(row) < 4:
+                    continue
+                entry = previous.get(row[1])
+                if entry is not None:
+                    entry['stocks'].append(row[0], row[2], row[3])
+
+        logger.info(f"✓ 读取上一次CSV结果 {found}: {len(previous)} 个板块")
+        return previous
+
+    return None
+
+
+def load_previous_from_parquet(board_type: str, result_dir: str, exclude: str = None,
+                               stamp: str = None) -> Optional[dict]:
+    """
+    从Parquet输出目录读取最近一次的结果
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        result_dir: 结果根目录（result/）
+        exclude: 需要跳过的时间戳（本次运行的today）
+        stamp: 指定时间戳，不指定时读取最近一次
+
+    Returns:
+        同load_previous_from_db，无历史文件（或未安装pyarrow）时返回None
+    """
+    latest = load_latest_batch(board_type, result_dir, exclude, stamp)
+    if latest is None:
+        return None
+
+    stamp, info_table, code_table = latest
+    previous = {}
+    for row in info_table.to_pylist():
+        previous[row['板块名称']] = {
+            'source_url': row['来源链接'],
+            'stock_count': parse_count(row['成分股数量']),
+            'stocks': StockTable()
+        }
+    for row in code_table.to_pylist():
+        entry = previous.get(row['板块名称'])
+        if entry is not None:
+            entry['stocks'].append(row['原始序号'], row['股票代码'], row['股票名称'])
+
+    logger.info(f"✓ 读取上一次Parquet结果 {stamp}: {len(previous)} 个板块")
+    return previous
+
+
+def plan_incremental(board_data: dict, previous: dict, sample_rate: float = DEFAULT_SAMPLE_RATE,
+                     count_tolerance: float = DEFAULT_COUNT_TOLERANCE) -> tuple[list[str], list[str], list[str]]:
+    """
+    划分需要重新抓取和可以沿用的板块
+
+    Args:
+        board_data: 本次列表页结果 {板块名称: BoardRecord}
+        previous: 上一批次结果（load_previous_*的返回值）
+        sample_rate: 未变化板块中随机抽样重抓的比例
+        count_tolerance: 上一批次成分股数（去重后）与其成分股数量允许的相对偏差，与BatchIntegrity相同
+
+    Returns:
+        (to_crawl, to_copy, sampled): 需要抓取的板块、沿用上一批次的板块、抽样校验的板块
+    """
+    changed = []
+    unchanged = []
+    for name, record in board_data.items():
+        entry = previous.get(name)
+        if (entry is None or not entry['stocks'] or record.count is None
+                or entry['source_url'] != record.link or entry['stock_count'] != record.count
+                # 上一批次成分股数超出完整性校验的容差（残缺数据），不能沿用
+                or abs(len(set(entry['stocks'].codes)) - record.count) > record.count * count_tolerance):
+            changed.append(name)
+        else:
+            unchanged.append(name)
+
+    sample_size = min(len(unchanged), round(len(unchanged) * sample_rate))
+    sampled = random.sample(unchanged, sample_size) if sample_size else []
+    sampled_set = set(sampled)
+    to_copy = [name for name in unchanged if name not in sampled_set]
+
+    return changed + sampled, to_copy, sampled
+
+
+def verify_sample(current: dict, previous: dict, sampled: list[str]) -> list[str]:
+    """
+    对比抽样板块重抓结果与上一批次
+
+    Args:
+        current: 抽样板块本次抓取的成分股 {板块名称: StockTable}，未完成为None
+        previous: 上一批次结果
+        sampled: 抽样校验的板块
+
+    Returns:
+        成分股发生变化的板块（数量和链接未变但成员不同）
+    """
+    drifted = []
+    for name in sampled:
+        stocks = current.get(name)
+        if stocks is None:
+            continue
+        if set(stocks.codes) != set(previous[name]['stocks'].codes):
+            drifted.append(name)
+    return drifted
@@ -19,6 +19,7 @@ CREATE TABLE IF NOT EXISTS `爬取记录` (
   `抓取时间` DATETIME NOT NULL COMMENT '本次抓取开始时间',
   `结束时间` DATETIME DEFAULT NULL COMMENT '本次抓取结束时间',
   `爬取耗时秒数` DECIMAL(10,2) DEFAULT NULL COMMENT '总耗时（秒）',
+  `请求速率` DECIMAL(10,3) DEFAULT NULL COMMENT '本次抓取收敛的请求速率（次/秒）',
   `板块总数` INT DEFAULT 0 COMMENT '本次抓取的板块总数',
   `股票总数` INT DEFAULT 0 COMMENT '本次抓取的股票总数（去重）',
   `执行状态` ENUM('进行中', '成功', '失败') DEFAULT '进行中' COMMENT '执行状态',
@@ -58,6 +59,36 @@ CREATE TABLE IF NOT EXISTS `成分股` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='板块成分股明细表';
 
+-- 成分股区间（[database] stock_storage = "interval" 时使用）
+-- 某批次的完整成分股: 起始批次ID <= 批次 AND (截止批次ID IS NULL OR 截止批次ID > 批次)
+CREATE TABLE IF NOT EXISTS `成分股区间` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '所属板块名称',
+  `股票代码` VARCHAR(10) NOT NULL COMMENT '股票代码（如600000）',
+  `股票名称` VARCHAR(100) NOT NULL COMMENT '股票名称（如浦发银行）',
+  `原始序号` INT DEFAULT NULL COMMENT '区间开始时在10jqka页面的原始排序',
+  `起始批次ID` INT NOT NULL COMMENT '首次出现的批次ID（含）',
+  `截止批次ID` INT DEFAULT NULL COMMENT '不再出现的批次ID（不含），NULL表示仍有效',
+  INDEX `idx_区间` (`起始批次ID`, `截止批次ID`),
+  INDEX `idx_有效板块` (`截止批次ID`, `板块名称`),
+  INDEX `idx_股票代码` (`股票代码`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股区间表（只记录成员变化）';
+
+-- 板块重叠（analytics.py 计算的每个板块相似度最高的K个相关板块）
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `批次ID` INT NOT NULL COMMENT '关联的批次ID',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '板块名称',
+  `相关板块` VARCHAR(100) NOT NULL COMMENT '有共同成分股的板块名称',
+  `共同成分股数` INT NOT NULL COMMENT '两个板块共同的成分股数',
+  `相似度` DECIMAL(7,6) NOT NULL COMMENT 'Jaccard相似度（共同成分股数/两板块成分股并集）',
+  `排名` SMALLINT NOT NULL COMMENT '在该板块的相关板块中的排名（从1开始）',
+  FOREIGN KEY (`批次ID`) REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  INDEX `idx_批次板块` (`批次ID`, `板块名称`, `排名`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股重叠表';
+
 -- ============================================
 -- 数据库2: 概念板块
 -- ============================================
@@ -73,6 +104,7 @@ CREATE TABLE IF NOT EXISTS `爬取记录` (
   `抓取时间` DATETIME NOT NULL COMMENT '本次抓取开始时间',
   `结束时间` DATETIME DEFAULT NULL COMMENT '本次抓取结束时间',
   `爬取耗时秒数` DECIMAL(10,2) DEFAULT NULL COMMENT '总耗时（秒）',
+  `请求速率` DECIMAL(10,3) DEFAULT NULL COMMENT '本次抓取收敛的请求速率（次/秒）',
   `板块总数` INT DEFAULT 0 COMMENT '本次抓取的板块总数',
   `股票总数` INT DEFAULT 0 COMMENT '本次抓取的股票总数（去重）',
   `执行状态` ENUM('进行中', '成功', '失败') DEFAULT '进行中' COMMENT '执行状态',
@@ -110,6 +142,36 @@ CREATE TABLE IF NOT EXISTS `成分股` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='板块成分股明细表';
 
+-- 成分股区间（[database] stock_storage = "interval" 时使用）
+-- 某批次的完整成分股: 起始批次ID <= 批次 AND (截止批次ID IS NULL OR 截止批次ID > 批次)
+CREATE TABLE IF NOT EXISTS `成分股区间` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '所属板块名称',
+  `股票代码` VARCHAR(10) NOT NULL COMMENT '股票代码（如600000）',
+  `股票名称` VARCHAR(100) NOT NULL COMMENT '股票名称（如浦发银行）',
+  `原始序号` INT DEFAULT NULL COMMENT '区间开始时在10jqka页面的原始排序',
+  `起始批次ID` INT NOT NULL COMMENT '首次出现的批次ID（含）',
+  `截止批次ID` INT DEFAULT NULL COMMENT '不再出现的批次ID（不含），NULL表示仍有效',
+  INDEX `idx_区间` (`起始批次ID`, `截止批次ID`),
+  INDEX `idx_有效板块` (`截止批次ID`, `板块名称`),
+  INDEX `idx_股票代码` (`股票代码`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股区间表（只记录成员变化）';
+
+-- 板块重叠（analytics.py 计算的每个板块相似度最高的K个相关板块）
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `批次ID` INT NOT NULL COMMENT '关联的批次ID',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '板块名称',
+  `相关板块` VARCHAR(100) NOT NULL COMMENT '有共同成分股的板块名称',
+  `共同成分股数` INT NOT NULL COMMENT '两个板块共同的成分股数',
+  `相似度` DECIMAL(7,6) NOT NULL COMMENT 'Jaccard相似度（共同成分股数/两板块成分股并集）',
+  `排名` SMALLINT NOT NULL COMMENT '在该板块的相关板块中的排名（从1开始）',
+  FOREIGN KEY (`批次ID`) REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  INDEX `idx_批次板块` (`批次ID`, `板块名称`, `排名`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股重叠表';
+
 -- ============================================
 -- 数据库3: 地域板块
 -- ============================================
@@ -125,6 +187,7 @@ CREATE TABLE IF NOT EXISTS `爬取记录` (
   `抓取时间` DATETIME NOT NULL COMMENT '本次抓取开始时间',
   `结束时间` DATETIME DEFAULT NULL COMMENT '本次抓取结束时间',
   `爬取耗时秒数` DECIMAL(10,2) DEFAULT NULL COMMENT '总耗时（秒）',
+  `请求速率` DECIMAL(10,3) DEFAULT NULL COMMENT '本次抓取收敛的请求速率（次/秒）',
   `板块总数` INT DEFAULT 0 COMMENT '本次抓取的板块总数',
   `股票总数` INT DEFAULT 0 COMMENT '本次抓取的股票总数（去重）',
   `执行状态` ENUM('进行中', '成功', '失败') DEFAULT '进行中' COMMENT '执行状态',
@@ -162,9 +225,39 @@ CREATE TABLE IF NOT EXISTS `成分股` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='板块成分股明细表';
 
+-- 成分股区间（[database] stock_storage = "interval" 时使用）
+-- 某批次的完整成分股: 起始批次ID <= 批次 AND (截止批次ID IS NULL OR 截止批次ID > 批次)
+CREATE TABLE IF NOT EXISTS `成分股区间` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '所属板块名称',
+  `股票代码` VARCHAR(10) NOT NULL COMMENT '股票代码（如600000）',
+  `股票名称` VARCHAR(100) NOT NULL COMMENT '股票名称（如浦发银行）',
+  `原始序号` INT DEFAULT NULL COMMENT '区间开始时在10jqka页面的原始排序',
+  `起始批次ID` INT NOT NULL COMMENT '首次出现的批次ID（含）',
+  `截止批次ID` INT DEFAULT NULL COMMENT '不再出现的批次ID（不含），NULL表示仍有效',
+  INDEX `idx_区间` (`起始批次ID`, `截止批次ID`),
+  INDEX `idx_有效板块` (`截止批次ID`, `板块名称`),
+  INDEX `idx_股票代码` (`股票代码`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股区间表（只记录成员变化）';
+
+-- 板块重叠（analytics.py 计算的每个板块相似度最高的K个相关板块）
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `批次ID` INT NOT NULL COMMENT '关联的批次ID',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '板块名称',
+  `相关板块` VARCHAR(100) NOT NULL COMMENT '有共同成分股的板块名称',
+  `共同成分股数` INT NOT NULL COMMENT '两个板块共同的成分股数',
+  `相似度` DECIMAL(7,6) NOT NULL COMMENT 'Jaccard相似度（共同成分股数/两板块成分股并集）',
+  `排名` SMALLINT NOT NULL COMMENT '在该板块的相关板块中的排名（从1开始）',
+  FOREIGN KEY (`批次ID`) REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  INDEX `idx_批次板块` (`批次ID`, `板块名称`, `排名`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股重叠表';
+
 -- ============================================
 -- 初始化完成
 -- ============================================
 SELECT '数据库初始化完成！' AS 状态,
        '已创建3个数据库：同花顺行业板块、概念板块、地域板块' AS 说明,
-       '每个库包含3张表：爬取记录、板块信息、成分股' AS 详情;
+       '每个库包含5张表：爬取记录、板块信息、成分股、成分股区间、板块重叠' AS 详情;
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+抓取日志模块
+每个板块类型的每个批次一个追加写入的JSONL文件，记录已完成的列表页和已完成的板块（含成分股）；
+进程被中断或崩溃后 main.py --resume 读回日志，跳过已完成的部分并继续同一个批次
+"""
+
+import json
+import logging
+from os import listdir, makedirs, remove
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from database import BOARD_CONFIGS
+from encrypt import path_join, exists
+from records import StockTable
+from table_parser import IndexRow
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_DIR = 'journal'
+
+
+class JournalState(NamedTuple):
+    """读回的抓取日志"""
+    path: str
+    board_type: str
+    batch_id: Optional[int]                 # 数据库批次ID（文件存储模式为None）
+    stamp: str                              # 批次时间戳（输出文件名）
+    pages: dict[int, list[IndexRow]]        # 已完成的列表页
+    boards: dict[str, StockTable]           # 已完成的板块
+
+
+def journal_path(journal_dir: str, board_type: str, stamp: str) -> str:
+    """
+    抓取日志路径
+
+    Args:
+        journal_dir: 日志目录
+        board_type: 板块类型（同花顺行业/概念/地域）
+        stamp: 批次时间戳
+
+    Returns:
+        <journal_dir>/<库名>_<时间戳>.jsonl
+    """
+    return path_join(journal_dir, f'{BOARD_CONFIGS[board_type]["database"]}_{stamp}.jsonl')
+
+
+class CrawlJournal:
+    """一个批次的抓取日志（线程安全，每条记录一行JSON，写入后立即flush）"""
+
+    def __init__(self, path: str):
+        """
+        打开日志（追加写入）
+
+        Args:
+            path: 日志路径
+        """
+        self.path = path
+        self._lock = Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    @classmethod
+    def create(cls, journal_dir: str, board_type: str, batch_id: Optional[int], stamp: str) -> 'CrawlJournal':
+        """
+        为新批次创建日志并写入批次信息
+
+        Args:
+            journal_dir: 日志目录
+            board_type: 板块类型
+            batch_id: 数据库批次ID（文件存储模式为None）
+            stamp: 批次时间戳
+        """
+        makedirs(journal_dir, exist_ok=True)
+        journal = cls(journal_path(journal_dir, board_type, stamp))
+        journal._append({'type': 'batch', 'board_type': board_type, 'batch_id': batch_id, 'stamp': stamp})
+        return journal
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file.closed:
+                # 日志关闭后不应再有任务完成（中断时先等待在途任务），丢弃会让--resume漏掉已写入的数据
+                raise RuntimeError(f"抓取日志已关闭: {self.path}")
+            self._file.write(line)
+            self._file.flush()
+
+    def page(self, index: int, rows: list[IndexRow]) -> None:
+        """记录一个已完成的列表页"""
+        self._append({'type': 'page', 'page': index, 'rows': [list(row) for row in rows]})
+
+    def board(self, name: str, stocks: StockTable) -> None:
+        """记录一个已完成的板块（成分股按列保存）"""
+        self._append({
+            'type': 'board', 'name': name,
+            'seqs': stocks.seqs.tolist(), 'codes': stocks.codes, 'names': stocks.names
+        })
+
+    def close(self) -> None:
+        """关闭日志（保留文件，供--resume使用）"""
+        with self._lock:
+            self._file.close()
+
+    def remove(self) -> None:
+        """批次已结束，删除日志"""
+        self.close()
+        if exists(self.path):
+            remove(self.path)
+
+
+def load_journal(path: str) -> Optional[JournalState]:
+    """
+    读回抓取日志（崩溃时最后一行可能只写了一半，忽略无法解析的行）
+
+    Args:
+        path: 日志路径
+
+    Returns:
+        JournalState，没有批次信息时返回None
+    """
+    header = None
+    pages: dict[int, list[IndexRow]] = {}
+    boards: dict[str, StockTable] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"忽略抓取日志中不完整的第 {number} 行: {path}")
+                continue
+            kind = record.get('type')
+            if kind == 'batch':
+                header = record
+            elif kind == 'page':
+                pages[record['page']] = [IndexRow(*row) for row in record['rows']]
+            elif kind == 'board':
+                boards[record['name']] = StockTable.from_rows(
+                    zip(record['seqs'], record['codes'], record['names']))
+
+    if header is None:
+        return None
+    return JournalState(path, header['board_type'], header['batch_id'], header['stamp'], pages, boards)
+
+
+def find_journal(journal_dir: str, board_type: str) -> Optional[str]:
+    """
+    板块类型最近一次未完成批次的日志
+
+    Args:
+        journal_dir: 日志目录
+        board_type: 板块类型（同花顺行业/概念/地域）
+
+    Returns:
+        日志路径，没有时返回None
+    """
+    if not exists(journal_dir):
+        return None
+    prefix = f'{BOARD_CONFIGS[board_type]["database"]}_'
+    names = sorted(name for name in listdir(journal_dir) if name.startswith(prefix) and name.endswith('.jsonl'))
+    return path_join(journal_dir, names[-1]) if names else None
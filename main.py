@@ -5,51 +5,65 @@
 完全重构版本：3数据库架构 + 全中文化 + 可选抓取
 """
 
-from requests import Session
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from requests.utils import cookiejar_from_dict, dict_from_cookiejar
+from requests.utils import cookiejar_from_dict
 from re import compile
 from time import sleep, time
 from json import loads, dumps
 from cookies import _10jqka_Cookies, PATH, path_join, mkdir, exists, getpid
 from datetime import datetime
-from csv import writer as csv_writer
-from threading import Thread, Lock, Event, Semaphore
+from os import remove
+from threading import Lock, Event, Semaphore
 from random import gauss
+from functools import partial
+from aiohttp import ClientSession, ClientTimeout, ClientError, TCPConnector, DummyCookieJar
+import asyncio
 import signal
 import sys
 import toml
-from database import Database, BOARD_CONFIGS
+from database import Database, ConnectionPool, BOARD_CONFIGS
+from sqlite_database import SQLiteDatabase
 from socket_manager import SocketProxyManager
+from worker_pool import WorkerPool, GroupScheduler
+from rate_controller import RateController
+from session_pool import CookieStore, SessionPool, make_session
+from table_parser import IndexRow, CodeRow, parse_index_rows, parse_code_rows, page_count
+from records import BoardRecord, StockTable
+from board_writer import (
+    BoardWriter, BatchIntegrity, CSVSink, MySQLSink, CSV_SUFFIXES, csv_compression_available,
+    DEFAULT_FLUSH_BOARDS, DEFAULT_FLUSH_INTERVAL, DEFAULT_WRITER_THREADS, DEFAULT_COUNT_TOLERANCE
+)
+from incremental import (
+    DEFAULT_SAMPLE_RATE, load_previous_from_db, load_previous_from_csv, load_previous_from_parquet,
+    plan_incremental, verify_sample
+)
+from distributed import LeaseCoordinator, run_worker, parse_address, DEFAULT_LEASE_PAGES, DEFAULT_LEASE_TIMEOUT
+from journal import CrawlJournal, JournalState, DEFAULT_JOURNAL_DIR, find_journal, load_journal
+import parquet_store
+import analytics
 
 # 全局停止标志
 shutdown_event = Event()
 # 并发限制信号量
 connection_semaphore = None
 # 数据库实例字典（每个板块类型一个）
-db_instances: dict[str, Database] = {}
+db_instances: dict[str, Database | SQLiteDatabase] = {}
+# 各板块数据库共用的连接池
+db_pool: ConnectionPool = None
 socket_manager = None
+# 常驻工作线程池（thread引擎，整个运行期间复用）
+worker_pool: WorkerPool = None
 storage_mode = 'csv'
 # 当前批次ID字典
 current_batch_ids: dict[str, int] = {}
+# 各板块类型共用的任务调度器（thread引擎，按板块类型轮流把任务交给worker_pool）
+crawl_scheduler: GroupScheduler = None
 
 def signal_handler(signum, frame):
-    """处理Ctrl+C信号，优雅退出"""
-    global db_instances, socket_manager, current_batch_ids
+    """处理Ctrl+C信号，优雅退出（本批次写入的数据由finish_crawl清理，批次标记为失败）"""
+    global socket_manager
     print('\n\033[93m正在停止爬虫，请稍候...\033[0m')
     shutdown_event.set()
 
-    # 清理各数据库中断数据
-    for board_type, db in db_instances.items():
-        if board_type in current_batch_ids:
-            try:
-                log(f'正在清理 {board_type} 的不完整数据...', 'WARN')
-                db.rollback()
-                db.delete_batch_data(current_batch_ids[board_type])
-            except Exception as e:
-                log(f'清理 {board_type} 数据失败: {e}', 'ERROR')
-
     # 停止Socket代理
     if socket_manager:
         try:
@@ -69,6 +83,18 @@ MAX_ACCESS_DENIED_RETRIES = 16
 DEFAULT_INTERVAL = 1
 DEFAULT_THREAD_COUNT = 16
 DEFAULT_TIMEOUT = 10
+DEFAULT_ENGINE = 'thread'
+DEFAULT_ASYNC_CONCURRENCY = 256
+DEFAULT_V_WORKERS = 4
+DEFAULT_V_POOL_SIZE = 64
+DEFAULT_V_MAX_AGE = 10
+DEFAULT_MAX_RATE = 100
+DEFAULT_BASE_URL = 'https://q.10jqka.com.cn'
+MAX_ASYNC_CONCURRENCY = 8192
+# worker交回的总页数上限（异常的结果不会因此生成大量任务）
+MAX_LEASED_PAGES = 1000
+# 存储模式：auto为MySQL可用时用MySQL，否则CSV
+STORAGE_MODES = ('auto', 'mysql', 'sqlite', 'csv', 'parquet')
 
 # 板块编号映射
 BOARD_NUMBER_MAP = {
@@ -77,12 +103,8 @@ BOARD_NUMBER_MAP = {
     3: '地域'
 }
 
-# 全局变量
-total_count = 0
-cur_count = 0
-lock = Lock()
-board_data: dict[str, list] = dict()
-failed_items: list[str] = []
+# 全局请求速率控制（所有抓取路径共享，启动时按配置/上次批次重新初始化）
+rate_controller = RateController(DEFAULT_THREAD_COUNT / DEFAULT_INTERVAL)
 
 today = datetime.now().strftime("%Y%m%d%H%M%S")
 today_date = datetime.now().strftime("%Y%m%d")
@@ -92,6 +114,18 @@ user = b''
 pwd = b''
 thread_count = DEFAULT_THREAD_COUNT
 timeout = DEFAULT_TIMEOUT
+# 抓取引擎: thread（线程池）/ async（单事件循环协程）
+engine = DEFAULT_ENGINE
+async_concurrency = DEFAULT_ASYNC_CONCURRENCY
+# 增量模式：只重新抓取成分股数量/链接有变化的板块
+incremental = False
+incremental_sample = DEFAULT_SAMPLE_RATE
+# 断点续抓：从抓取日志继续上次中断的批次
+resume = False
+# 行情站点地址（--base-url 指向replay.py回放服务器时用于离线测试）
+base_url = DEFAULT_BASE_URL
+# 请求观察者: fn(url, status, content, elapsed)，用于录制和基准测试统计
+request_observers: list = []
 
 def log(msg: str, level: str = 'INFO') -> None:
     """带时间戳的日志输出"""
@@ -124,592 +158,1607 @@ def random_sleep(base: float = None) -> bool:
     return True
 
 # 正则表达式模式
-tbody_pattern = compile(r'<tbody>([\w\W]+?)</tbody>')
-tr_pattern = compile(r'<tr>([\w\W]+?)</tr>')
-date_pattern = compile(r'<td>([0-9-]{10})</td>')
-link_pattern = compile(r'<td>.+?href="(.+?)".+?>(.+?)</a></td>')
-total_pattern = compile(r'</td>[\w\W]+?<td>([0-9]+?)</td>')
-page_info = compile(r'page_info.+?/([0-9]+?)<')
 page_id = compile(r'code/([0-9]+?)/')
-seq_pattern = compile(r'<td>([0-9]+?)</td>[\w\W]+?_blank')
-code_name = compile(r'<td>.+?_blank">(.+?)</a>')
 
 # HTTP会话配置
-session = Session()
-adapter = HTTPAdapter(
-    pool_connections=64,
-    pool_maxsize=64,
-    max_retries=Retry(
-        total=3,
-        backoff_factor=0.3,
-        status_forcelist=[500, 502, 503, 504]
-    )
-)
-session.mount('http://', adapter)
-session.mount('https://', adapter)
-
-session.headers = {
+HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
         'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
     'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
     'Origin': 'https://upass.10jqka.com.cn',
     'Referer': 'https://upass.10jqka.com.cn/'
 }
+# 登录/校验专用会话（抓取请求使用session_pool中各线程自己的Session）
+session = make_session(HEADERS)
 cookies_obj = None
 
 with open(path_join(PATH, 'cookies.json'), 'r') as f:
-    session.cookies = cookiejar_from_dict(loads(f.read()))
+    cookie_store = CookieStore(loads(f.read()))
+session.cookies = cookiejar_from_dict(cookie_store.snapshot()[1])
+session_pool = SessionPool(cookie_store, HEADERS)
 
 
-def prepare_board_data() -> tuple[list[dict], list[dict]]:
-    """
-    从全局board_data准备板块和股票数据,并进行去重处理
+def observe_response(resp, *args, **kwargs) -> None:
+    """requests响应钩子：通知request_observers"""
+    for observer in request_observers:
+        observer(resp.url, resp.status_code, resp.content, resp.elapsed.total_seconds())
 
-    Returns:
-        (boards, stocks) 元组
-    """
-    global board_data
 
-    boards = []
-    stocks = []
-    seen_boards = set()
+session_pool.add_response_hook(observe_response)
+# 串行化重新登录
+login_lock = Lock()
 
-    for key, value in board_data.items():
-        if key in seen_boards:
-            continue
-        seen_boards.add(key)
 
-        board = {
-            'board_name': key,
-            'source_url': value[1] if len(value) > 1 else None,
-            'driving_event': value[2] if len(value) > 2 and value[2] != '--' else None,
-            'stock_count': value[3] if len(value) > 3 and value[3] != '--' else None
-        }
-        boards.append(board)
+def result_folder(board_type: str, stamp: str = None) -> str:
+    """
+    创建输出目录（v2.0.0新文件夹结构: result/同花顺行业板块/20251123/）
 
-        if len(value) > 4:
-            seen_stocks = set()
-            for stock in value[4]:
-                stock_code = stock[1]
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        stamp: 批次时间戳，默认本次运行的today（续抓时为原批次的时间戳）
 
-                if stock_code in seen_stocks:
-                    continue
-                seen_stocks.add(stock_code)
+    Returns:
+        本次运行的日期目录
+    """
+    result_base = path_join(PATH, 'result')
+    if not exists(result_base):
+        mkdir(result_base)
 
-                stocks.append({
-                    'board_name': key,
-                    'sequence_num': stock[0],
-                    'stock_code': stock_code,
-                    'stock_name': stock[2]
-                })
+    board_folder = path_join(result_base, BOARD_CONFIGS[board_type]['database'])
+    if not exists(board_folder):
+        mkdir(board_folder)
 
-    return boards, stocks
+    date_folder = path_join(board_folder, stamp[:8] if stamp else today_date)
+    if not exists(date_folder):
+        mkdir(date_folder)
+    return date_folder
 
 
-def save_to_mysql(boards: list[dict], stocks: list[dict], board_type: str, batch_id: int, db: Database) -> None:
+def csv_paths(board_type: str, compression: str = 'none', stamp: str = None) -> tuple[str, str, str]:
     """
-    保存数据到MySQL数据库（v2.0.0新架构）
+    创建CSV输出目录
 
     Args:
-        boards: 板块信息列表
-        stocks: 股票信息列表
         board_type: 板块类型（同花顺行业/概念/地域）
-        batch_id: 批次ID
-        db: Database实例
+        compression: none/gzip/zstd，决定文件后缀
+        stamp: 批次时间戳，默认today
+
+    Returns:
+        (板块信息CSV路径, 成分股CSV路径, 清单JSON路径)
     """
-    try:
-        with db.transaction():
-            # 插入板块和股票数据（使用中文字段名）
-            db.insert_boards(batch_id, boards)
-            db.insert_stocks(batch_id, stocks)
+    stamp = stamp or today
+    date_folder = result_folder(board_type, stamp)
+    suffix = CSV_SUFFIXES[compression]
+    return (path_join(date_folder, f'板块信息_{stamp}{suffix}'),
+            path_join(date_folder, f'成分股_{stamp}{suffix}'),
+            path_join(date_folder, f'清单_{stamp}.json'))
 
-        # 数据完整性校验
-        is_valid, error_msg = db.validate_batch_integrity(batch_id)
-        if not is_valid:
-            log(f'✗ {board_type} 数据完整性校验失败: {error_msg}', 'ERROR')
-            db.delete_batch_data(batch_id)
-            raise ValueError(f"数据完整性校验失败: {error_msg}")
 
-        log(f'✓ {board_type} MySQL保存成功: {len(boards)} 个板块, {len(stocks)} 只股票')
+def parquet_paths(board_type: str, stamp: str = None) -> tuple[str, str]:
+    """
+    创建Parquet输出目录（与CSV相同）
 
-    except Exception as e:
-        log(f'{board_type} MySQL保存失败: {e}', 'ERROR')
-        raise
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        stamp: 批次时间戳，默认today
+
+    Returns:
+        (板块信息Parquet路径, 成分股Parquet路径)
+    """
+    stamp = stamp or today
+    date_folder = result_folder(board_type, stamp)
+    return path_join(date_folder, f'板块信息_{stamp}.parquet'), path_join(date_folder, f'成分股_{stamp}.parquet')
 
 
-def save_to_csv(board_type: str, config: dict) -> None:
+def open_board_writer(board_type: str, config: dict, batch_id: int | None, stamp: str = None) -> BoardWriter:
     """
-    保存数据到CSV文件（v2.0.0新文件夹结构）
+    按存储模式创建写入线程
 
     Args:
         board_type: 板块类型（同花顺行业/概念/地域）
         config: 配置字典
-    """
-    global today, today_date, board_data
-
-    if not (config['scraper']['enable_csv_backup'] or storage_mode == 'csv'):
-        return
-
-    # 新的CSV文件夹结构: result/同花顺行业板块/20251123/
-    result_base = path_join(PATH, 'result')
-    if not exists(result_base):
-        mkdir(result_base)
+        batch_id: MySQL批次ID（非MySQL模式为None）
+        stamp: 输出文件的批次时间戳，默认today
 
-    board_folder = path_join(result_base, BOARD_CONFIGS[board_type]['database'])
-    if not exists(board_folder):
-        mkdir(board_folder)
+    Returns:
+        BoardWriter实例
+    """
+    sinks = []
+    if batch_id and board_type in db_instances:
+        sinks.append(MySQLSink(db_instances[board_type], batch_id))
+    if storage_mode == 'parquet':
+        sinks.append(parquet_store.ParquetSink(
+            *parquet_paths(board_type, stamp),
+            compression = config['scraper'].get('parquet_compression', parquet_store.DEFAULT_COMPRESSION)
+        ))
+    elif config['scraper']['enable_csv_backup'] or storage_mode == 'csv':
+        compression = config['scraper'].get('csv_compression', 'none')
+        info_path, code_path, manifest_path = csv_paths(board_type, compression, stamp)
+        sinks.append(CSVSink(
+            info_path, code_path,
+            compression = compression,
+            flush_interval = config['scraper'].get('csv_flush_interval', 0),
+            manifest_path = manifest_path
+        ))
+    return BoardWriter(
+        sinks,
+        flush_boards = config['scraper'].get('writer_flush_boards', DEFAULT_FLUSH_BOARDS),
+        flush_interval = config['scraper'].get('writer_flush_interval', DEFAULT_FLUSH_INTERVAL),
+        threads = config['scraper'].get('writer_threads', DEFAULT_WRITER_THREADS),
+        integrity = BatchIntegrity(config['scraper'].get('integrity_count_tolerance', DEFAULT_COUNT_TOLERANCE))
+    )
 
-    date_folder = path_join(board_folder, today_date)
-    if not exists(date_folder):
-        mkdir(date_folder)
 
-    info_path = path_join(date_folder, f'板块信息_{today}.csv')
-    code_path = path_join(date_folder, f'成分股_{today}.csv')
+def index_url(url_type: str, index: int) -> str:
+    """
+    构造板块列表页URL
 
-    info_exists = exists(info_path)
-    code_exists = exists(code_path)
+    Args:
+        url_type: URL类型（thshy/gn/dy）
+        index: 页码索引
 
-    with open(info_path, 'a', encoding='utf-8') as i_f, \
-         open(code_path, 'a', encoding='utf-8') as c_f:
-        info = csv_writer(i_f)
-        code = csv_writer(c_f)
+    Returns:
+        列表页URL
+    """
+    match url_type:
+        case 'gn':
+            return f'{base_url}/gn/index/field/addtime/order/desc/page/{index}/ajax/1/'
+        case 'thshy':
+            return f'{base_url}/thshy/index/field/199112/order/desc/page/{index}/ajax/1/'
+        case 'dy':
+            return f'{base_url}/dy/index/field/199112/order/desc/page/{index}/ajax/1/'
+        case _:
+            raise ValueError(f"Unknown url_type: {url_type}")
 
-        if not info_exists:
-            info.writerow(['日期', '板块名称', '来源链接', '驱动事件', '成分股量'])
-        if not code_exists:
-            code.writerow(['原始序号', '板块名称', '股票代码', '股票名称'])
 
-        info_arr = []
-        code_arr = []
-        for key, value in board_data.items():
-            arr = [value[0], key, value[1], value[2], value[3]]
-            info_arr.append(arr)
-            for v in value[4]:
-                code_arr.append([v[0], key, v[1], v[2]])
+def detail_url_prefix(url_type: str) -> str:
+    """
+    构造成分股详情页URL前缀
 
-        info.writerows(info_arr)
-        code.writerows(code_arr)
+    Args:
+        url_type: URL类型（thshy/gn/dy）
 
-    log(f'✓ {board_type} CSV保存成功: {info_path}')
+    Returns:
+        不含页码的URL前缀
+    """
+    match url_type:
+        case 'gn':
+            return f'{base_url}/gn/detail/field/199112/order/desc/page'
+        case 'thshy':
+            return f'{base_url}/thshy/detail/field/199112/order/desc/page'
+        case 'dy':
+            return f'{base_url}/dy/detail/field/199112/order/desc/page'
+        case _:
+            raise ValueError(f"Unknown url_type: {url_type}")
 
 
-def store(board_type: str, config: dict) -> None:
+class CrawlState:
+    """单个板块类型一次抓取的状态（替代原模块级的board_data/total_count/cur_count等，各板块类型可同时抓取）"""
+
+    def __init__(self, board_type: str, config: dict):
+        """
+        Args:
+            board_type: 板块类型（同花顺行业/概念/地域）
+            config: 配置字典
+        """
+        board_config = BOARD_CONFIGS[board_type]
+        self.board_type = board_type
+        self.config = config
+        self.url = board_config['url'].replace(DEFAULT_BASE_URL, base_url, 1)
+        self.url_type = board_config['url_type']
+        self.end_page = 1
+        self.batch_id: int | None = None
+        # 输出文件的批次时间戳（续抓时沿用原批次的时间戳）
+        self.stamp = today
+        # 抓取日志，以及续抓时从日志恢复的列表页和板块
+        self.journal: CrawlJournal | None = None
+        self.done_pages: set[int] = set()
+        self.resumed_boards: set[str] = set()
+        # 板块完成即交给写入线程（CSV/MySQL），board_data只保留列表页信息
+        self.writer: BoardWriter = None
+        self.board_data: dict[str, BoardRecord] = {}
+        self.names: list[str] = []
+        self.total_count = 0
+        self.cur_count = 0
+        self.failed_items: list[str] = []
+        # 增量模式：上一批次结果、抽样校验的板块及其重抓结果
+        self.previous: dict | None = None
+        self.sampled: list[str] = []
+        self.sampled_rows: dict[str, StockTable | None] = {}
+        # 当前阶段（列表页/详情页）的任务数和开始时间
+        self.stage = '列表页'
+        self.stage_tasks = 0
+        self.stage_start = time()
+        self.start_time = time()
+        self.error: Exception | None = None
+        self.lock = Lock()
+
+    def pending_pages(self) -> list[int]:
+        """尚未完成的列表页（续抓时跳过日志中已有的页）"""
+        return [index for index in range(1, self.end_page + 1) if index not in self.done_pages]
+
+    def mark_failed(self, name: str) -> None:
+        """记录抓取失败的板块"""
+        with self.lock:
+            if name not in self.failed_items:
+                self.failed_items.append(name)
+
+    def start_stage(self, stage: str, tasks: int) -> None:
+        """进入新的阶段"""
+        self.stage = stage
+        self.stage_tasks = tasks
+        self.stage_start = time()
+
+    def log_stage(self) -> None:
+        """输出当前阶段的任务数和耗时"""
+        log(f'{self.board_type} {self.stage}: {self.stage_tasks} 个任务完成，耗时 {time() - self.stage_start:.2f} 秒')
+
+
+def store_index_rows(state: CrawlState, rows: list[IndexRow], index: int = None) -> None:
     """
-    保存数据到MySQL和/或CSV（v2.0.0版本）
+    将列表页解析结果写入state.board_data
 
     Args:
-        board_type: 板块类型（同花顺行业/概念/地域）
-        config: 配置字典
+        state: 板块类型的抓取状态
+        rows: 列表页的板块行
+        index: 页码索引，给出时记入抓取日志（从日志恢复时为None）
     """
-    global db_instances, current_batch_ids
+    with state.lock:
+        for row in rows:
+            if row.name not in state.board_data:
+                state.board_data[row.name] = BoardRecord.from_row(row)
+    if index is not None and state.journal is not None:
+        state.journal.page(index, rows)
 
-    boards, stocks = prepare_board_data()
 
-    # MySQL存储
-    if storage_mode == 'mysql' and board_type in db_instances:
-        batch_id = current_batch_ids.get(board_type)
-        if batch_id:
-            save_to_mysql(boards, stocks, board_type, batch_id, db_instances[board_type])
+def fetch(state: CrawlState, index: int, max_retries: int = MAX_PAGE_RETRIES) -> None:
+    """
+    获取板块列表页的基本信息
 
-    # CSV存储
-    save_to_csv(board_type, config)
+    Args:
+        state: 板块类型的抓取状态
+        index: 页码索引
+        max_retries: 最大重试次数
+    """
+    rows = fetch_index(state.board_type, state.url_type, index, max_retries)
+    if rows is not None:
+        store_index_rows(state, rows, index)
 
 
-def fetch(index: int, url_type: str, max_retries: int = MAX_PAGE_RETRIES) -> None:
+def fetch_index(board_type: str, url_type: str, index: int, max_retries: int = MAX_PAGE_RETRIES) -> list[IndexRow] | None:
     """
-    获取板块列表页的基本信息
+    请求并解析单个列表页
 
     Args:
-        index: 页码索引
+        board_type: 板块类型（同花顺行业/概念/地域）
         url_type: URL类型（thshy/gn/dy）
+        index: 页码索引
         max_retries: 最大重试次数
+
+    Returns:
+        列表页的板块行，被中断或重试耗尽时返回None
     """
-    global session, board_data, interval, lock, cookies_obj
+    global interval, cookies_obj
 
-    print(f'\x1b[2K\rFetch {index} page.')
+    print(f'\x1b[2K\rFetch {board_type} {index} page.')
 
-    data = None
-    url = ''
-    match url_type:
-        case 'gn':
-            url = f'https://q.10jqka.com.cn/gn/index/field/addtime/order/desc/page/{index}/ajax/1/'
-        case 'thshy':
-            url = f'https://q.10jqka.com.cn/thshy/index/field/199112/order/desc/page/{index}/ajax/1/'
-        case 'dy':
-            url = f'https://q.10jqka.com.cn/dy/index/field/199112/order/desc/page/{index}/ajax/1/'
-        case _:
-            raise ValueError(f"Unknown url_type: {url_type}")
+    url = index_url(url_type, index)
 
     for retry in range(max_retries):
         if shutdown_event.is_set():
-            return
-        with lock:
-            session.cookies.set('v', cookies_obj.get_v())
+            return None
+        if not rate_controller.acquire(shutdown_event):
+            return None
         try:
-            resp = session.get(
+            http = session_pool.get()
+            http.cookies.set('v', cookies_obj.get_v())
+            resp = http.get(
                 url = url,
                 allow_redirects = False,
                 timeout = timeout
             )
+            rate_controller.record(resp.status_code)
 
-            data = tbody_pattern.findall(resp.content.decode('gbk', errors='ignore'))
-            if len(data) == 1:
-                break
+            rows = parse_index_rows(resp.content.decode('gbk', errors='ignore'))
+            if rows is not None:
+                return rows
             else:
                 if not random_sleep():
-                    return
+                    return None
         except (ConnectionError, TimeoutError) as e:
             print(f'\x1b[2K\r\x1b[91mNetwork error (retry {retry+1}/{max_retries}): {e}\x1b[0m')
             if not random_sleep():
-                return
+                return None
         except Exception as e:
             print(f'\x1b[2K\r\x1b[91mUnexpected error (retry {retry+1}/{max_retries}): {e}\x1b[0m')
             if not random_sleep():
+                return None
+
+    print(f'\x1b[2K\r\x1b[91mFetch {board_type} page {index} failed after {max_retries} retries\x1b[0m')
+    return None
+
+
+class BoardPages:
+    """单个板块的分页抓取状态，全部页完成后按原始序号重组成分股"""
+
+    def __init__(self, name: str, code: str, url_type: str, pages: int):
+        """
+        Args:
+            name: 板块名称
+            code: 板块代码
+            url_type: URL类型（thshy/gn/dy）
+            pages: 详情页总页数
+        """
+        self.name = name
+        self.code = code
+        self.url_type = url_type
+        self.pages = pages
+        self.failed_pages: list[int] = []
+        self._rows: dict[int, list[CodeRow]] = {}
+        self._lock = Lock()
+
+    def add(self, page: int, rows: list[CodeRow]) -> bool:
+        """
+        记录一页结果
+
+        Returns:
+            bool: True表示这是最后完成的一页
+        """
+        with self._lock:
+            self._rows[page] = rows
+            return len(self._rows) == self.pages
+
+    def assemble(self) -> StockTable:
+        """按原始序号合并所有页的成分股"""
+        result = StockTable.from_rows(row for page in sorted(self._rows) for row in self._rows[page])
+        result.sort()
+        return result
+
+
+def board_code(state: CrawlState, name: str) -> str | None:
+    """
+    从board_data中的来源链接提取板块代码
+
+    Args:
+        state: 板块类型的抓取状态
+        name: 板块名称
+
+    Returns:
+        板块代码，数据不完整时返回None
+    """
+    if name not in state.board_data:
+        print(f'[警告] {name} 数据结构不完整')
+        return None
+    page_ids = page_id.findall(state.board_data[name].link)
+    if not page_ids:
+        print(f'[警告] {name} 无法获取板块代码')
+        return None
+    return page_ids[0]
+
+
+def complete_board(state: CrawlState, board: BoardPages) -> None:
+    """
+    板块所有页抓取完成，交给写入线程（board_data只保留列表页信息）
+
+    有失败页的板块只写板块信息（与第1页失败的板块相同，批次完整性校验不通过），
+    不记入抓取日志，--resume时重新抓取。
+    写入队列满时put阻塞、抓取日志同步写入，async引擎经asyncio.to_thread调用
+    """
+    result = None if board.failed_pages else board.assemble()
+    with state.lock:
+        state.cur_count += 1
+        done = state.cur_count
+        if board.name in state.failed_items and result is not None:
+            state.failed_items.remove(board.name)
+        if board.name in state.sampled_rows:
+            state.sampled_rows[board.name] = result
+    if state.journal is not None and result is not None:
+        state.journal.board(board.name, result)
+    state.writer.put(board.name, state.board_data[board.name], result)
+
+    if result is None:
+        print(f'\x1b[2K\r\x1b[91m{state.board_type} {done}. {board.name} incomplete: '
+              f'{len(board.failed_pages)}/{board.pages} pages failed.\x1b[0m')
+    else:
+        print(f'\x1b[2K\r\x1b[92m{state.board_type} {done}. {board.name} fetch done.\x1b[0m')
+
+
+def fetch_code(code: str, page: int, url_type: str) -> str | None:
+    """
+    获取成分股详情页的单页HTML
+
+    Args:
+        code: 板块代码
+        page: 页码
+        url_type: URL类型（thshy/gn/dy）
+
+    Returns:
+        页面HTML，被中断或401/403重试耗尽时返回None
+    """
+    global cookies_obj, connection_semaphore
+
+    url_prefix = detail_url_prefix(url_type)
+
+    for code_retry in range(MAX_CODE_RETRIES):
+        if shutdown_event.is_set():
+            return None
+        if not rate_controller.acquire(shutdown_event):
+            return None
+        if connection_semaphore:
+            connection_semaphore.acquire()
+        try:
+            http = session_pool.get()
+            version = session_pool.current_version()
+            http.cookies.set('v', cookies_obj.get_v())
+            resp = http.get(
+                url = f'{url_prefix}/{page}/ajax/1/code/{code}/',
+                timeout = timeout,
+                allow_redirects = False
+            )
+        finally:
+            if connection_semaphore:
+                connection_semaphore.release()
+        rate_controller.record(resp.status_code)
+
+        if resp.status_code == 302:
+            check_cookies_valid(version)
+            continue
+
+        if resp.status_code == 401 or resp.status_code == 403:
+            if not random_sleep():
+                return None
+            continue
+
+        return resp.content.decode('gbk', errors='ignore')
+
+    return None
+
+
+def fetch_detail(state: CrawlState, name: str, max_retries: int = MAX_CODE_RETRIES) -> None:
+    """
+    获取板块第1页成分股，并把剩余页作为独立任务提交到调度器
+
+    第1页的page_info给出总页数，第2页及以后的页由fetch_detail_page并行抓取（排在本板块类型的队首），
+    最后完成的一页负责按原始序号重组并交给写入线程。
+
+    Args:
+        state: 板块类型的抓取状态
+        name: 板块名称
+        max_retries: 最大重试次数
+    """
+    global crawl_scheduler
+
+    code = board_code(state, name)
+    if code is None:
+        return
+
+    for attempt in range(max_retries):
+        try:
+            html = fetch_code(code, 1, state.url_type)
+            break
+        except Exception as e:
+            state.mark_failed(name)
+            print(f'\x1b[2K\r\x1b[91m{name} retry {attempt + 1}/{max_retries}: {e}\x1b[0m')
+            if not random_sleep(interval * 2):
+                return
+    else:
+        print(f'\x1b[2K\r\x1b[91m{name} failed after {max_retries} attempts\x1b[0m')
+        return
+
+    if html is None:
+        if not shutdown_event.is_set():
+            state.mark_failed(name)
+            print(f'\x1b[2K\r\x1b[91m{name} failed: access denied\x1b[0m')
+        return
+
+    pages = page_count(html) or 1
+    board = BoardPages(name, code, state.url_type, pages)
+
+    if board.add(1, parse_code_rows(html)):
+        complete_board(state, board)
+        return
+
+    crawl_scheduler.submit_many(
+        state, fetch_detail_page, [(state, board, page) for page in range(2, pages + 1)], urgent = True
+    )
+
+
+def fetch_detail_page(state: CrawlState, board: BoardPages, page: int, max_retries: int = MAX_CODE_RETRIES) -> None:
+    """
+    抓取板块的单个详情页（由fetch_detail拆分出的任务）
+
+    Args:
+        state: 板块类型的抓取状态
+        board: 板块分页状态
+        page: 页码
+        max_retries: 最大重试次数
+    """
+    print(
+        f'\x1b[2K\r{state.board_type} 总共需要获取: {state.total_count}\t'
+        f'失败项: [{', '.join(state.failed_items)}]\t'
+        f'{board.name}: {page}/{board.pages}', end = ''
+    )
+
+    rows: list[CodeRow] | None = None
+    for attempt in range(max_retries):
+        try:
+            html = fetch_code(board.code, page, board.url_type)
+            if html is None:
+                if shutdown_event.is_set():
+                    return
+                # 401/403重试耗尽：与重试次数用完相同，记为失败页（不能当作空页）
+                print(f'\x1b[2K\r\x1b[91m{board.name} page {page} failed: access denied\x1b[0m')
+                break
+            rows = parse_code_rows(html)
+            break
+        except Exception as e:
+            print(f'\x1b[2K\r\x1b[91m{board.name} page {page} retry {attempt + 1}/{max_retries}: {e}\x1b[0m')
+            if not random_sleep(interval * 2):
                 return
     else:
-        print(f'\x1b[2K\r\x1b[91mFetch page {index} failed after {max_retries} retries\x1b[0m')
+        print(f'\x1b[2K\r\x1b[91m{board.name} page {page} failed after {max_retries} attempts\x1b[0m')
+
+    if rows is None:
+        with state.lock:
+            board.failed_pages.append(page)
+        state.mark_failed(board.name)
+        rows = []
+
+    if board.add(page, rows):
+        complete_board(state, board)
+
+
+def check_cookies_valid(seen_version: int = None) -> None:
+    """
+    检查并刷新cookies有效性
+
+    重新登录成功后向cookie_store发布新版本，各工作线程下一次请求时自动同步。
+    多个线程同时遇到302时只有第一个会重新登录。
+
+    Args:
+        seen_version: 调用方发出请求时使用的Cookie版本，已有更新版本时直接返回
+    """
+    global session, cookies_obj, timeout
+
+    with login_lock:
+        if seen_version is not None and cookie_store.version != seen_version:
+            return
+        _check_cookies_valid()
+
+
+def _check_cookies_valid() -> None:
+    """check_cookies_valid的实现（调用方持有login_lock）"""
+    global session, cookies_obj, timeout
+
+    count = 0
+    while True:
+        if shutdown_event.is_set():
+            return
+        session.cookies.set('v', cookies_obj.get_v())
+        resp = session.get(
+            url = index_url('gn', 30),
+            allow_redirects = False,
+            timeout = timeout
+        )
+
+        if resp.status_code == 302:
+            print('Need to login')
+            if count > MAX_LOGIN_ATTEMPTS:
+                print('获取登录令牌达到最大尝试次数')
+                quit(1)
+
+            try:
+                cookies = cookies_obj.get_cookies()
+            except Exception as e:
+                print(f'获取cookies失败: {e}')
+                count += 1
+                continue
+
+            if cookies == dict():
+                print('Get cookies failed')
+                count += 1
+                continue
+
+            with open(path_join(PATH, 'cookies.json'), 'w') as f:
+                f.write(dumps(cookies))
+
+            session.cookies = cookiejar_from_dict(cookies)
+            cookie_store.publish(cookies)
+            break
+        elif resp.status_code > 400:
+            count += 1
+            if not random_sleep(2):
+                return
+            try:
+                ip_resp = session.get('https://4.ipw.cn', timeout=10)
+                new_ip = ip_resp.text.strip()
+            except Exception as e:
+                new_ip = f'获取失败({e})'
+            print(f'Access denied (重试 {count}/{MAX_ACCESS_DENIED_RETRIES}，新IP: {new_ip})')
+            if count > MAX_ACCESS_DENIED_RETRIES:
+                print('Access denied达到最大尝试次数')
+                quit(1)
+            continue
+        elif resp.status_code == 200:
+            print('Cookies valid!')
+            break
+
+
+async def async_random_sleep(base: float = None) -> bool:
+    """
+    random_sleep的协程版本，等待期间不占用线程
+
+    Args:
+        base: 基础延迟时间（秒），默认使用全局interval值
+
+    Returns:
+        bool: True表示正常完成，False表示被shutdown_event中断
+    """
+    if base is None:
+        base = interval
+    delay = max(0.1, gauss(base, base * 0.3))
+
+    elapsed = 0.0
+    step = 0.05
+    while elapsed < delay:
+        if shutdown_event.is_set():
+            return False
+        await asyncio.sleep(min(step, delay - elapsed))
+        elapsed += step
+    return True
+
+
+async def async_get(http: ClientSession, limiter: asyncio.Semaphore, url: str) -> tuple[int, bytes]:
+    """
+    异步GET请求，cookies取自cookie_store（重新登录后自动生效）
+
+    Args:
+        http: aiohttp会话
+        limiter: 在途请求数限制
+        url: 请求URL
+
+    Returns:
+        (状态码, 响应体)
+    """
+    _, cookies = cookie_store.snapshot()
+    # v值池有预生成的值时直接取用，池为空才进线程同步生成（不受默认线程池大小限制）
+    cookies['v'] = cookies_obj.get_v(generate = False) or await asyncio.to_thread(cookies_obj.get_v)
+    headers = {'Cookie': '; '.join(f'{k}={v}' for k, v in cookies.items())}
+    proxy = session.proxies.get('https') if session.proxies else None
+
+    if not await rate_controller.acquire_async(shutdown_event):
+        return 0, b''
+    async with limiter:
+        start = time()
+        async with http.get(url, headers = headers, proxy = proxy, allow_redirects = False) as resp:
+            rate_controller.record(resp.status)
+            content = await resp.read()
+    for observer in request_observers:
+        observer(url, resp.status, content, time() - start)
+    return resp.status, content
+
+
+async def fetch_async(http: ClientSession, limiter: asyncio.Semaphore, state: CrawlState,
+                      index: int, max_retries: int = MAX_PAGE_RETRIES) -> None:
+    """
+    fetch的协程版本：获取板块列表页的基本信息
+
+    Args:
+        http: aiohttp会话
+        limiter: 在途请求数限制
+        state: 板块类型的抓取状态
+        index: 页码索引
+        max_retries: 最大重试次数
+    """
+    print(f'\x1b[2K\rFetch {state.board_type} {index} page.')
+
+    rows = None
+    url = index_url(state.url_type, index)
+
+    for retry in range(max_retries):
+        if shutdown_event.is_set():
+            return
+        try:
+            _, content = await async_get(http, limiter, url)
+
+            rows = parse_index_rows(content.decode('gbk', errors='ignore'))
+            if rows is not None:
+                break
+            else:
+                if not await async_random_sleep():
+                    return
+        except (ClientError, asyncio.TimeoutError) as e:
+            print(f'\x1b[2K\r\x1b[91mNetwork error (retry {retry+1}/{max_retries}): {e!r}\x1b[0m')
+            if not await async_random_sleep():
+                return
+        except Exception as e:
+            print(f'\x1b[2K\r\x1b[91mUnexpected error (retry {retry+1}/{max_retries}): {e}\x1b[0m')
+            if not await async_random_sleep():
+                return
+    else:
+        print(f'\x1b[2K\r\x1b[91mFetch {state.board_type} page {index} failed after {max_retries} retries\x1b[0m')
+        return
+
+    # 抓取日志同步写入并flush，放到线程中执行
+    await asyncio.to_thread(store_index_rows, state, rows, index)
+
+
+async def fetch_code_async(http: ClientSession, limiter: asyncio.Semaphore,
+                           code: str, page: int, url_type: str) -> str | None:
+    """
+    fetch_code的协程版本：获取成分股详情页的单页HTML
+
+    Args:
+        http: aiohttp会话
+        limiter: 在途请求数限制
+        code: 板块代码
+        page: 页码
+        url_type: URL类型（thshy/gn/dy）
+
+    Returns:
+        页面HTML，被中断或401/403重试耗尽时返回None
+    """
+    url_prefix = detail_url_prefix(url_type)
+
+    for code_retry in range(MAX_CODE_RETRIES):
+        if shutdown_event.is_set():
+            return None
+        version = cookie_store.version
+        status, content = await async_get(http, limiter, f'{url_prefix}/{page}/ajax/1/code/{code}/')
+
+        # 等待速率控制时被中断（不能当作空页）
+        if status == 0:
+            return None
+
+        if status == 302:
+            await asyncio.to_thread(check_cookies_valid, version)
+            continue
+
+        if status == 401 or status == 403:
+            if not await async_random_sleep():
+                return None
+            continue
+
+        return content.decode('gbk', errors='ignore')
+
+    return None
+
+
+async def fetch_detail_page_async(http: ClientSession, limiter: asyncio.Semaphore, state: CrawlState,
+                                  board: BoardPages, page: int, max_retries: int = MAX_CODE_RETRIES) -> None:
+    """
+    fetch_detail_page的协程版本：抓取板块的单个详情页
+
+    Args:
+        http: aiohttp会话
+        limiter: 在途请求数限制
+        state: 板块类型的抓取状态
+        board: 板块分页状态
+        page: 页码
+        max_retries: 最大重试次数
+    """
+    print(
+        f'\x1b[2K\r{state.board_type} 总共需要获取: {state.total_count}\t'
+        f'失败项: [{', '.join(state.failed_items)}]\t'
+        f'{board.name}: {page}/{board.pages}', end = ''
+    )
+
+    rows: list[CodeRow] | None = None
+    for attempt in range(max_retries):
+        try:
+            html = await fetch_code_async(http, limiter, board.code, page, board.url_type)
+            if html is None:
+                if shutdown_event.is_set():
+                    return
+                # 401/403重试耗尽：与重试次数用完相同，记为失败页（不能当作空页）
+                print(f'\x1b[2K\r\x1b[91m{board.name} page {page} failed: access denied\x1b[0m')
+                break
+            rows = parse_code_rows(html)
+            break
+        except Exception as e:
+            print(f'\x1b[2K\r\x1b[91m{board.name} page {page} retry {attempt + 1}/{max_retries}: {e!r}\x1b[0m')
+            if not await async_random_sleep(interval * 2):
+                return
+    else:
+        print(f'\x1b[2K\r\x1b[91m{board.name} page {page} failed after {max_retries} attempts\x1b[0m')
+
+    if rows is None:
+        with state.lock:
+            board.failed_pages.append(page)
+        state.mark_failed(board.name)
+        rows = []
+
+    if board.add(page, rows):
+        await asyncio.to_thread(complete_board, state, board)
+
+
+async def fetch_detail_async(http: ClientSession, limiter: asyncio.Semaphore, state: CrawlState,
+                             name: str, max_retries: int = MAX_CODE_RETRIES) -> None:
+    """
+    fetch_detail的协程版本：获取第1页后并发抓取剩余页
+
+    Args:
+        http: aiohttp会话
+        limiter: 在途请求数限制
+        state: 板块类型的抓取状态
+        name: 板块名称
+        max_retries: 最大重试次数
+    """
+    code = board_code(state, name)
+    if code is None:
+        return
+
+    for attempt in range(max_retries):
+        try:
+            html = await fetch_code_async(http, limiter, code, 1, state.url_type)
+            break
+        except Exception as e:
+            state.mark_failed(name)
+            print(f'\x1b[2K\r\x1b[91m{name} retry {attempt + 1}/{max_retries}: {e!r}\x1b[0m')
+            if not await async_random_sleep(interval * 2):
+                return
+    else:
+        print(f'\x1b[2K\r\x1b[91m{name} failed after {max_retries} attempts\x1b[0m')
+        return
+
+    if html is None:
+        if not shutdown_event.is_set():
+            state.mark_failed(name)
+            print(f'\x1b[2K\r\x1b[91m{name} failed: access denied\x1b[0m')
+        return
+
+    pages = page_count(html) or 1
+    board = BoardPages(name, code, state.url_type, pages)
+
+    if board.add(1, parse_code_rows(html)):
+        await asyncio.to_thread(complete_board, state, board)
+        return
+
+    await asyncio.gather(*(
+        fetch_detail_page_async(http, limiter, state, board, page) for page in range(2, pages + 1)
+    ))
+
+
+def async_client() -> ClientSession:
+    """创建async引擎共享的aiohttp会话（Cookie由CookieStore统一提供）"""
+    return ClientSession(
+        headers = dict(session.headers),
+        connector = TCPConnector(limit = async_concurrency),
+        timeout = ClientTimeout(total = timeout),
+        cookie_jar = DummyCookieJar()
+    )
+
+
+async def crawl_state_async(http: ClientSession, limiter: asyncio.Semaphore, state: CrawlState) -> None:
+    """
+    一个板块类型的完整抓取流程（--engine async）：列表页 → 增量计划 → 详情页 → 收尾
+
+    计划和收尾（读取上一批次、关闭写入线程、更新批次状态）在线程中执行，不阻塞其他板块类型的协程
+
+    Args:
+        http: aiohttp会话（各板块类型共用）
+        limiter: 在途请求数限制（各板块类型共用）
+        state: 板块类型的抓取状态
+    """
+    try:
+        pages = state.pending_pages()
+        state.start_stage('列表页', len(pages))
+        await asyncio.gather(*(fetch_async(http, limiter, state, index) for index in pages))
+        state.log_stage()
+
+        await asyncio.to_thread(plan_detail_crawl, state)
+        state.start_stage('详情页', len(state.names))
+        await asyncio.gather(*(
+            fetch_detail_async(http, limiter, state, name) for name in state.names
+        ))
+        state.log_stage()
+
+        await asyncio.to_thread(finish_crawl, state)
+    except Exception as e:
+        fail_crawl(state, e)
+
+
+async def crawl_async(states: list[CrawlState]) -> None:
+    """
+    在单个事件循环上同时抓取各板块类型（--engine async）
+
+    所有请求共享一个aiohttp连接池，在途请求数受async_concurrency限制
+
+    Args:
+        states: 各板块类型的抓取状态
+    """
+    limiter = asyncio.Semaphore(async_concurrency)
+    async with async_client() as http:
+        await asyncio.gather(*(crawl_state_async(http, limiter, state) for state in states))
+
+
+def plan_detail_crawl(state: CrawlState) -> None:
+    """
+    确定需要抓取详情页的板块（state.names）；增量模式下未变化的板块直接沿用上一批次成分股
+
+    Args:
+        state: 板块类型的抓取状态
+    """
+    board_type = state.board_type
+    # 续抓时日志中已完成的板块已交给写入线程
+    pending = {name: info for name, info in state.board_data.items() if name not in state.resumed_boards}
+    state.names = list(pending)
+    state.total_count = len(state.names)
+    if not incremental:
+        return
+
+    if board_type in db_instances:
+        previous = load_previous_from_db(db_instances[board_type])
+    elif storage_mode == 'parquet':
+        previous = load_previous_from_parquet(board_type, path_join(PATH, 'result'), exclude = state.stamp)
+    else:
+        previous = load_previous_from_csv(board_type, path_join(PATH, 'result'), exclude = state.stamp)
+    if not previous:
+        log(f'{board_type} 无历史成功结果，本次全量抓取', 'WARN')
         return
 
-    tr = tr_pattern.findall(data[0])
+    to_crawl, to_copy, sampled = plan_incremental(
+        pending, previous, incremental_sample,
+        state.config['scraper'].get('integrity_count_tolerance', DEFAULT_COUNT_TOLERANCE)
+    )
+    for name in to_copy:
+        state.writer.put(name, state.board_data[name], previous[name]['stocks'])
+    state.sampled_rows.update((name, None) for name in sampled)
+    state.previous = previous
+    state.sampled = sampled
+    state.names = to_crawl
+    state.total_count = len(to_crawl)
+
+    log(
+        f'{board_type} 增量模式: {len(pending)} 个板块中 {len(to_crawl) - len(sampled)} 个有变化, '
+        f'沿用上一批次 {len(to_copy)} 个, 抽样校验 {len(sampled)} 个'
+    )
 
-    for td in tr:
-        link = link_pattern.findall(td)
-        if len(link) == 0: continue
 
-        name = link[0][1]
+def run_overlap_analytics(state: CrawlState) -> None:
+    """
+    批次完成后计算板块重叠（[scraper] overlap_top_k > 0 时），失败只记录警告
 
-        with lock:
-            if board_data.get(name) is None:
-                board_data[name] = []
-            else:
-                if len(board_data[name]) != 4:
-                    print('Unknown data')
-                    quit(3)
-                else:
-                    continue
+    Args:
+        state: 板块类型的抓取状态（batch_id为None时读取本次的CSV/Parquet结果）
+    """
+    board_type, batch_id = state.board_type, state.batch_id
+    top_k = state.config['scraper'].get('overlap_top_k', 0)
+    if not top_k:
+        return
+    if not analytics.available():
+        log('⚠ 未安装numpy/scipy（pip install numpy scipy），跳过板块重叠分析', 'WARN')
+        return
 
-            date = date_pattern.findall(td)
-            if len(date) == 1:
-                board_data[name].append(date[0])
-            else:
-                board_data[name].append('--')
+    try:
+        result_dir = path_join(PATH, 'result')
+        if batch_id and board_type in db_instances:
+            previous = load_previous_from_db(db_instances[board_type], batch_id)
+        elif storage_mode == 'parquet':
+            previous = load_previous_from_parquet(board_type, result_dir, stamp = state.stamp)
+        else:
+            previous = load_previous_from_csv(board_type, result_dir, stamp = state.stamp)
+        if not previous:
+            return
 
-            board_data[name].append(link[0][0])
+        _, pairs = analytics.analyze(previous, top_k)
+        if batch_id and board_type in db_instances:
+            db_instances[board_type].replace_board_overlaps(batch_id, pairs)
+        elif parquet_store.available():
+            path = path_join(result_folder(board_type, state.stamp), f'板块重叠_{state.stamp}.parquet')
+            analytics.write_parquet(path, pairs)
+            log(f'✓ {board_type} 板块重叠已保存: {path}')
+        else:
+            log('⚠ 文件存储模式下保存板块重叠需要pyarrow（pip install pyarrow）', 'WARN')
+    except Exception as e:
+        log(f'⚠ {board_type} 板块重叠分析失败: {e}', 'WARN')
 
-            if len(link) == 2:
-                board_data[name].append(link[1][1])
-            else:
-                board_data[name].append('--')
 
-            pages = total_pattern.findall(td)
-            if len(pages) == 1:
-                board_data[name].append(pages[0])
-            else:
-                board_data[name].append('--')
+def load_resume_journal(state: CrawlState, journal_dir: str) -> JournalState | None:
+    """
+    --resume：读取板块类型最近的抓取日志，重新打开其批次并删除上次写了一半的输出文件
+
+    Args:
+        state: 板块类型的抓取状态
+        journal_dir: 抓取日志目录
+
+    Returns:
+        日志内容，没有可续抓的日志时返回None（开始新批次）
+    """
+    board_type = state.board_type
+    path = find_journal(journal_dir, board_type)
+    if path is None:
+        log(f'{board_type} 没有可续抓的抓取日志，开始新批次', 'WARN')
+        return None
+
+    restored = load_journal(path)
+    db = db_instances.get(board_type)
+    usable = restored is not None and (restored.batch_id is None) == (db is None)
+    if usable and db is not None:
+        usable = db.reopen_batch(restored.batch_id)
+    if not usable:
+        log(f'⚠ {board_type} 抓取日志无法续抓（批次已结束或存储模式不同），开始新批次: {path}', 'WARN')
+        remove(path)
+        return None
+
+    # 已完成的板块由日志重新写入新的输出文件
+    compression = state.config['scraper'].get('csv_compression', 'none')
+    for partial in (*csv_paths(board_type, compression, restored.stamp), *parquet_paths(board_type, restored.stamp)):
+        for candidate in (partial, partial + '.tmp'):
+            if exists(candidate):
+                remove(candidate)
+
+    log(
+        f'✓ {board_type} 继续批次 {restored.batch_id or restored.stamp}: '
+        f'日志中已完成 {len(restored.pages)} 个列表页, {len(restored.boards)} 个板块'
+    )
+    return restored
 
 
-def fetch_code(name: str, url_type: str) -> list[list[str]]:
+def open_crawl(state: CrawlState) -> None:
     """
-    获取指定板块的成分股代码和名称
+    创建批次（--resume时继续抓取日志中的批次）并打开写入线程，不请求行情站点
 
     Args:
-        name: 板块名称
-        url_type: URL类型（thshy/gn/dy）
+        state: 板块类型的抓取状态
+    """
+    global db_instances, current_batch_ids
+
+    board_type = state.board_type
+    scraper_config = state.config['scraper']
+    journal_dir = path_join(PATH, scraper_config.get('journal_dir', DEFAULT_JOURNAL_DIR))
+    restored = load_resume_journal(state, journal_dir) if resume else None
+    if restored is not None:
+        state.batch_id = restored.batch_id
+        state.stamp = restored.stamp
+        state.journal = CrawlJournal(restored.path)
+        for rows in restored.pages.values():
+            store_index_rows(state, rows)
+        state.done_pages = set(restored.pages)
+    else:
+        if board_type in db_instances:
+            state.batch_id = db_instances[board_type].create_batch()
+        if scraper_config.get('journal', True):
+            state.journal = CrawlJournal.create(journal_dir, board_type, state.batch_id, state.stamp)
+    if state.batch_id:
+        current_batch_ids[board_type] = state.batch_id
+
+    state.writer = open_board_writer(board_type, state.config, state.batch_id, state.stamp)
+    if restored is not None:
+        for name, stocks in restored.boards.items():
+            if name in state.board_data:
+                state.writer.put(name, state.board_data[name], stocks)
+                state.resumed_boards.add(name)
+
+
+def fetch_page_count(url: str) -> int:
+    """
+    读取列表页总页数
+
+    Args:
+        url: 板块类型的首个列表页（BOARD_CONFIGS中的url）
 
     Returns:
-        成分股列表，每个元素为[序号, 代码, 名称]
+        总页数，页面没有分页信息时为1
     """
-    global session, board_data, total_count, cur_count, failed_items, lock, cookies_obj, code_name
+    http = session_pool.get()
+    http.cookies.set('v', cookies_obj.get_v())
+    resp = http.get(url = url, allow_redirects = False, timeout = timeout)
+    return page_count(resp.content.decode('gbk', errors='ignore')) or 1
 
-    if name not in board_data or len(board_data[name]) < 2:
-        print(f'[警告] {name} 数据结构不完整')
-        return []
-    page_ids = page_id.findall(board_data[name][1])
-    if not page_ids:
-        print(f'[警告] {name} 无法获取板块代码')
-        return []
-    code = page_ids[0]
-    _result: list[list[str]] = []
-    sub_count = 0
-    url_prefix = ''
 
-    match url_type:
-        case 'gn':
-            url_prefix = 'q.10jqka.com.cn/gn/detail/field/199112/order/desc/page'
-        case 'thshy':
-            url_prefix = 'q.10jqka.com.cn/thshy/detail/field/199112/order/desc/page'
-        case 'dy':
-            url_prefix = 'q.10jqka.com.cn/dy/detail/field/199112/order/desc/page'
-        case _:
-            raise ValueError(f"Unknown url_type: {url_type}")
+def begin_crawl(state: CrawlState) -> None:
+    """
+    创建批次、读取列表页总页数并打开写入线程
 
-    session.cookies.set('v', cookies_obj.get_v())
-    resp = session.get(
-        url = f'https://{url_prefix}/1/ajax/1/code/{code}/',
-        allow_redirects = False,
-        timeout = timeout
-    )
-    data = page_info.findall(resp.content.decode('gbk', errors='ignore'))
-    pages = 0
-    if len(data) == 0:
-        pages = 1
-    else:
-        pages = int(data[0])
+    Args:
+        state: 板块类型的抓取状态
+    """
+    end_page = fetch_page_count(state.url)
+    open_crawl(state)
+    state.end_page = end_page
+    log(f'开始爬取: {state.board_type}，总共 {state.end_page} 页')
 
-    for page in range(1, pages + 1):
-        if not random_sleep():
-            return []
-        sub_count += 1
 
-        print(
-            f'\x1b[2K\r总共需要获取: {total_count}\t'
-            f'失败项: [{', '.join(failed_items)}]\t'
-            f'Sub count: {sub_count}', end = ''
-        )
+def finish_crawl(state: CrawlState) -> None:
+    """
+    详情页全部完成（或被中断）后：核对增量抽样、关闭写入线程、校验完整性并更新批次状态
 
-        for code_retry in range(MAX_CODE_RETRIES):
-            if shutdown_event.is_set():
-                return []
-            session.cookies.set('v', cookies_obj.get_v())
-            resp = session.get(
-                url = f'https://{url_prefix}/{page}/ajax/1/code/{code}/',
-                timeout = timeout,
-                allow_redirects = False
-            )
+    Args:
+        state: 板块类型的抓取状态
 
-            if resp.status_code == 302:
-                check_cookies_valid()
+    Raises:
+        ValueError: 数据库模式下完整性校验失败（本批次已删除）
+    """
+    global db_instances, current_batch_ids
 
-            if resp.status_code == 401 or resp.status_code == 403:
-                if not random_sleep():
-                    return []
-                continue
+    board_type, batch_id, writer = state.board_type, state.batch_id, state.writer
+    try:
+        if state.sampled:
+            drifted = verify_sample(state.sampled_rows, state.previous, state.sampled)
+            if drifted:
+                log(
+                    f'{board_type} 增量校验: 抽样 {len(state.sampled)} 个板块中 {len(drifted)} 个数量未变但成分股不同: '
+                    f'{", ".join(drifted[:10])}', 'WARN'
+                )
             else:
-                break
+                log(f'✓ {board_type} 增量校验: 抽样 {len(state.sampled)} 个板块与上一批次一致')
+
+        # 未完成的板块只写板块信息（完整性校验不通过，MySQL不再写入）
+        if not shutdown_event.is_set():
+            for name, info in state.board_data.items():
+                writer.put(name, info, None)
+    finally:
+        writer.close()
+
+    # 计算耗时
+    elapsed = time() - state.start_time
+
+    if shutdown_event.is_set():
+        # 写入线程已结束，清理本批次写入的部分数据（已分区时按分区整体清除）
+        if batch_id and board_type in db_instances:
+            db = db_instances[board_type]
+            if state.journal is not None:
+                # 已完成的板块在抓取日志中，--resume 时重新写入；批次记录保留
+                db.discard_batch_data(batch_id)
+                db.update_batch_status(
+                    batch_id,
+                    '失败',
+                    total_boards=writer.boards,
+                    total_stocks=writer.stocks,
+                    elapsed_seconds=elapsed,
+                    error_message='用户中断，已完成的板块记录在抓取日志中，可--resume继续'
+                )
+            else:
+                # 不能继续的批次整体删除（同时撤销成分股区间的修改）
+                db.delete_batch_data(batch_id)
+            del current_batch_ids[board_type]
+        if state.journal is not None:
+            # 保留日志，--resume 时继续本批次
+            state.journal.close()
+            log(f'{board_type} 已中断，已完成 {writer.boards} 个板块（--resume 继续）', 'WARN')
         else:
-            continue
+            log(f'{board_type} 已中断，本批次已清除', 'WARN')
+        return
 
-        tbody = tbody_pattern.findall(resp.content.decode('gbk', errors='ignore'))
-        if len(tbody) == 0:
-            continue
-        tr = tr_pattern.findall(tbody[0])
-        for td in tr:
-            c_name = code_name.findall(td)
-            if len(c_name) < 2: continue
-            seq_results = seq_pattern.findall(td)
-            if not seq_results: continue
-            __result = []
-            __result.append(seq_results[0])
-            __result.append(c_name[0])
-            __result.append(c_name[1])
+    if state.journal is not None:
+        state.journal.remove()
+
+    if state.failed_items:
+        # 失败的板块只写了板块信息，完整性校验不会通过
+        log(
+            f'{board_type} {len(state.failed_items)} 个板块抓取失败（只写入板块信息）: '
+            f'{", ".join(state.failed_items[:10])}', 'WARN'
+        )
+
+    # 数据完整性校验（写入线程已在内存中逐个板块检查）
+    is_valid, error_msg = writer.integrity.result()
+    if writer.integrity.duplicates:
+        log(f'{board_type} 板块内重复的股票代码 {writer.integrity.duplicates} 条，已去重', 'WARN')
+    if batch_id and board_type in db_instances:
+        db = db_instances[board_type]
+        if is_valid and state.config['database'].get('audit_integrity', False):
+            # 可选：提交后再用SQL核对一次
+            is_valid, error_msg = db.validate_batch_integrity(batch_id)
+        if not is_valid:
+            log(f'✗ {board_type} 数据完整性校验失败: {error_msg}', 'ERROR')
+            db.delete_batch_data(batch_id)
+            del current_batch_ids[board_type]
+            raise ValueError(f"{board_type} 数据完整性校验失败: {error_msg}")
+        # interval存储方式：结束本批次已不存在的板块的成分股区间
+        db.close_removed_boards(batch_id)
+        log(f'✓ {board_type} 数据库保存成功: {writer.boards} 个板块, {writer.stocks} 只股票')
+
+        # 更新批次状态（包含耗时）
+        db.update_batch_status(
+            batch_id,
+            '成功',
+            total_boards=writer.boards,
+            total_stocks=writer.stocks,
+            elapsed_seconds=elapsed,
+            request_rate=rate_controller.rate
+        )
+        del current_batch_ids[board_type]
+    elif not is_valid:
+        log(f'⚠ {board_type} 数据完整性校验未通过（文件已保存）: {error_msg}', 'WARN')
+    if is_valid:
+        run_overlap_analytics(state)
+
+    log(f'✓ {board_type} 完成，耗时 {elapsed:.2f} 秒')
 
-            _result.append(__result)
 
-    with lock:
-        cur_count += 1
-        if name in failed_items:
-            failed_items.remove(name)
+def fail_crawl(state: CrawlState, error: Exception) -> None:
+    """
+    记录板块类型的抓取异常并关闭其写入线程（其他板块类型继续抓取）
 
-    print(f'\x1b[2K\r\x1b[92m{cur_count}. {name} fetch done.\x1b[0m')
-    return _result
+    Args:
+        state: 板块类型的抓取状态
+        error: 异常
+    """
+    state.error = error
+    log(f'✗ {state.board_type} 抓取失败: {error}', 'ERROR')
+    if state.journal is not None:
+        state.journal.close()
+    if state.writer is not None:
+        try:
+            state.writer.close()
+        except Exception as e:
+            log(f'{state.board_type} 关闭写入线程失败: {e}', 'ERROR')
 
 
-def fetch_detail(name: str, url_type: str, max_retries: int = MAX_CODE_RETRIES) -> None:
+def advance_crawl(state: CrawlState) -> bool:
     """
-    获取板块详细信息（成分股列表）并处理重试逻辑
+    thread引擎：板块类型当前阶段的任务全部完成后进入下一阶段
 
     Args:
-        name: 板块名称
-        url_type: URL类型（thshy/gn/dy）
-        max_retries: 最大重试次数
+        state: 板块类型的抓取状态
+
+    Returns:
+        bool: True表示该板块类型已结束
     """
-    global board_data, lock, failed_items, connection_semaphore
+    global crawl_scheduler
 
-    for attempt in range(max_retries):
-        if connection_semaphore:
-            connection_semaphore.acquire()
+    state.log_stage()
+    try:
+        if state.stage == '列表页':
+            plan_detail_crawl(state)
+            state.start_stage('详情页', len(state.names))
+            crawl_scheduler.submit_many(state, fetch_detail, [(state, name) for name in state.names])
+            return False
+        finish_crawl(state)
+    except Exception as e:
+        fail_crawl(state, e)
+    return True
+
+
+def run_scheduled(states: list[CrawlState]) -> None:
+    """
+    thread引擎：各板块类型的任务经crawl_scheduler轮流交给共享的工作线程池，
+    主线程只在某个板块类型的一个阶段完成时推进该类型，不等待其他类型
+
+    Args:
+        states: 各板块类型的抓取状态
+    """
+    global crawl_scheduler
+
+    active = set(states)
+    for state in states:
+        pages = state.pending_pages()
+        state.start_stage('列表页', len(pages))
+        crawl_scheduler.submit_many(state, fetch, [(state, index) for index in pages])
+
+    while active and not shutdown_event.is_set():
+        state = crawl_scheduler.wait(timeout = 0.1)
+        if state is not None and advance_crawl(state):
+            active.discard(state)
+
+    # 被中断：先等待该类型在途的任务结束（不再写入），再关闭写入器和抓取日志
+    for state in active:
+        crawl_scheduler.cancel(state)
         try:
-            result = fetch_code(name, url_type)
-            with lock:
-                board_data[name].append(result)
-                if name in failed_items:
-                    failed_items.remove(name)
-            return
+            finish_crawl(state)
         except Exception as e:
-            with lock:
-                if name not in failed_items:
-                    failed_items.append(name)
-            print(f'\x1b[2K\r\x1b[91m{name} retry {attempt + 1}/{max_retries}: {e}\x1b[0m')
-            if not random_sleep(interval * 2):
-                return
-        finally:
-            if connection_semaphore:
-                connection_semaphore.release()
+            fail_crawl(state, e)
 
-    print(f'\x1b[2K\r\x1b[91m{name} failed after {max_retries} attempts\x1b[0m')
 
+def execute_unit(unit: dict) -> dict:
+    """
+    worker：执行协调者租出的一个任务（--worker）
 
-def check_cookies_valid() -> None:
-    """检查并刷新cookies有效性"""
-    global session, cookies_obj, timeout
+    Args:
+        unit: 任务，kind为 count（列表页总页数）/ index（一段列表页）/ detail（一个板块的一段详情页）
 
-    count = 0
-    while True:
-        if shutdown_event.is_set():
-            return
-        session.cookies.set('v', cookies_obj.get_v())
-        resp = session.get(
-            url = 'https://q.10jqka.com.cn/gn/index/field/addtime/order/desc/page/30/ajax/1/',
-            allow_redirects = False,
-            timeout = timeout
-        )
+    Returns:
+        可JSON序列化的结果；请求异常直接抛出，由协调者重新发放
+    """
+    board_type = unit['board_type']
+    board_config = BOARD_CONFIGS[board_type]
+    url_type = board_config['url_type']
+    match unit['kind']:
+        case 'count':
+            return {'pages': fetch_page_count(board_config['url'].replace(DEFAULT_BASE_URL, base_url, 1))}
+        case 'index':
+            pages = []
+            for index in unit['pages']:
+                rows = fetch_index(board_type, url_type, index)
+                if rows is not None:
+                    pages.append([index, [list(row) for row in rows]])
+            return {'pages': pages}
+        case 'detail':
+            total = None
+            pages = []
+            failed = []
+            for page in unit['pages']:
+                html = fetch_code(unit['code'], page, url_type)
+                if html is None:
+                    failed.append(page)
+                    continue
+                if page == 1:
+                    total = page_count(html) or 1
+                pages.append([page, [list(row) for row in parse_code_rows(html)]])
+            print(f'\x1b[2K\r\x1b[92m{board_type} {unit["name"]} 第{unit["pages"][0]}-{unit["pages"][-1]}页 fetch done.\x1b[0m')
+            return {'total': total, 'pages': pages, 'failed': failed}
+        case _:
+            raise ValueError(f"Unknown unit kind: {unit['kind']}")
 
-        if resp.status_code == 302:
-            print('Need to login')
-            if count > MAX_LOGIN_ATTEMPTS:
-                print('获取登录令牌达到最大尝试次数')
-                quit(1)
 
-            try:
-                cookies = cookies_obj.get_cookies()
-            except Exception as e:
-                print(f'获取cookies失败: {e}')
-                count += 1
-                continue
+def check_unit_result(unit: dict, result) -> str | None:
+    """
+    协调者：检查worker交回的结果，无效的结果按失败处理（任务重新发放）
 
-            if cookies == dict():
-                print('Get cookies failed')
-                count += 1
-                continue
+    count的总页数、detail第1页给出的总页数不超过MAX_LEASED_PAGES；交回的页码只能是租出的页码，
+    detail的成功页和失败页合起来正好是租出的页；每行的字段数与IndexRow/CodeRow一致
 
-            with open(path_join(PATH, 'cookies.json'), 'w') as f:
-                f.write(dumps(cookies))
+    Args:
+        unit: 租出的任务
+        result: worker交回的结果
 
-            session.cookies = cookiejar_from_dict(cookies)
-            break
-        elif resp.status_code > 400:
-            count += 1
-            if not random_sleep(2):
-                return
-            try:
-                ip_resp = session.get('https://4.ipw.cn', timeout=10)
-                new_ip = ip_resp.text.strip()
-            except Exception as e:
-                new_ip = f'获取失败({e})'
-            print(f'Access denied (重试 {count}/{MAX_ACCESS_DENIED_RETRIES}，新IP: {new_ip})')
-            if count > MAX_ACCESS_DENIED_RETRIES:
-                print('Access denied达到最大尝试次数')
-                quit(1)
-            continue
-        elif resp.status_code == 200:
-            print('Cookies valid!')
-            break
+    Returns:
+        错误说明，结果有效时为None
+    """
+    if not isinstance(result, dict):
+        return '结果不是JSON对象'
+    pages = result.get('pages')
+    if unit['kind'] == 'count':
+        if type(pages) is not int or not 1 <= pages <= MAX_LEASED_PAGES:
+            return f'总页数无效: {pages!r}'
+        return None
+
+    if not isinstance(pages, list) or not all(
+            isinstance(item, list) and len(item) == 2 and type(item[0]) is int for item in pages):
+        return '页结果格式无效'
+    width = len(IndexRow._fields) if unit['kind'] == 'index' else len(CodeRow._fields)
+    for page, rows in pages:
+        if not isinstance(rows, list) or not all(
+                isinstance(row, list) and len(row) == width and all(isinstance(field, str) for field in row)
+                for row in rows):
+            return f'第{page}页的行格式无效'
+
+    returned = [page for page, _ in pages]
+    if unit['kind'] == 'detail':
+        failed = result.get('failed')
+        if not isinstance(failed, list) or not all(type(page) is int for page in failed):
+            return '失败页列表无效'
+        returned += failed
+        if sorted(returned) != sorted(unit['pages']):
+            return f'交回的页 {sorted(returned)} 与租出的页 {unit["pages"]} 不一致'
+        total = result.get('total')
+        if 1 in unit['pages'] and 1 not in failed and (type(total) is not int or not 1 <= total <= MAX_LEASED_PAGES):
+            return f'总页数无效: {total!r}'
+    elif len(set(returned)) != len(returned) or not set(returned) <= set(unit['pages']):
+        return f'交回的页 {returned} 不在租出的页 {unit["pages"]} 中'
+    return None
+
+
+def lease_units(state: CrawlState, pages: list[int], **unit) -> list[dict]:
+    """按 [distributed] lease_pages 把页码分段，每段一个任务"""
+    size = max(1, state.config.get('distributed', {}).get('lease_pages', DEFAULT_LEASE_PAGES))
+    return [
+        dict(unit, board_type = state.board_type, pages = pages[start:start + size])
+        for start in range(0, len(pages), size)
+    ]
+
+
+def store_leased_count(state: CrawlState, coordinator: LeaseCoordinator, unit: dict, result: dict | None) -> None:
+    """协调者：收到列表页总页数，把未完成的列表页分段租出"""
+    if result is None:
+        state.error = RuntimeError(f'{state.board_type} 读取列表页总页数失败')
+        return
+    state.end_page = result['pages']
+    log(f'开始爬取: {state.board_type}，总共 {state.end_page} 页')
+    pages = state.pending_pages()
+    state.start_stage('列表页', len(pages))
+    coordinator.submit_many(state, lease_units(state, pages, kind = 'index'), partial(store_leased_index, state))
 
 
-def start_thread(Fn, args, url_type) -> None:
+def store_leased_index(state: CrawlState, unit: dict, result: dict | None) -> None:
+    """协调者：收到一段列表页（失败的页不在结果中，同fetch）"""
+    for index, rows in (result or {}).get('pages', []):
+        store_index_rows(state, [IndexRow(*row) for row in rows], index)
+
+
+def store_leased_detail(state: CrawlState, coordinator: LeaseCoordinator, board: BoardPages | None,
+                        unit: dict, result: dict | None) -> None:
     """
-    启动多线程执行任务
+    协调者：收到一个板块的一段详情页
+
+    第1页的结果给出总页数，剩余页分段租出（排在本板块类型的队首）；最后完成的一段负责交给写入线程
 
     Args:
-        Fn: 要执行的函数
-        args: 参数列表
-        url_type: URL类型（thshy/gn/dy）
+        state: 板块类型的抓取状态
+        coordinator: 协调者
+        board: 板块分页状态，第1页的任务为None
+        unit: 任务
+        result: worker交回的结果，多次失败时为None
     """
-    global thread_count
+    name = unit['name']
+    if board is None:
+        if result is None or result['total'] is None:
+            if not shutdown_event.is_set():
+                state.mark_failed(name)
+                print(f'\x1b[2K\r\x1b[91m{name} failed: access denied\x1b[0m')
+            return
+        board = BoardPages(name, unit['code'], state.url_type, result['total'])
+        remaining = list(range(2, board.pages + 1))
+        if remaining:
+            coordinator.submit_many(
+                state, lease_units(state, remaining, kind = 'detail', name = name, code = board.code),
+                partial(store_leased_detail, state, coordinator, board), urgent = True
+            )
 
-    threads = []
-    for i in args:
-        threads.append(Thread(
-            target = Fn,
-            args = (i, url_type)
-        ))
+    failed = result['failed'] if result is not None else unit['pages']
+    if failed:
+        with state.lock:
+            board.failed_pages.extend(failed)
+        state.mark_failed(name)
+    completed = False
+    for page, rows in (result or {}).get('pages', []):
+        completed = board.add(page, [CodeRow(*row) for row in rows]) or completed
+    for page in failed:
+        completed = board.add(page, []) or completed
+    if completed:
+        complete_board(state, board)
+
+
+def advance_leased(state: CrawlState, coordinator: LeaseCoordinator) -> bool:
+    """
+    协调者：板块类型当前阶段的任务全部完成后进入下一阶段（同advance_crawl）
 
-    started_threads = list()
-    for i in range(len(threads) // thread_count):
-        for j in range(thread_count):
-            thread = threads.pop()
-            thread.start()
-            started_threads.append(thread)
-
-        for j in range(len(started_threads)):
-            thread = started_threads.pop()
-            while thread.is_alive():
-                thread.join(timeout=0.1)
-                if shutdown_event.is_set():
-                    return
+    Args:
+        state: 板块类型的抓取状态
+        coordinator: 协调者
 
-    for i in range(len(threads)):
-        thread = threads.pop()
-        thread.start()
-        started_threads.append(thread)
+    Returns:
+        bool: True表示该板块类型已结束
+    """
+    if state.error is not None:
+        fail_crawl(state, state.error)
+        return True
 
-    for i in started_threads:
-        while i.is_alive():
-            i.join(timeout=0.1)
-            if shutdown_event.is_set():
-                return
+    state.log_stage()
+    try:
+        if state.stage == '列表页':
+            plan_detail_crawl(state)
+            state.start_stage('详情页', len(state.names))
+            units = []
+            for name in state.names:
+                code = board_code(state, name)
+                if code is not None:
+                    units.append({'kind': 'detail', 'board_type': state.board_type, 'name': name, 'code': code, 'pages': [1]})
+            coordinator.submit_many(state, units, partial(store_leased_detail, state, coordinator, None))
+            return False
+        finish_crawl(state)
+    except Exception as e:
+        fail_crawl(state, e)
+    return True
 
 
-def fetch_pages(board_type: str, config: dict) -> None:
+def run_leased(states: list[CrawlState], coordinator: LeaseCoordinator) -> None:
     """
-    爬取指定板块类型的所有数据（v2.0.0版本）
+    协调者（--coordinator）：各板块类型的任务经coordinator租给远程worker，
+    结果汇总到本机的CrawlState和写入线程（同一个批次ID），阶段推进与run_scheduled相同
 
     Args:
-        board_type: 板块类型（同花顺行业/概念/地域）
-        config: 配置字典
+        states: 各板块类型的抓取状态
+        coordinator: 已启动的协调者
     """
-    global board_data, session, page_info, cookies_obj, total_count, cur_count
-    global db_instances, current_batch_ids
+    active = set(states)
+    for state in states:
+        coordinator.submit(state, {'kind': 'count', 'board_type': state.board_type},
+                           partial(store_leased_count, state, coordinator))
+
+    while active and not shutdown_event.is_set():
+        state = coordinator.wait(timeout = 0.1)
+        if state in active and advance_leased(state, coordinator):
+            active.discard(state)
+
+    # 被中断：放弃未完成的任务并等待正在执行的结果回调结束，再关闭写入器和抓取日志
+    for state in active:
+        coordinator.cancel(state)
+        try:
+            finish_crawl(state)
+        except Exception as e:
+            fail_crawl(state, e)
 
-    # 从配置获取URL和url_type
-    board_config = BOARD_CONFIGS[board_type]
-    url = board_config['url']
-    url_type = board_config['url_type']
 
-    board_data = dict()
-    start_time = time()
+def log_request_stats() -> None:
+    """输出请求速率控制和v值池统计"""
+    rate_stats = rate_controller.stats()
+    log(
+        f'速率控制: 当前 {rate_stats["rate"]:.2f} 次/秒, 成功 {rate_stats["successes"]}, '
+        f'限流响应 {rate_stats["throttled"]}, 降速 {rate_stats["decreases"]} 次'
+    )
 
-    # 创建批次
-    batch_id = None
-    if storage_mode == 'mysql' and board_type in db_instances:
-        batch_id = db_instances[board_type].create_batch()
-        current_batch_ids[board_type] = batch_id
+    v_stats = cookies_obj.v_stats()
+    if v_stats:
+        log(
+            f'v值池: 容量 {v_stats["capacity"]}, 当前 {v_stats["size"]}, '
+            f'命中 {v_stats["hits"]}, 未命中 {v_stats["misses"]}, 过期丢弃 {v_stats["expired"]}, '
+            f'命中率 {v_stats["hit_rate"]:.0%}, 取用时平均存活 {v_stats["avg_age"]:.2f}s '
+            f'(最大 {v_stats["max_age_at_use"]:.2f}s)'
+        )
 
-    # 获取总页数
-    end_page = 1
-    session.cookies.set('v', cookies_obj.get_v())
-    resp = session.get(url = url, allow_redirects = False)
-    data = page_info.findall(resp.content.decode('gbk', errors='ignore'))
-    if len(data) == 1:
-        end_page = int(data[0])
 
-    log(f'开始爬取: {board_type}，总共 {end_page} 页')
-    start_thread(fetch, range(1, end_page + 1), url_type)
+def crawl_boards(board_types: list[str], config: dict, coordinator: LeaseCoordinator = None) -> list[CrawlState]:
+    """
+    同时抓取多个板块类型
 
-    total_count = len(board_data.keys())
-    cur_count = 0
+    各板块类型有独立的CrawlState（board_data、计数、失败项、写入线程、批次），
+    任务共用一个工作线程池（async引擎为同一个事件循环）、请求速率控制和并发限制，
+    总耗时接近最慢的板块类型而不是各类型之和
 
-    start_thread(fetch_detail, list(board_data.keys()), url_type)
+    Args:
+        board_types: 板块类型列表（同花顺行业/概念/地域）
+        config: 配置字典
+        coordinator: 已启动的协调者，给出时任务租给远程worker，本机不请求行情站点
 
-    # 计算耗时
-    elapsed = time() - start_time
+    Returns:
+        各板块类型的抓取状态
 
-    # 保存数据
-    store(board_type, config)
+    Raises:
+        第一个失败的板块类型的异常（其他板块类型照常完成）
+    """
+    global crawl_scheduler, worker_pool
 
-    # 更新批次状态（包含耗时）
-    if batch_id and board_type in db_instances:
-        boards, stocks = prepare_board_data()
-        db_instances[board_type].update_batch_status(
-            batch_id,
-            '成功',
-            total_boards=len(boards),
-            total_stocks=len(stocks),
-            elapsed_seconds=elapsed
+    states = []
+    for board_type in board_types:
+        if shutdown_event.is_set():
+            break
+        state = CrawlState(board_type, config)
+        try:
+            if coordinator is not None:
+                # 列表页总页数也由worker读取
+                open_crawl(state)
+            else:
+                begin_crawl(state)
+        except Exception as e:
+            fail_crawl(state, e)
+            continue
+        states.append(state)
+
+    if coordinator is not None:
+        run_leased(states, coordinator)
+        stats = coordinator.stats()
+        log(
+            f'协调者: {stats["workers"]} 个worker, 发放 {stats["leased"]} 个租约, 完成 {stats["completed"]} 个任务, '
+            f'超时重发 {stats["expired"]} 次, 失败 {stats["failed"]} 次, 重复结果 {stats["duplicates"]} 个'
         )
-        del current_batch_ids[board_type]
+    elif engine == 'async':
+        asyncio.run(crawl_async(states))
+        log_request_stats()
+    else:
+        if worker_pool is None:
+            worker_pool = WorkerPool(thread_count)
+        worker_pool.reset_stats()
+        crawl_scheduler = GroupScheduler(worker_pool)
+        run_scheduled(states)
+
+        stats = worker_pool.stats()
+        log(
+            f'工作线程池: {stats["completed"]} 个任务完成，线程利用率 {stats["utilisation"]:.0%}，'
+            f'在途任务上限 {crawl_scheduler.window}'
+        )
+        log_request_stats()
 
-    log(f'✓ {board_type} 完成，耗时 {elapsed:.2f} 秒')
+    for state in states:
+        if state.error is not None:
+            raise state.error
+    return states
+
+
+def fetch_pages(board_type: str, config: dict) -> CrawlState | None:
+    """
+    爬取指定板块类型的所有数据（crawl_boards的单类型形式）
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        config: 配置字典
+
+    Returns:
+        抓取状态，开始前已被中断时返回None
+    """
+    states = crawl_boards([board_type], config)
+    return states[0] if states else None
 
 
 if '__main__' == __name__:
@@ -748,6 +1797,23 @@ if '__main__' == __name__:
                         choices=[1, 2, 3],
                         help='指定板块: 1=同花顺行业 2=概念 3=地域（可多选）', metavar='板块')
     parser.add_argument('-H', '--threads', type=int, help='并发线程数（覆盖配置文件）', metavar='数量')
+    parser.add_argument('-E', '--engine', type=str, choices=['thread', 'async'],
+                        help='抓取引擎: thread=多线程 async=协程（覆盖配置文件）')
+    parser.add_argument('-C', '--concurrency', type=int, help='async引擎在途请求数上限（覆盖配置文件）', metavar='数量')
+    parser.add_argument('-I', '--incremental', action='store_true',
+                        help='增量模式：只重新抓取成分股数量/链接有变化的板块（覆盖配置文件）')
+    parser.add_argument('--resume', action='store_true',
+                        help='从抓取日志继续上次中断的批次（跳过已完成的列表页和板块）')
+    parser.add_argument('-S', '--storage', type=str, choices=STORAGE_MODES,
+                        help='存储模式: auto=MySQL可用时用MySQL否则CSV, sqlite=本地SQLite文件（覆盖配置文件）')
+    parser.add_argument('--base-url', type=str, help=f'行情站点地址（默认 {DEFAULT_BASE_URL}，可指向replay.py回放服务器）', metavar='URL')
+    parser.add_argument('--purge-days', type=int,
+                        help='删除N天前的批次后退出（MySQL已按批次分区时直接删除分区）', metavar='天数')
+    parser.add_argument('--coordinator', type=str, metavar='[主机:]端口',
+                        help='协调者模式：把列表页/详情页任务租给--worker进程，结果写入本机存储（不需要登录；默认只监听127.0.0.1）')
+    parser.add_argument('--worker', type=str, metavar='主机:端口',
+                        help='worker模式：从协调者领取任务、抓取后交回结果（不写入本机存储）')
+    parser.add_argument('--record', type=str, help='把抓取到的列表页/详情页保存到目录，供replay.py回放', metavar='目录')
     parser.add_argument('-t', '--timeout', type=int, help='请求超时秒数（覆盖配置文件）', metavar='秒')
     parser.add_argument('-s', '--socket', action='store_true', help='Socket代理模式（覆盖配置文件）')
     parser.add_argument('-P', '--proxy-port', type=int, help='Socket代理端口（覆盖配置文件）', metavar='端口')
@@ -795,18 +1861,40 @@ if '__main__' == __name__:
         config['scraper']['enabled_boards'] = ['同花顺行业', '概念', '地域']
 
     # 参数验证
-    if not args.user or not args.password:
+    if args.purge_days is not None:
+        # 只清理历史批次，不需要登录和代理
+        if args.purge_days < 0:
+            print('错误: 保留天数不能为负数')
+            sys.exit(1)
+    elif not args.coordinator and (not args.user or not args.password):
         print('错误: 必须提供用户名(-u)和密码(-p)')
         sys.exit(1)
     if args.socket and args.direct:
         print('错误: -s (socket代理) 和 -d (直连) 不能同时使用')
         sys.exit(1)
+    if args.coordinator and args.worker:
+        print('错误: --coordinator 和 --worker 不能同时使用')
+        sys.exit(1)
 
     # 命令行参数覆盖配置文件
     if args.interval is not None:
         config['scraper']['interval_seconds'] = args.interval
     if args.threads is not None:
         config['scraper']['thread_count'] = args.threads
+    if args.engine is not None:
+        config['scraper']['engine'] = args.engine
+    if args.concurrency is not None:
+        config['scraper']['async_concurrency'] = args.concurrency
+    if args.incremental:
+        config['scraper']['incremental'] = True
+    if args.storage is not None:
+        config['scraper']['storage_mode'] = args.storage
+    if args.worker:
+        # worker只把结果交回协调者
+        config['scraper']['storage_mode'] = 'csv'
+    if args.coordinator:
+        # 协调者不请求行情站点
+        config['socket_proxy']['enabled'] = False
     if args.timeout is not None:
         timeout = args.timeout
     else:
@@ -831,6 +1919,25 @@ if '__main__' == __name__:
     if config['scraper']['thread_count'] < 1 or config['scraper']['thread_count'] > 256:
         print('错误: 线程数必须在1-256之间')
         sys.exit(1)
+    if config['scraper'].get('engine', DEFAULT_ENGINE) not in ('thread', 'async'):
+        print('错误: 抓取引擎必须是 thread 或 async')
+        sys.exit(1)
+    if config['scraper'].get('async_concurrency', DEFAULT_ASYNC_CONCURRENCY) < 1 or \
+       config['scraper'].get('async_concurrency', DEFAULT_ASYNC_CONCURRENCY) > MAX_ASYNC_CONCURRENCY:
+        print(f'错误: async并发数必须在1-{MAX_ASYNC_CONCURRENCY}之间')
+        sys.exit(1)
+    if config['scraper'].get('storage_mode', 'auto') not in STORAGE_MODES:
+        print(f'错误: 存储模式必须是 {" / ".join(STORAGE_MODES)} 之一')
+        sys.exit(1)
+    if config['scraper'].get('csv_compression', 'none') not in CSV_SUFFIXES:
+        print(f'错误: CSV压缩方式必须是 {" / ".join(CSV_SUFFIXES)} 之一')
+        sys.exit(1)
+    if config['scraper'].get('csv_flush_interval', 0) < 0:
+        print('错误: CSV刷新间隔不能为负数')
+        sys.exit(1)
+    if not 0 <= config['scraper'].get('incremental_sample', DEFAULT_SAMPLE_RATE) <= 1:
+        print('错误: 增量抽样比例必须在0-1之间')
+        sys.exit(1)
     if timeout < 1:
         print('错误: 超时时间必须大于0')
         sys.exit(1)
@@ -842,9 +1949,28 @@ if '__main__' == __name__:
     pwd = args.password.encode('UTF-8')
     interval = config['scraper']['interval_seconds']
     thread_count = config['scraper']['thread_count']
+    engine = config['scraper'].get('engine', DEFAULT_ENGINE)
+    async_concurrency = config['scraper'].get('async_concurrency', DEFAULT_ASYNC_CONCURRENCY)
+    incremental = config['scraper'].get('incremental', False)
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+        log(f'行情站点地址: {base_url}', 'WARN')
+    if args.record:
+        from replay import Recorder
+        request_observers.append(Recorder(args.record))
+        log(f'录制模式: 页面保存到 {args.record}')
+    incremental_sample = config['scraper'].get('incremental_sample', DEFAULT_SAMPLE_RATE)
+    resume = args.resume
 
     log(f'同花顺板块爬虫 v{VERSION}')
-    log(f'线程数: {thread_count}, 间隔: {interval}s, 超时: {timeout}s')
+    if engine == 'async':
+        log(f'抓取引擎: async, 在途请求上限: {async_concurrency}, 间隔: {interval}s, 超时: {timeout}s')
+    else:
+        log(f'线程数: {thread_count}, 间隔: {interval}s, 超时: {timeout}s')
+    if incremental:
+        log(f'增量模式: 开启, 抽样校验比例: {incremental_sample:.0%}')
+    if resume:
+        log(f'断点续抓: 从 {config["scraper"].get("journal_dir", DEFAULT_JOURNAL_DIR)}/ 中的抓取日志继续上次中断的批次')
 
     # 显示板块类型映射
     enabled_boards = config['scraper']['enabled_boards']
@@ -858,8 +1984,8 @@ if '__main__' == __name__:
     log(f'本次抓取板块: {board_display}')
     log('━' * 50)
 
-    # 初始化Socket代理管理器
-    if config['socket_proxy']['enabled']:
+    # 初始化Socket代理管理器（--purge-days只访问数据库，不启动）
+    if config['socket_proxy']['enabled'] and args.purge_days is None:
         try:
             socket_manager = SocketProxyManager(config)
             socket_manager.start()
@@ -868,16 +1994,45 @@ if '__main__' == __name__:
             log('降级到本地直连模式', 'WARN')
             config['socket_proxy']['enabled'] = False
 
+    # CSV压缩方式（zstd需要可选依赖zstandard）
+    if not csv_compression_available(config['scraper'].get('csv_compression', 'none')):
+        log('⚠ 未安装zstandard（pip install zstandard），CSV改用gzip压缩', 'WARN')
+        config['scraper']['csv_compression'] = 'gzip'
+
     # 初始化MySQL数据库（为每个启用的板块类型创建Database实例）
     enabled_boards = config['scraper']['enabled_boards']
-    if config['database']['enabled']:
+    requested_storage = config['scraper'].get('storage_mode', 'auto')
+    if requested_storage == 'parquet':
+        if parquet_store.available():
+            log('使用Parquet存储模式')
+            storage_mode = 'parquet'
+        else:
+            log('⚠ 未安装pyarrow（pip install pyarrow），降级到CSV存储模式', 'WARN')
+            storage_mode = 'csv'
+    elif requested_storage == 'sqlite':
+        # 本地SQLite文件（每个板块类型一个），接口与MySQL相同
+        sqlite_config = dict(config.get('sqlite', {}))
+        sqlite_config['dir'] = path_join(PATH, sqlite_config.get('dir', 'sqlite'))
+        for board_type in enabled_boards:
+            if board_type not in BOARD_CONFIGS:
+                log(f'警告: 未知的板块类型 {board_type}，跳过', 'WARN')
+                continue
+            db_instances[board_type] = SQLiteDatabase(sqlite_config, board_type)
+        log(f'✓ 使用SQLite存储模式: {sqlite_config["dir"]}')
+        storage_mode = 'sqlite'
+    elif requested_storage == 'csv':
+        log('使用CSV存储模式')
+        storage_mode = 'csv'
+    elif config['database']['enabled']:
         try:
+            # 三个板块数据库共用一个连接池，主线程和写入线程各自借出连接
+            db_pool = ConnectionPool(config['database'])
             for board_type in enabled_boards:
                 if board_type not in BOARD_CONFIGS:
                     log(f'警告: 未知的板块类型 {board_type}，跳过', 'WARN')
                     continue
 
-                db = Database(config['database'], board_type)
+                db = Database(config['database'], board_type, db_pool)
                 if db.test_connection():
                     db_instances[board_type] = db
                     log(f'✓ {board_type} MySQL连接成功')
@@ -897,6 +2052,37 @@ if '__main__' == __name__:
         log('MySQL已禁用，使用CSV存储模式')
         storage_mode = 'csv'
 
+    # 清理历史批次后退出
+    if args.purge_days is not None:
+        if not db_instances:
+            log('清理历史批次需要MySQL或SQLite存储模式', 'ERROR')
+            sys.exit(1)
+        for board_type, db in db_instances.items():
+            db.purge_batches(args.purge_days)
+            db.close()
+        if db_pool:
+            db_pool.close()
+        sys.exit(0)
+
+    # 初始化请求速率控制：优先沿用上次成功批次收敛的速率
+    parallel = async_concurrency if engine == 'async' else thread_count
+    initial_rate = config['scraper'].get('initial_rate') or parallel / max(interval, 0.1)
+    for db in db_instances.values():
+        last_rate = db.get_last_request_rate()
+        if last_rate:
+            initial_rate = last_rate
+            break
+    rate_controller = RateController(
+        initial_rate,
+        min_rate = config['scraper'].get('min_rate', 0.2),
+        max_rate = config['scraper'].get('max_rate', DEFAULT_MAX_RATE)
+    )
+    log(f'初始请求速率: {rate_controller.rate:.2f} 次/秒')
+
+    # 初始化常驻工作线程池
+    if engine == 'thread':
+        worker_pool = WorkerPool(thread_count)
+
     # 初始化并发连接限制
     max_concurrent = min(thread_count, 64)
     connection_semaphore = Semaphore(max_concurrent)
@@ -910,8 +2096,9 @@ if '__main__' == __name__:
             'http': proxy_url,
             'https': proxy_url
         }
+        session_pool.set_proxies(session.proxies)
         log(f'Socket代理模式: 127.0.0.1:{proxy_port}')
-    else:
+    elif not args.coordinator:
         log('⚠ 本地直连模式（仅限测试）', 'WARN')
         log('⚠ 生产环境推荐使用Socket代理模式', 'WARN')
 
@@ -923,22 +2110,42 @@ if '__main__' == __name__:
         except Exception as e:
             log(f'网络连接测试失败: {e}', 'WARN')
 
+    coordinator = None
     try:
-        cookies_obj = _10jqka_Cookies(session, user, pwd)
-        check_cookies_valid()
+        if args.coordinator:
+            distributed_config = config.get('distributed', {})
+            coordinator = LeaseCoordinator(
+                *parse_address(args.coordinator),
+                lease_timeout = distributed_config.get('lease_timeout', DEFAULT_LEASE_TIMEOUT),
+                token = distributed_config.get('token'),
+                validate = check_unit_result
+            )
+            coordinator.start()
+        else:
+            cookies_obj = _10jqka_Cookies(
+                session, user, pwd,
+                v_workers = config['scraper'].get('v_workers', DEFAULT_V_WORKERS),
+                v_pool_size = config['scraper'].get('v_pool_size', DEFAULT_V_POOL_SIZE),
+                v_max_age = config['scraper'].get('v_max_age', DEFAULT_V_MAX_AGE)
+            )
+            check_cookies_valid()
 
-        # 根据配置抓取启用的板块类型
+        # 根据配置同时抓取启用的板块类型
         total_start = time()
+        board_types = []
         for board_type in enabled_boards:
             if board_type not in BOARD_CONFIGS:
                 log(f'跳过未知的板块类型: {board_type}', 'WARN')
                 continue
+            board_types.append(board_type)
 
-            if shutdown_event.is_set():
-                log('用户中断，停止抓取', 'WARN')
-                break
-
-            fetch_pages(board_type, config)
+        if args.worker:
+            # 任务由协调者分配，各worker的请求速率和线程数各自独立
+            run_worker(*parse_address(args.worker), execute_unit,
+                       parallel = thread_count, stop = shutdown_event,
+                       token = config.get('distributed', {}).get('token'))
+        else:
+            crawl_boards(board_types, config, coordinator)
 
         total_elapsed = time() - total_start
         log(f'✓ 所有爬取任务完成，总耗时 {total_elapsed:.2f} 秒')
@@ -951,9 +2158,19 @@ if '__main__' == __name__:
     finally:
         # 确保关闭所有资源
         try:
+            if coordinator:
+                # 通知worker批次已结束
+                coordinator.close()
+            if worker_pool:
+                worker_pool.shutdown(wait=False)
+            if cookies_obj:
+                cookies_obj.close()
+            session_pool.close()
             session.close()
             for db in db_instances.values():
                 db.close()
+            if db_pool:
+                db_pool.close()
             if socket_manager:
                 socket_manager.stop()
         except Exception as e:
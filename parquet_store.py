@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parquet列式存储模块
+每个批次写入一对带类型、压缩的Parquet文件（板块信息_*.parquet / 成分股_*.parquet），
+板块名称、股票代码、股票名称使用字典编码；load_parquet_range按日期范围读回Arrow表
+依赖可选的pyarrow（pip install pyarrow），未安装时 available() 返回False
+"""
+
+import logging
+from datetime import date
+from os import listdir, replace
+from typing import Optional
+
+from database import BOARD_CONFIGS
+from encrypt import path_join, exists
+from records import MISSING_SEQ
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPRESSION = 'zstd'
+# 攒够该行数后写出一个row group
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+
+def available() -> bool:
+    """是否已安装pyarrow"""
+    return pa is not None
+
+
+def _dictionary():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def info_schema():
+    """板块信息表结构"""
+    return pa.schema([
+        ('日期', pa.date32()),
+        ('板块名称', _dictionary()),
+        ('来源链接', pa.string()),
+        ('驱动事件', pa.string()),
+        ('成分股数量', pa.int32()),
+    ])
+
+
+def code_schema():
+    """成分股表结构"""
+    return pa.schema([
+        ('原始序号', pa.int32()),
+        ('板块名称', _dictionary()),
+        ('股票代码', _dictionary()),
+        ('股票名称', _dictionary()),
+    ])
+
+
+def _to_date(value: str) -> Optional[date]:
+    """'YYYY-MM-DD' 转为日期，'--'等无效值为None"""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ParquetSink:
+    """
+    写入 板块信息_*.parquet / 成分股_*.parquet（BoardWriter的写入目标）
+
+    先写到 .tmp 文件，close() 时改名，运行中断不会留下不完整的Parquet文件
+    """
+
+    def __init__(self, info_path: str, code_path: str, compression: str = DEFAULT_COMPRESSION,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        """
+        Args:
+            info_path: 板块信息Parquet路径
+            code_path: 成分股Parquet路径
+            compression: 压缩算法（zstd/snappy/gzip/none）
+            row_group_size: 每个row group的行数
+        """
+        if not available():
+            raise RuntimeError("Parquet输出需要pyarrow，请执行: pip install pyarrow")
+        self.info_path = info_path
+        self.code_path = code_path
+        self.row_group_size = row_group_size
+
+        options = dict(compression=compression, use_dictionary=True)
+        self._info_writer = pq.ParquetWriter(info_path + '.tmp', info_schema(), **options)
+        self._code_writer = pq.ParquetWriter(code_path + '.tmp', code_schema(), **options)
+        self._info_rows: list[tuple] = []
+        self._code_rows: list[tuple] = []
+
+    def write(self, boards: list[tuple]) -> None:
+        """
+        缓存一批板块，攒够row_group_size行时写出
+
+        Args:
+            boards: [(板块名称, BoardRecord, StockTable或None), ...]
+        """
+        for name, info, stocks in boards:
+            self._info_rows.append((_to_date(info.date), name, info.link, info.event, info.count))
+            if stocks:
+                self._code_rows.extend(
+                    (None if seq == MISSING_SEQ else seq, name, code, stock_name)
+                    for seq, code, stock_name in stocks
+                )
+
+        if len(self._code_rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        """把缓存的行写成一个row group"""
+        if self._info_rows:
+            self._info_writer.write_table(_table(self._info_rows, info_schema()))
+            self._info_rows = []
+        if self._code_rows:
+            self._code_writer.write_table(_table(self._code_rows, code_schema()))
+            self._code_rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._info_writer.close()
+        self._code_writer.close()
+        replace(self.info_path + '.tmp', self.info_path)
+        replace(self.code_path + '.tmp', self.code_path)
+        logger.info(f"✓ Parquet保存成功: {self.info_path}")
+
+
+def _table(rows: list[tuple], schema):
+    """按列构造Arrow表（字典编码列先建普通字符串数组再编码）"""
+    columns = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_dictionary(field.type):
+            columns.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            columns.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _batch_files(folder: str) -> list[str]:
+    """目录中已完成的批次时间戳（同时有板块信息和成分股文件）"""
+    stamps = []
+    for name in listdir(folder):
+        if name.startswith('板块信息_') and name.endswith('.parquet'):
+            stamp = name[len('板块信息_'):-len('.parquet')]
+            if exists(path_join(folder, f'成分股_{stamp}.parquet')):
+                stamps.append(stamp)
+    return sorted(stamps)
+
+
+def _with_batch(table, stamp: str):
+    """追加批次列（文件名中的时间戳）"""
+    column = pa.array([stamp] * table.num_rows, type=pa.string()).dictionary_encode()
+    return table.append_column(pa.field('批次', _dictionary()), column)
+
+
+def load_parquet_range(board_type: str, result_dir: str, start: str = None, end: str = None):
+    """
+    读取日期范围内所有批次的Parquet文件
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        result_dir: 结果根目录（result/）
+        start: 起始日期（YYYYMMDD或YYYY-MM-DD，含），不指定为不限
+        end: 结束日期（含），不指定为不限
+
+    Returns:
+        (板块信息表, 成分股表): pyarrow.Table，各增加一列"批次"（YYYYMMDDHHMMSS）；
+        范围内没有文件时为空表
+    """
+    if not available():
+        raise RuntimeError("读取Parquet需要pyarrow，请执行: pip install pyarrow")
+
+    start = start.replace('-', '') if start else None
+    end = end.replace('-', '') if end else None
+
+    infos = []
+    codes = []
+    board_folder = path_join(result_dir, BOARD_CONFIGS[board_type]['database'])
+    if exists(board_folder):
+        for date_folder in sorted(listdir(board_folder)):
+            if (start and date_folder < start) or (end and date_folder > end):
+                continue
+            folder = path_join(board_folder, date_folder)
+            for stamp in _batch_files(folder):
+                infos.append(_with_batch(pq.read_table(path_join(folder, f'板块信息_{stamp}.parquet')), stamp))
+                codes.append(_with_batch(pq.read_table(path_join(folder, f'成分股_{stamp}.parquet')), stamp))
+
+    if not infos:
+        empty = [pa.field('批次', _dictionary())]
+        return (pa.schema(list(info_schema()) + empty).empty_table(),
+                pa.schema(list(code_schema()) + empty).empty_table())
+    return pa.concat_tables(infos), pa.concat_tables(codes)
+
+
+def _latest(board_type: str, result_dir: str, exclude: str = None, stamp: str = None):
+    """最近一个（或指定的）批次所在的 (目录, 时间戳)"""
+    board_folder = path_join(result_dir, BOARD_CONFIGS[board_type]['database'])
+    if not exists(board_folder):
+        return None
+
+    for date_folder in sorted(listdir(board_folder), reverse=True):
+        folder = path_join(board_folder, date_folder)
+        for found in reversed(_batch_files(folder)):
+            if found == exclude or (stamp is not None and found != stamp):
+                continue
+            return folder, found
+    return None
+
+
+def latest_stamp(board_type: str, result_dir: str, exclude: str = None) -> Optional[str]:
+    """
+    最近一个批次的时间戳（不读取文件内容）
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        result_dir: 结果根目录（result/）
+        exclude: 需要跳过的时间戳
+
+    Returns:
+        时间戳（YYYYMMDDHHMMSS），没有历史文件时返回None
+    """
+    latest = _latest(board_type, result_dir, exclude)
+    return latest[1] if latest else None
+
+
+def load_latest_batch(board_type: str, result_dir: str, exclude: str = None, stamp: str = None):
+    """
+    读取最近一个批次（增量模式使用）
+
+    Args:
+        board_type: 板块类型（同花顺行业/概念/地域）
+        result_dir: 结果根目录（result/）
+        exclude: 需要跳过的时间戳（本次运行的today）
+        stamp: 指定时间戳，不指定时读取最近一个
+
+    Returns:
+        (时间戳, 板块信息表, 成分股表)，没有历史文件时返回None
+    """
+    if not available():
+        return None
+    latest = _latest(board_type, result_dir, exclude, stamp)
+    if latest is None:
+        return None
+    folder, found = latest
+    return (found,
+            pq.read_table(path_join(folder, f'板块信息_{found}.parquet')),
+            pq.read_table(path_join(folder, f'成分股_{found}.parquet')))
@@ -0,0 +1,99 @@
+-- ============================================
+-- 10jqka板块爬虫 按批次分区脚本（可选）
+-- 说明: 把 板块信息 / 成分股 改为按 批次ID RANGE 分区，
+--       之后每个新批次创建时从 p_max 拆出独立分区 p<批次ID>，
+--       删除批次（完整性校验失败、--purge-days 清理历史）为 DROP PARTITION，不再逐行级联删除
+-- 注意: 分区表不支持外键，本脚本删除两张表指向 爬取记录 的外键，
+--       主键改为 (记录ID, 批次ID)；已有数据全部放入 p_history，仍按行删除
+--       执行前先停止爬虫（不要有"进行中"的批次）
+-- 用法: mysql -u root -p < partition_databases.sql
+-- ============================================
+
+-- --------------------------------------------
+-- 同花顺行业板块
+-- --------------------------------------------
+USE `同花顺行业板块`;
+
+ALTER TABLE `板块信息` DROP FOREIGN KEY `板块信息_ibfk_1`;
+ALTER TABLE `成分股` DROP FOREIGN KEY `成分股_ibfk_1`;
+
+ALTER TABLE `板块信息` DROP PRIMARY KEY, ADD PRIMARY KEY (`记录ID`, `批次ID`);
+ALTER TABLE `成分股` DROP PRIMARY KEY, ADD PRIMARY KEY (`记录ID`, `批次ID`);
+
+SET @history = (SELECT IFNULL(MAX(`批次ID`), 0) + 1 FROM `爬取记录`);
+
+SET @sql = CONCAT('ALTER TABLE `板块信息` PARTITION BY RANGE (`批次ID`) (',
+  'PARTITION `p_history` VALUES LESS THAN (', @history, '), ',
+  'PARTITION `p_max` VALUES LESS THAN MAXVALUE)');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = CONCAT('ALTER TABLE `成分股` PARTITION BY RANGE (`批次ID`) (',
+  'PARTITION `p_history` VALUES LESS THAN (', @history, '), ',
+  'PARTITION `p_max` VALUES LESS THAN MAXVALUE)');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- --------------------------------------------
+-- 概念板块
+-- --------------------------------------------
+USE `概念板块`;
+
+ALTER TABLE `板块信息` DROP FOREIGN KEY `板块信息_ibfk_1`;
+ALTER TABLE `成分股` DROP FOREIGN KEY `成分股_ibfk_1`;
+
+ALTER TABLE `板块信息` DROP PRIMARY KEY, ADD PRIMARY KEY (`记录ID`, `批次ID`);
+ALTER TABLE `成分股` DROP PRIMARY KEY, ADD PRIMARY KEY (`记录ID`, `批次ID`);
+
+SET @history = (SELECT IFNULL(MAX(`批次ID`), 0) + 1 FROM `爬取记录`);
+
+SET @sql = CONCAT('ALTER TABLE `板块信息` PARTITION BY RANGE (`批次ID`) (',
+  'PARTITION `p_history` VALUES LESS THAN (', @history, '), ',
+  'PARTITION `p_max` VALUES LESS THAN MAXVALUE)');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = CONCAT('ALTER TABLE `成分股` PARTITION BY RANGE (`批次ID`) (',
+  'PARTITION `p_history` VALUES LESS THAN (', @history, '), ',
+  'PARTITION `p_max` VALUES LESS THAN MAXVALUE)');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- --------------------------------------------
+-- 地域板块
+-- --------------------------------------------
+USE `地域板块`;
+
+ALTER TABLE `板块信息` DROP FOREIGN KEY `板块信息_ibfk_1`;
+ALTER TABLE `成分股` DROP FOREIGN KEY `成分股_ibfk_1`;
+
+ALTER TABLE `板块信息` DROP PRIMARY KEY, ADD PRIMARY KEY (`记录ID`, `批次ID`);
+ALTER TABLE `成分股` DROP PRIMARY KEY, ADD PRIMARY KEY (`记录ID`, `批次ID`);
+
+SET @history = (SELECT IFNULL(MAX(`批次ID`), 0) + 1 FROM `爬取记录`);
+
+SET @sql = CONCAT('ALTER TABLE `板块信息` PARTITION BY RANGE (`批次ID`) (',
+  'PARTITION `p_history` VALUES LESS THAN (', @history, '), ',
+  'PARTITION `p_max` VALUES LESS THAN MAXVALUE)');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = CONCAT('ALTER TABLE `成分股` PARTITION BY RANGE (`批次ID`) (',
+  'PARTITION `p_history` VALUES LESS THAN (', @history, '), ',
+  'PARTITION `p_max` VALUES LESS THAN MAXVALUE)');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 分区完成
+-- ============================================
+SELECT `TABLE_SCHEMA` AS 数据库, `TABLE_NAME` AS 表, COUNT(*) AS 分区数
+FROM information_schema.`PARTITIONS`
+WHERE `TABLE_NAME` IN ('板块信息', '成分股') AND `PARTITION_NAME` IS NOT NULL
+GROUP BY `TABLE_SCHEMA`, `TABLE_NAME`;
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应请求速率控制模块
+令牌桶限制全局请求速率，AIMD（加性增、乘性减）根据响应状态调整速率
+"""
+
+import asyncio
+import logging
+from threading import Lock, Event
+from time import monotonic, sleep
+from typing import Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 触发降速的响应状态码（需要登录/访问被拒）
+THROTTLE_STATUS = (302, 401, 403)
+
+
+class RateController:
+    """令牌桶 + AIMD 速率控制器（线程安全，所有抓取路径共享）"""
+
+    def __init__(self, initial_rate: float, min_rate: float = 0.2, max_rate: float = 100.0,
+                 increase: float = 0.05, decrease: float = 0.5, burst: float = 1.0,
+                 cooldown: float = 1.0):
+        """
+        Args:
+            initial_rate: 初始速率（请求/秒）
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase: 每个200响应增加的速率（请求/秒）
+            decrease: 被限流时速率乘以的系数
+            burst: 令牌桶容量（允许的突发请求数）
+            cooldown: 两次降速的最小间隔（秒），避免同一波限流响应连续降速
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.cooldown = cooldown
+
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self._tokens = burst
+        self._updated = monotonic()
+        self._last_decrease = 0.0
+        self._lock = Lock()
+
+        # 统计信息
+        self.successes = 0
+        self.throttled = 0
+        self.decreases = 0
+
+    def reserve(self) -> float:
+        """
+        预订一个请求令牌
+
+        Returns:
+            需要等待的秒数（0表示可立即发送）
+        """
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, stop_event: Optional[Event] = None) -> bool:
+        """
+        等待直到可以发送请求
+
+        Args:
+            stop_event: 停止标志，等待期间被设置时立即返回
+
+        Returns:
+            bool: True表示可以发送，False表示被stop_event中断
+        """
+        wait = self.reserve()
+        if wait <= 0:
+            return True
+        if stop_event is None:
+            sleep(wait)
+            return True
+        return not stop_event.wait(wait)
+
+    async def acquire_async(self, stop_event: Optional[Event] = None) -> bool:
+        """acquire的协程版本"""
+        wait = self.reserve()
+        step = 0.05
+        while wait > 0:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            await asyncio.sleep(min(step, wait))
+            wait -= step
+        return True
+
+    def record(self, status: int) -> None:
+        """
+        根据响应状态调整速率：200加性增加，302/401/403乘性减小
+
+        Args:
+            status: HTTP状态码
+        """
+        with self._lock:
+            if status == 200:
+                self.successes += 1
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            elif status in THROTTLE_STATUS:
+                self.throttled += 1
+                now = monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.decreases += 1
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    logger.debug(f"收到 {status}，速率降至 {self.rate:.2f} 次/秒")
+
+    def stats(self) -> dict:
+        """
+        获取速率控制统计
+
+        Returns:
+            dict: rate, successes, throttled, decreases
+        """
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'successes': self.successes,
+                'throttled': self.throttled,
+                'decreases': self.decreases
+            }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+板块记录类型模块
+BoardRecord 替代 board_data 中按位置增长的 [日期, 来源链接, 驱动事件, 成分股数量] 列表；
+StockTable 用数组保存一个板块的成分股（整数序号、驻留的股票代码/名称），
+替代每只股票一个 [序号, 代码, 名称] 字符串列表
+"""
+
+from array import array
+from sys import intern
+from typing import Iterable, Iterator, Optional
+
+from table_parser import IndexRow
+
+# 没有原始序号（历史数据缺失）时的占位值，页面序号从1开始
+MISSING_SEQ = 0
+
+
+def parse_count(value) -> Optional[int]:
+    """
+    成分股数量/原始序号转为整数
+
+    Args:
+        value: 字符串或整数，'--'/空值/None视为未知
+
+    Returns:
+        整数，未知时为None
+    """
+    if value is None or isinstance(value, int):
+        return value
+    value = str(value)
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+class BoardRecord:
+    """列表页的一个板块"""
+
+    __slots__ = ('date', 'link', 'event', 'count')
+
+    def __init__(self, date: str, link: str, event: Optional[str], count: Optional[int]):
+        """
+        Args:
+            date: 日期（YYYY-MM-DD，缺失为'--'）
+            link: 来源链接
+            event: 驱动事件，缺失为None
+            count: 列表页的成分股数量，缺失为None
+        """
+        self.date = date
+        self.link = link
+        self.event = event
+        self.count = count
+
+    @classmethod
+    def from_row(cls, row: IndexRow) -> 'BoardRecord':
+        """由列表页解析结果创建"""
+        return cls(row.date, row.link, row.event if row.event != '--' else None, parse_count(row.count))
+
+    def __repr__(self) -> str:
+        return f'BoardRecord({self.date!r}, {self.link!r}, {self.event!r}, {self.count!r})'
+
+
+class StockTable:
+    """
+    一个板块的成分股
+
+    序号存为 array('i')，股票代码和名称经 sys.intern 驻留（同一只股票在各板块间共享同一个字符串），
+    迭代时给出 (序号, 代码, 名称)
+    """
+
+    __slots__ = ('seqs', 'codes', 'names')
+
+    def __init__(self):
+        self.seqs = array('i')
+        self.codes: list[str] = []
+        self.names: list[str] = []
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> 'StockTable':
+        """
+        由 (序号, 代码, 名称) 序列创建（序号可为字符串，未知时记为MISSING_SEQ）
+
+        Args:
+            rows: CodeRow或 [序号, 代码, 名称] 的序列
+        """
+        table = cls()
+        for seq, code, name in rows:
+            table.append(seq, code, name)
+        return table
+
+    def append(self, seq, code: str, name: str) -> None:
+        """追加一只股票"""
+        seq = parse_count(seq)
+        self.seqs.append(MISSING_SEQ if seq is None else seq)
+        self.codes.append(intern(code))
+        self.names.append(intern(name))
+
+    def sort(self) -> None:
+        """按原始序号排序（序号相同保持原顺序）"""
+        order = sorted(range(len(self.seqs)), key=self.seqs.__getitem__)
+        self.seqs = array('i', (self.seqs[i] for i in order))
+        self.codes = [self.codes[i] for i in order]
+        self.names = [self.names[i] for i in order]
+
+    def deduped(self) -> 'StockTable':
+        """
+        按股票代码去重（保留首次出现）
+
+        Returns:
+            没有重复时返回自身，否则返回新表
+        """
+        if len(set(self.codes)) == len(self.codes):
+            return self
+        table = StockTable()
+        seen = set()
+        for index, code in enumerate(self.codes):
+            if code in seen:
+                continue
+            seen.add(code)
+            table.seqs.append(self.seqs[index])
+            table.codes.append(code)
+            table.names.append(self.names[index])
+        return table
+
+    def seq_or_none(self, index: int) -> Optional[int]:
+        """第index只股票的原始序号，未知时为None"""
+        seq = self.seqs[index]
+        return None if seq == MISSING_SEQ else seq
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator[tuple[int, str, str]]:
+        return zip(self.seqs, self.codes, self.names)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+10jqka回放模块
+Recorder在真实抓取时保存列表页/详情页响应；ReplayServer在本地按 q.10jqka.com.cn 的URL格式
+回放这些页面（或生成模拟页面），可配置延迟、302/403注入和限流，用于离线基准测试
+
+用法:
+  录制:   python3 main.py -u 用户名 -p 密码 -s --record recordings/
+  回放:   python3 replay.py serve -r recordings/ -p 8900 --latency 0.05 --redirect-rate 0.01
+  抓取:   python3 main.py -u x -p x -d --base-url http://127.0.0.1:8900
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import sys
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock, Thread
+from os import makedirs
+from os.path import dirname, join as path_join, exists
+from time import monotonic, sleep
+from typing import Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 与main.index_url / main.detail_url_prefix 构造的URL对应
+INDEX_PATH = re.compile(r'/(gn|thshy|dy)/index/.*?/page/([0-9]+)/')
+DETAIL_PATH = re.compile(r'/(gn|thshy|dy)/detail/.*?/page/([0-9]+)/ajax/1/code/([0-9]+)/')
+
+LOGIN_URL = 'https://upass.10jqka.com.cn/login'
+
+
+def recording_path(root: str, path: str) -> Optional[str]:
+    """
+    URL路径对应的录制文件
+
+    Args:
+        root: 录制目录
+        path: URL路径（或完整URL）
+
+    Returns:
+        <root>/<url_type>/index/<页码>.html 或 <root>/<url_type>/detail/<代码>/<页码>.html，
+        不是列表页/详情页时返回None
+    """
+    m = DETAIL_PATH.search(path)
+    if m:
+        url_type, page, code = m.groups()
+        return path_join(root, url_type, 'detail', code, f'{page}.html')
+    m = INDEX_PATH.search(path)
+    if m:
+        url_type, page = m.groups()
+        return path_join(root, url_type, 'index', f'{page}.html')
+    return None
+
+
+class Recorder:
+    """保存抓取过程中的200响应（作为main.request_observers的回调）"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 录制目录
+        """
+        self.root = root
+        self.saved = 0
+        self._lock = Lock()
+
+    def __call__(self, url: str, status: int, content: bytes, elapsed: float) -> None:
+        """
+        记录一次响应
+
+        Args:
+            url: 请求URL
+            status: 状态码
+            content: 响应体（GBK原始字节）
+            elapsed: 请求耗时（秒）
+        """
+        if status != 200:
+            return
+        path = recording_path(self.root, url)
+        if path is None:
+            return
+        with self._lock:
+            makedirs(dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+            self.saved += 1
+
+
+class RecordingSource:
+    """从录制目录读取页面"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 录制目录
+        """
+        if not exists(root):
+            raise FileNotFoundError(f"录制目录不存在: {root}")
+        self.root = root
+
+    def get(self, path: str) -> Optional[bytes]:
+        """返回URL路径对应的页面，没有录制时返回None"""
+        file_path = recording_path(self.root, path)
+        if file_path is None or not exists(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+
+class SyntheticSource:
+    """生成与10jqka结构一致的模拟页面（没有录制数据时使用）"""
+
+    def __init__(self, boards: int = 300, stocks: int = 60, index_per_page: int = 50, detail_per_page: int = 20):
+        """
+        Args:
+            boards: 每种板块类型的板块数
+            stocks: 每个板块的成分股数
+            index_per_page: 列表页每页板块数
+            detail_per_page: 详情页每页股票数
+        """
+        self.boards = boards
+        self.stocks = stocks
+        self.index_per_page = index_per_page
+        self.detail_per_page = detail_per_page
+        self.index_pages = max(1, (boards + index_per_page - 1) // index_per_page)
+        self.detail_pages = max(1, (stocks + detail_per_page - 1) // detail_per_page)
+
+    def _index_page(self, url_type: str, page: int) -> bytes:
+        rows = []
+        first = (page - 1) * self.index_per_page
+        for i in range(first, min(self.boards, first + self.index_per_page)):
+            code = 300000 + i
+            rows.append(
+                f'<tr>\n<td>2025-11-{i % 28 + 1:02d}</td>\n'
+                f'<td><a href="http://q.10jqka.com.cn/{url_type}/detail/code/{code}/" target="_blank">{url_type}板块{i}</a></td>\n'
+                f'<td><a href="http://news.10jqka.com.cn/20251123/c{code}.shtml" target="_blank">驱动事件{code}</a></td>\n'
+                f'<td>{self.stocks}</td>\n</tr>'
+            )
+        return (
+            '<table class="m-table m-pager-table"><thead><tr><th>日期</th><th>名称</th>'
+            '<th>驱动事件</th><th>成分股数量</th></tr></thead>\n<tbody>\n' + '\n'.join(rows) +
+            f'\n</tbody></table>\n<div class="m-pager" id="m-page">'
+            f'<span class="page_info">{page}/{self.index_pages}</span></div>'
+        ).encode('gbk')
+
+    def _detail_page(self, code: int, page: int) -> bytes:
+        rows = []
+        first = (page - 1) * self.detail_per_page
+        for i in range(first, min(self.stocks, first + self.detail_per_page)):
+            stock = f'{600000 + (code * 7 + i * 13) % 4000:06d}'
+            rows.append(
+                f'<tr>\n<td>{i + 1}</td>\n'
+                f'<td><a href="http://stockpage.10jqka.com.cn/{stock}/" target="_blank">{stock}</a></td>\n'
+                f'<td><a href="http://stockpage.10jqka.com.cn/{stock}" target="_blank">股票{stock}</a></td>\n'
+                '<td class="c-rise">10.25</td>\n<td class="c-rise">1.23</td>\n<td>12.3亿</td>\n</tr>'
+            )
+        page_info = f'<span class="page_info">{page}/{self.detail_pages}</span>' if self.detail_pages > 1 else ''
+        return (
+            '<table class="m-table m-pager-table"><thead><tr><th>序号</th><th>代码</th><th>名称</th></tr></thead>\n'
+            '<tbody>\n' + '\n'.join(rows) + f'\n</tbody></table>\n<div class="m-pager" id="m-page">{page_info}</div>'
+        ).encode('gbk')
+
+    def get(self, path: str) -> Optional[bytes]:
+        """返回URL路径对应的模拟页面"""
+        m = DETAIL_PATH.search(path)
+        if m:
+            page, code = int(m.group(2)), int(m.group(3))
+            if not 1 <= page <= self.detail_pages or not 300000 <= code < 300000 + self.boards:
+                return None
+            return self._detail_page(code, page)
+        m = INDEX_PATH.search(path)
+        if m:
+            # 超出总页数时按最后一页返回（main首次请求gn第30页读取page_info）
+            return self._index_page(m.group(1), min(int(m.group(2)), self.index_pages))
+        return None
+
+
+class ReplayServer:
+    """本地10jqka替身服务器"""
+
+    def __init__(self, source, port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 redirect_rate: float = 0.0, forbidden_rate: float = 0.0, rate_limit: float = 0.0):
+        """
+        Args:
+            source: 页面来源（RecordingSource/SyntheticSource）
+            port: 监听端口（0为自动分配）
+            latency: 每个请求的固定延迟（秒）
+            jitter: 额外随机延迟上限（秒）
+            redirect_rate: 返回302（要求登录）的概率
+            forbidden_rate: 返回403的概率
+            rate_limit: 每秒允许的请求数，超出返回403（0为不限流）
+        """
+        self.source = source
+        self.latency = latency
+        self.jitter = jitter
+        self.redirect_rate = redirect_rate
+        self.forbidden_rate = forbidden_rate
+        self.rate_limit = rate_limit
+
+        self._lock = Lock()
+        self._tokens = rate_limit
+        self._updated = monotonic()
+        self.counters = {'requests': 0, 'served': 0, 'redirected': 0, 'forbidden': 0, 'throttled': 0, 'missing': 0}
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+    def _over_limit(self) -> bool:
+        """令牌桶限流（容量为1秒的请求数）"""
+        if self.rate_limit <= 0:
+            return False
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def stats(self) -> dict:
+        """请求统计"""
+        with self._lock:
+            return dict(self.counters)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b'', headers: dict = None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/__stats':
+                    self._send(200, json.dumps(server.stats()).encode(), {'Content-Type': 'application/json'})
+                    return
+
+                server._count('requests')
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+                if delay > 0:
+                    sleep(delay)
+
+                if server._over_limit():
+                    server._count('throttled')
+                    self._send(403)
+                    return
+                roll = random.random()
+                if roll < server.redirect_rate:
+                    server._count('redirected')
+                    self._send(302, headers={'Location': LOGIN_URL})
+                    return
+                if roll < server.redirect_rate + server.forbidden_rate:
+                    server._count('forbidden')
+                    self._send(403)
+                    return
+
+                body = server.source.get(self.path)
+                if body is None:
+                    server._count('missing')
+                    self._send(404)
+                    return
+                server._count('served')
+                self._send(200, body, {'Content-Type': 'text/html; charset=gbk'})
+
+        return Handler
+
+    def start(self) -> 'ReplayServer':
+        """后台线程启动服务"""
+        self._thread = Thread(target=self.httpd.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """前台运行"""
+        self.httpd.serve_forever()
+
+    def stop(self) -> None:
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """回放服务器参数（serve子命令和benchmark e2e共用）"""
+    parser.add_argument('-r', '--recordings', type=str, help='录制目录（默认生成模拟页面）')
+    parser.add_argument('--boards', type=int, default=300, help='模拟页面: 每种板块类型的板块数')
+    parser.add_argument('--stocks', type=int, default=60, help='模拟页面: 每个板块的成分股数')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='额外随机延迟上限（秒）')
+    parser.add_argument('--redirect-rate', type=float, default=0.0, help='302注入概率')
+    parser.add_argument('--forbidden-rate', type=float, default=0.0, help='403注入概率')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='每秒请求数上限，超出返回403（0为不限）')
+
+
+def server_from_args(args, port: int = 0) -> ReplayServer:
+    """根据命令行参数创建ReplayServer"""
+    source = RecordingSource(args.recordings) if args.recordings else SyntheticSource(args.boards, args.stocks)
+    return ReplayServer(
+        source, port,
+        latency = args.latency,
+        jitter = args.jitter,
+        redirect_rate = args.redirect_rate,
+        forbidden_rate = args.forbidden_rate,
+        rate_limit = args.rate_limit
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='10jqka本地回放服务器')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='启动回放服务器')
+    serve.add_argument('-p', '--port', type=int, default=8900, help='监听端口（0为自动分配）')
+    add_server_arguments(serve)
+
+    args = parser.parse_args()
+    server = server_from_args(args, args.port)
+    # 第一行输出监听地址，便于其他进程读取
+    print(server.base_url, flush=True)
+    logger.info(f"回放服务器已启动: {server.base_url}（{'录制目录 ' + args.recordings if args.recordings else '模拟页面'}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logger.info(f"回放服务器已停止: {server.stats()}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP会话池模块
+每个工作线程持有独立的Session（独立连接池），Cookie统一来自带版本号的CookieStore；
+重新登录时发布新版本，各线程在下一次请求前自动同步
+"""
+
+import logging
+from threading import Lock, local
+from typing import Optional
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.utils import cookiejar_from_dict
+from urllib3.util.retry import Retry
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def make_session(headers: dict, proxies: Optional[dict] = None, pool_maxsize: int = 64) -> Session:
+    """
+    创建带重试适配器的Session
+
+    Args:
+        headers: 默认请求头
+        proxies: 代理配置
+        pool_maxsize: 连接池大小
+
+    Returns:
+        Session实例
+    """
+    session = Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers = dict(headers)
+    if proxies:
+        session.proxies = dict(proxies)
+    return session
+
+
+class CookieStore:
+    """带版本号的集中Cookie存储（线程安全）"""
+
+    def __init__(self, cookies: dict):
+        """
+        Args:
+            cookies: 初始cookies字典
+        """
+        self._lock = Lock()
+        self._cookies = dict(cookies)
+        self._version = 1
+
+    @property
+    def version(self) -> int:
+        """当前版本号"""
+        return self._version
+
+    def snapshot(self) -> tuple[int, dict]:
+        """
+        获取当前版本的cookies
+
+        Returns:
+            (版本号, cookies字典副本)
+        """
+        with self._lock:
+            return self._version, dict(self._cookies)
+
+    def publish(self, cookies: dict) -> int:
+        """
+        原子替换cookies并递增版本号
+
+        Args:
+            cookies: 新的cookies字典
+
+        Returns:
+            新版本号
+        """
+        with self._lock:
+            self._cookies = dict(cookies)
+            self._version += 1
+            logger.info(f"✓ Cookies已更新到版本 {self._version}")
+            return self._version
+
+
+class SessionPool:
+    """每线程一个Session的会话池"""
+
+    def __init__(self, store: CookieStore, headers: dict, pool_maxsize: int = 4):
+        """
+        Args:
+            store: 集中Cookie存储
+            headers: 默认请求头
+            pool_maxsize: 每个Session的连接池大小
+        """
+        self.store = store
+        self.headers = dict(headers)
+        self.proxies: Optional[dict] = None
+        self.pool_maxsize = pool_maxsize
+        self._local = local()
+        self._sessions: list[Session] = []
+        self._hooks: list = []
+        self._lock = Lock()
+
+    def add_response_hook(self, hook):
+        """为所有Session（已有和之后新建的）添加requests响应钩子"""
+        with self._lock:
+            self._hooks.append(hook)
+            for session in self._sessions:
+                session.hooks['response'].append(hook)
+
+    def set_proxies(self, proxies: Optional[dict]):
+        """设置代理（对之后新建和已有的Session都生效）"""
+        with self._lock:
+            self.proxies = dict(proxies) if proxies else None
+            for session in self._sessions:
+                session.proxies = dict(proxies) if proxies else {}
+
+    def get(self) -> Session:
+        """
+        获取当前线程的Session，Cookie版本落后时先同步
+
+        Returns:
+            当前线程专属的Session
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = make_session(self.headers, self.proxies, self.pool_maxsize)
+            session.hooks['response'].extend(self._hooks)
+            self._local.session = session
+            self._local.version = 0
+            with self._lock:
+                self._sessions.append(session)
+
+        if self._local.version != self.store.version:
+            version, cookies = self.store.snapshot()
+            session.cookies = cookiejar_from_dict(cookies)
+            self._local.version = version
+
+        return session
+
+    def current_version(self) -> int:
+        """当前线程Session使用的Cookie版本"""
+        return getattr(self._local, 'version', 0)
+
+    def size(self) -> int:
+        """已创建的Session数量"""
+        with self._lock:
+            return len(self._sessions)
+
+    def close(self):
+        """关闭所有Session"""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
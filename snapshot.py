@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成分股快照索引模块
+把最近一次成功批次（MySQL/SQLite/CSV/Parquet）加载为双向CSR索引：
+板块 -> 成分股、股票 -> 所属板块，查询为一次字典查找加一次数组切片；
+索引可缓存为文件，消费进程重启后mmap映射即可使用，发现更新的批次时自动重建
+
+用法:
+  python3 snapshot.py -B 2 -s csv --stock 600000
+  python3 snapshot.py -B 2 -s mysql --board 人工智能 --cache cache/概念.snap
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import sys
+from array import array
+from os import makedirs, replace
+from os.path import dirname, exists
+from threading import Event, Lock, Thread
+from time import time
+from typing import Optional
+
+from database import BOARD_CONFIGS
+from incremental import load_previous_from_db, load_previous_from_csv, load_previous_from_parquet, latest_csv_stamp
+import parquet_store
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 缓存文件格式: MAGIC | 头部长度(uint32) | 头部JSON | 对齐到4字节 | 4个uint32数组
+MAGIC = b'THSSNAP1'
+DEFAULT_REFRESH_INTERVAL = 60
+
+
+class Snapshot:
+    """
+    一个批次的成分股双向索引
+
+    板块和股票各自编号，关系存两份CSR（偏移数组 + 成员数组）：
+    board_offsets[i]:board_offsets[i+1] 是第i个板块的股票编号，stock_offsets同理
+    """
+
+    def __init__(self, version, boards: list[str], codes: list[str], names: list[str],
+                 board_offsets, board_members, stock_offsets, stock_members, source: str = ''):
+        """
+        Args:
+            version: 批次标识（MySQL/SQLite为批次ID，CSV/Parquet为时间戳）
+            boards: 板块名称（按编号）
+            codes: 股票代码（按编号）
+            names: 股票名称（按编号）
+            board_offsets: 板块 -> 股票 的偏移数组（长度为板块数+1）
+            board_members: 板块 -> 股票 的成员数组（股票编号）
+            stock_offsets: 股票 -> 板块 的偏移数组（长度为股票数+1）
+            stock_members: 股票 -> 板块 的成员数组（板块编号）
+            source: 数据来源描述
+        """
+        self.version = version
+        self.source = source
+        self.boards = boards
+        self.codes = codes
+        self.names = names
+        self.board_offsets = board_offsets
+        self.board_members = board_members
+        self.stock_offsets = stock_offsets
+        self.stock_members = stock_members
+        self._board_index = {name: i for i, name in enumerate(boards)}
+        self._code_index = {code: i for i, code in enumerate(codes)}
+        self._mmap = None
+
+    @classmethod
+    def build(cls, version, previous: dict, source: str = '') -> 'Snapshot':
+        """
+        由 {板块名称: {'stocks': [[序号, 代码, 名称], ...]}} 构建索引（incremental.load_previous_* 的返回值）
+
+        Args:
+            version: 批次标识
+            previous: 批次数据
+            source: 数据来源描述
+
+        Returns:
+            Snapshot实例
+        """
+        boards = sorted(previous)
+        code_index: dict[str, int] = {}
+        names: dict[str, str] = {}
+        board_offsets = array('I', [0])
+        board_members = array('I')
+        for board in boards:
+            seen = set()
+            for _, code, name in previous[board]['stocks']:
+                if code in seen:
+                    continue
+                seen.add(code)
+                if code not in code_index:
+                    code_index[code] = len(code_index)
+                    names[code] = name
+                board_members.append(code_index[code])
+            board_offsets.append(len(board_members))
+
+        # 股票编号按代码排序，便于对比和输出
+        codes = sorted(code_index)
+        remap = array('I', bytes(4 * len(codes)))
+        for new, code in enumerate(codes):
+            remap[code_index[code]] = new
+        for i, old in enumerate(board_members):
+            board_members[i] = remap[old]
+
+        # 反向CSR：先计数再填充
+        counts = [0] * (len(codes) + 1)
+        for stock in board_members:
+            counts[stock + 1] += 1
+        for i in range(len(codes)):
+            counts[i + 1] += counts[i]
+        stock_offsets = array('I', counts)
+        stock_members = array('I', bytes(4 * len(board_members)))
+        cursor = list(counts[:-1])
+        for board in range(len(boards)):
+            for k in range(board_offsets[board], board_offsets[board + 1]):
+                stock = board_members[k]
+                stock_members[cursor[stock]] = board
+                cursor[stock] += 1
+
+        return cls(version, boards, codes, [names[code] for code in codes],
+                   board_offsets, board_members, stock_offsets, stock_members, source)
+
+    def boards_of(self, code: str) -> list[str]:
+        """
+        包含某只股票的板块
+
+        Args:
+            code: 股票代码
+
+        Returns:
+            板块名称列表，未知代码为空
+        """
+        i = self._code_index.get(code)
+        if i is None:
+            return []
+        boards = self.boards
+        return [boards[b] for b in self.stock_members[self.stock_offsets[i]:self.stock_offsets[i + 1]]]
+
+    def stocks_of(self, board: str) -> list[str]:
+        """
+        板块的成分股代码
+
+        Args:
+            board: 板块名称
+
+        Returns:
+            股票代码列表（页面顺序），未知板块为空
+        """
+        i = self._board_index.get(board)
+        if i is None:
+            return []
+        codes = self.codes
+        return [codes[s] for s in self.board_members[self.board_offsets[i]:self.board_offsets[i + 1]]]
+
+    def stock_name(self, code: str) -> Optional[str]:
+        """股票名称，未知代码返回None"""
+        i = self._code_index.get(code)
+        return self.names[i] if i is not None else None
+
+    def stats(self) -> dict:
+        return {
+            'version': self.version,
+            'source': self.source,
+            'boards': len(self.boards),
+            'stocks': len(self.codes),
+            'links': len(self.board_members),
+        }
+
+    def save(self, path: str) -> None:
+        """
+        写入缓存文件（先写临时文件再改名，读取方不会看到写了一半的文件）
+
+        Args:
+            path: 缓存文件路径
+        """
+        header = json.dumps({
+            'version': self.version,
+            'source': self.source,
+            'byteorder': sys.byteorder,
+            'boards': self.boards,
+            'codes': self.codes,
+            'names': self.names,
+            'links': len(self.board_members),
+        }, ensure_ascii=False).encode('utf-8')
+
+        if dirname(path):
+            makedirs(dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(4, 'little'))
+            f.write(header)
+            f.write(b'\0' * (-f.tell() % 4))
+            for values in (self.board_offsets, self.board_members, self.stock_offsets, self.stock_members):
+                array('I', values).tofile(f)
+        replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path: str) -> 'Snapshot':
+        """
+        映射缓存文件（数组直接引用mmap内存，不复制）
+
+        Args:
+            path: 缓存文件路径
+
+        Returns:
+            Snapshot实例
+
+        Raises:
+            ValueError: 文件格式不符或字节序不同
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            mapped.close()
+            raise ValueError(f"不是快照缓存文件: {path}")
+
+        pos = len(MAGIC)
+        size = int.from_bytes(mapped[pos:pos + 4], 'little')
+        pos += 4
+        header = json.loads(mapped[pos:pos + size].decode('utf-8'))
+        if header['byteorder'] != sys.byteorder:
+            mapped.close()
+            raise ValueError(f"快照缓存字节序不同: {path}")
+        pos += size
+        pos += -pos % 4
+
+        arrays = []
+        view = memoryview(mapped)
+        for length in (len(header['boards']) + 1, header['links'], len(header['codes']) + 1, header['links']):
+            arrays.append(view[pos:pos + 4 * length].cast('I'))
+            pos += 4 * length
+
+        snapshot = cls(header['version'], header['boards'], header['codes'], header['names'],
+                       *arrays, source=header['source'])
+        snapshot._mmap = mapped
+        return snapshot
+
+
+class DatabaseSource:
+    """从MySQL/SQLite读取最近一次成功批次"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: Database/SQLiteDatabase实例
+        """
+        self.db = db
+
+    def latest_version(self) -> Optional[int]:
+        return self.db.get_latest_success_batch_id()
+
+    def load(self, version) -> Optional[dict]:
+        return load_previous_from_db(self.db, version)
+
+    def __str__(self) -> str:
+        return f'{type(self.db).__name__}:{self.db.database_name}'
+
+
+class CSVSource:
+    """从CSV输出目录读取最近一次结果"""
+
+    def __init__(self, board_type: str, result_dir: str):
+        """
+        Args:
+            board_type: 板块类型（同花顺行业/概念/地域）
+            result_dir: 结果根目录（result/）
+        """
+        self.board_type = board_type
+        self.result_dir = result_dir
+
+    def latest_version(self) -> Optional[str]:
+        return latest_csv_stamp(self.board_type, self.result_dir)
+
+    def load(self, version) -> Optional[dict]:
+        return load_previous_from_csv(self.board_type, self.result_dir, stamp=version)
+
+    def __str__(self) -> str:
+        return f'csv:{self.board_type}'
+
+
+class ParquetSource(CSVSource):
+    """从Parquet输出目录读取最近一次结果"""
+
+    def latest_version(self) -> Optional[str]:
+        return parquet_store.latest_stamp(self.board_type, self.result_dir)
+
+    def load(self, version) -> Optional[dict]:
+        return load_previous_from_parquet(self.board_type, self.result_dir, stamp=version)
+
+    def __str__(self) -> str:
+        return f'parquet:{self.board_type}'
+
+
+class SnapshotReader:
+    """
+    持有当前快照，后台线程定期检查数据源是否有更新的批次
+
+    启动时优先映射缓存文件；缓存批次落后于数据源时重建并覆盖缓存
+    """
+
+    def __init__(self, source, cache_path: str = None, refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                 auto_refresh: bool = True):
+        """
+        Args:
+            source: DatabaseSource / CSVSource / ParquetSource
+            cache_path: 缓存文件路径，不指定时不缓存
+            refresh_interval: 检查新批次的间隔（秒）
+            auto_refresh: 是否启动后台刷新线程
+        """
+        self.source = source
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self.snapshot: Optional[Snapshot] = None
+        self.refreshes = 0
+        self._lock = Lock()
+        self._stop = Event()
+
+        if cache_path and exists(cache_path):
+            try:
+                start = time()
+                self.snapshot = Snapshot.load(cache_path)
+                logger.info(f"✓ 快照缓存已映射: {cache_path}（批次 {self.snapshot.version}，{(time() - start) * 1000:.1f}ms）")
+            except Exception as e:
+                logger.warning(f"快照缓存不可用，重新加载: {e}")
+        self.refresh()
+
+        self._thread = None
+        if auto_refresh:
+            self._thread = Thread(target=self._run, name='snapshot-refresh', daemon=True)
+            self._thread.start()
+
+    def refresh(self) -> bool:
+        """
+        数据源有不同于当前快照的批次时重建
+
+        Returns:
+            是否更新了快照
+        """
+        with self._lock:
+            version = self.source.latest_version()
+            if version is None or (self.snapshot is not None and self.snapshot.version == version):
+                return False
+
+            start = time()
+            previous = self.source.load(version)
+            if previous is None:
+                return False
+            snapshot = Snapshot.build(version, previous, str(self.source))
+            if self.cache_path:
+                snapshot.save(self.cache_path)
+            # 替换引用，正在查询旧快照的线程不受影响
+            self.snapshot = snapshot
+            self.refreshes += 1
+            stats = snapshot.stats()
+            logger.info(
+                f"✓ 快照已更新: {self.source} 批次 {version}，{stats['boards']} 个板块, "
+                f"{stats['stocks']} 只股票, {stats['links']} 条关系（{(time() - start) * 1000:.0f}ms）"
+            )
+            return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"快照刷新失败: {e}")
+
+    def boards_of(self, code: str) -> list[str]:
+        """包含某只股票的板块（当前快照）"""
+        snapshot = self.snapshot
+        return snapshot.boards_of(code) if snapshot else []
+
+    def stocks_of(self, board: str) -> list[str]:
+        """板块的成分股代码（当前快照）"""
+        snapshot = self.snapshot
+        return snapshot.stocks_of(board) if snapshot else []
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+def main() -> None:
+    from encrypt import PATH, path_join
+    import toml
+
+    boards = list(BOARD_CONFIGS)
+    parser = argparse.ArgumentParser(description='成分股快照查询')
+    parser.add_argument('-B', '--board-type', type=int, choices=[1, 2, 3], default=2,
+                        help='板块: 1=同花顺行业 2=概念 3=地域')
+    parser.add_argument('-s', '--source', type=str, choices=['mysql', 'sqlite', 'csv', 'parquet'], default='csv',
+                        help='数据来源')
+    parser.add_argument('-c', '--config', type=str, default='config.toml', help='配置文件（mysql/sqlite连接）')
+    parser.add_argument('--cache', type=str, help='快照缓存文件路径')
+    parser.add_argument('--stock', type=str, nargs='*', default=[], help='查询包含这些股票的板块')
+    parser.add_argument('--board', type=str, nargs='*', default=[], help='查询这些板块的成分股')
+    args = parser.parse_args()
+
+    board_type = boards[args.board_type - 1]
+    config = {}
+    if exists(path_join(PATH, args.config)):
+        with open(path_join(PATH, args.config), 'r', encoding='utf-8') as f:
+            config = toml.load(f)
+
+    db = None
+    if args.source == 'mysql':
+        from database import Database
+        db = Database(config.get('database', {}), board_type)
+        source = DatabaseSource(db)
+    elif args.source == 'sqlite':
+        from sqlite_database import SQLiteDatabase
+        sqlite_config = dict(config.get('sqlite', {}))
+        sqlite_config['dir'] = path_join(PATH, sqlite_config.get('dir', 'sqlite'))
+        db = SQLiteDatabase(sqlite_config, board_type)
+        source = DatabaseSource(db)
+    elif args.source == 'parquet':
+        source = ParquetSource(board_type, path_join(PATH, 'result'))
+    else:
+        source = CSVSource(board_type, path_join(PATH, 'result'))
+
+    reader = SnapshotReader(source, args.cache, auto_refresh=False)
+    try:
+        if reader.snapshot is None:
+            logger.error(f"没有可用的批次: {source}")
+            sys.exit(1)
+        print(json.dumps(reader.snapshot.stats(), ensure_ascii=False))
+        for code in args.stock:
+            print(f'{code} {reader.snapshot.stock_name(code)}: {", ".join(reader.boards_of(code))}')
+        for board in args.board:
+            print(f'{board}: {", ".join(reader.stocks_of(board))}')
+    finally:
+        reader.close()
+        if db:
+            db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
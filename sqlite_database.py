@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite数据库操作模块
+没有MySQL服务器时的本地存储：每个板块类型一个数据库文件（同花顺行业板块.db/概念板块.db/地域板块.db），
+表结构、索引和接口与 database.Database 相同，使用WAL模式和批量预编译插入
+"""
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from os import makedirs
+from threading import Lock, get_ident
+from typing import List, Dict, Optional
+
+from database import BOARD_CONFIGS
+from encrypt import path_join
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 其他连接持有写锁时等待的秒数
+DEFAULT_BUSY_TIMEOUT = 30
+
+# 与init_databases.sql相同的表结构（SQLite索引名需在库内唯一，加表名前缀）
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS `爬取记录` (
+  `批次ID` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `抓取时间` TEXT NOT NULL,
+  `结束时间` TEXT DEFAULT NULL,
+  `爬取耗时秒数` REAL DEFAULT NULL,
+  `请求速率` REAL DEFAULT NULL,
+  `板块总数` INTEGER DEFAULT 0,
+  `股票总数` INTEGER DEFAULT 0,
+  `执行状态` TEXT DEFAULT '进行中' CHECK (`执行状态` IN ('进行中', '成功', '失败')),
+  `错误信息` TEXT DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS `idx_爬取记录_抓取时间` ON `爬取记录` (`抓取时间`);
+CREATE INDEX IF NOT EXISTS `idx_爬取记录_执行状态` ON `爬取记录` (`执行状态`);
+
+CREATE TABLE IF NOT EXISTS `板块信息` (
+  `记录ID` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `批次ID` INTEGER NOT NULL REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  `板块名称` TEXT NOT NULL,
+  `来源链接` TEXT DEFAULT NULL,
+  `驱动事件` TEXT DEFAULT NULL,
+  `成分股数量` INTEGER DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS `idx_板块信息_批次ID` ON `板块信息` (`批次ID`);
+CREATE INDEX IF NOT EXISTS `idx_板块信息_板块名称` ON `板块信息` (`板块名称`);
+
+CREATE TABLE IF NOT EXISTS `成分股` (
+  `记录ID` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `批次ID` INTEGER NOT NULL REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  `板块名称` TEXT NOT NULL,
+  `股票代码` TEXT NOT NULL,
+  `股票名称` TEXT NOT NULL,
+  `原始序号` INTEGER DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS `idx_成分股_批次ID` ON `成分股` (`批次ID`);
+CREATE INDEX IF NOT EXISTS `idx_成分股_股票代码` ON `成分股` (`股票代码`);
+CREATE INDEX IF NOT EXISTS `idx_成分股_板块名称` ON `成分股` (`板块名称`);
+CREATE INDEX IF NOT EXISTS `idx_成分股_批次板块股票` ON `成分股` (`批次ID`, `板块名称`, `股票代码`);
+
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `批次ID` INTEGER NOT NULL REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  `板块名称` TEXT NOT NULL,
+  `相关板块` TEXT NOT NULL,
+  `共同成分股数` INTEGER NOT NULL,
+  `相似度` REAL NOT NULL,
+  `排名` INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS `idx_板块重叠_批次板块` ON `板块重叠` (`批次ID`, `板块名称`, `排名`);
+"""
+
+
+class SQLiteDatabase:
+    """SQLite数据库操作类（接口与Database相同）"""
+
+    def __init__(self, config: dict, board_type: str):
+        """
+        打开（不存在时创建）板块类型对应的数据库文件
+
+        每个线程使用自己的连接，写入由SQLite串行化（WAL模式下读不阻塞写）
+
+        Args:
+            config: SQLite配置字典，包含dir（数据库文件目录）、synchronous、busy_timeout
+            board_type: 板块类型（同花顺行业/概念/地域）
+        """
+        if board_type not in BOARD_CONFIGS:
+            raise ValueError(f"不支持的板块类型: {board_type}，必须是：{list(BOARD_CONFIGS.keys())}")
+
+        self.board_type = board_type
+        self.database_name = BOARD_CONFIGS[board_type]['database']
+        self.config = config
+        directory = config.get('dir', 'sqlite')
+        makedirs(directory, exist_ok=True)
+        self.path = path_join(directory, f'{self.database_name}.db')
+
+        self._held: dict[int, sqlite3.Connection] = {}  # 线程ID -> 连接
+        self._held_lock = Lock()
+        self._transactions: set[int] = set()
+
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+        logger.info(f"✓ SQLite数据库已打开: {self.path}")
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """当前线程的连接（首次使用时打开）"""
+        ident = get_ident()
+        connection = self._held.get(ident)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.config.get('busy_timeout', DEFAULT_BUSY_TIMEOUT),
+                check_same_thread=False
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={self.config.get('synchronous', 'NORMAL')}")
+            connection.execute("PRAGMA foreign_keys=ON")
+            with self._held_lock:
+                self._held[ident] = connection
+        return connection
+
+    @property
+    def _in_transaction(self) -> bool:
+        """当前线程是否处于transaction()中"""
+        return get_ident() in self._transactions
+
+    def test_connection(self):
+        """测试数据库连接是否有效"""
+        try:
+            self.connection.execute("SELECT 1")
+            return True
+        except Exception as e:
+            logger.error(f"数据库连接测试失败: {e}")
+            return False
+
+    @contextmanager
+    def transaction(self):
+        """
+        事务上下文管理器
+        用法: with db.transaction(): ...
+        """
+        ident = get_ident()
+        self._transactions.add(ident)
+        try:
+            yield
+            self.connection.commit()
+            logger.debug("事务提交成功")
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"事务回滚: {e}")
+            raise
+        finally:
+            self._transactions.discard(ident)
+
+    def rollback(self):
+        """手动回滚事务"""
+        connection = self._held.get(get_ident())
+        if connection:
+            connection.rollback()
+            logger.info("事务已回滚")
+
+    def commit(self):
+        """手动提交事务"""
+        connection = self._held.get(get_ident())
+        if connection:
+            connection.commit()
+            logger.debug("事务已提交")
+
+    def _commit(self):
+        """不在transaction()中时立即提交"""
+        if not self._in_transaction:
+            self.connection.commit()
+
+    def create_batch(self) -> int:
+        """
+        创建新的抓取批次
+
+        Returns:
+            批次ID: 新创建的批次ID
+        """
+        try:
+            cursor = self.connection.execute(
+                "INSERT INTO `爬取记录` (`抓取时间`, `执行状态`) VALUES (datetime('now', 'localtime'), '进行中')"
+            )
+            self.connection.commit()
+            batch_id = cursor.lastrowid
+            logger.info(f"✓ 创建批次 #{batch_id} (类型: {self.board_type})")
+            return batch_id
+        except Exception as e:
+            logger.error(f"创建批次失败: {e}")
+            raise
+
+    def update_batch_status(self, batch_id: int, status: str,
+                           total_boards: int = None, total_stocks: int = None,
+                           elapsed_seconds: float = None, error_message: str = None,
+                           request_rate: float = None):
+        """
+        更新批次状态
+
+        Args:
+            batch_id: 批次ID
+            status: 状态 (进行中/成功/失败)
+            total_boards: 板块总数
+            total_stocks: 股票总数
+            elapsed_seconds: 耗时（秒）
+            error_message: 错误信息（失败时）
+            request_rate: 本次抓取收敛的请求速率（次/秒）
+        """
+        try:
+            self.connection.execute(
+                """
+                UPDATE `爬取记录`
+                SET `执行状态` = ?,
+                    `结束时间` = datetime('now', 'localtime'),
+                    `板块总数` = COALESCE(?, `板块总数`),
+                    `股票总数` = COALESCE(?, `股票总数`),
+                    `爬取耗时秒数` = COALESCE(?, `爬取耗时秒数`),
+                    `请求速率` = COALESCE(?, `请求速率`),
+                    `错误信息` = ?
+                WHERE `批次ID` = ?
+                """,
+                (status, total_boards, total_stocks, elapsed_seconds, request_rate, error_message, batch_id)
+            )
+            self.connection.commit()
+            logger.info(f"✓ 批次 #{batch_id} 状态更新为: {status}")
+        except Exception as e:
+            logger.error(f"更新批次状态失败: {e}")
+            raise
+
+    def insert_boards(self, batch_id: int, boards: List[Dict]):
+        """
+        批量插入板块数据
+
+        Args:
+            batch_id: 批次ID
+            boards: 板块数据列表 [{board_name, source_url, driving_event, stock_count}, ...]
+        """
+        if not boards:
+            return
+
+        try:
+            self.connection.executemany(
+                """
+                INSERT INTO `板块信息`
+                (`批次ID`, `板块名称`, `来源链接`, `驱动事件`, `成分股数量`)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (batch_id, b['board_name'], b.get('source_url'),
+                     b.get('driving_event'), b.get('stock_count'))
+                    for b in boards
+                ]
+            )
+            self._commit()
+            logger.info(f"✓ 插入 {len(boards)} 条板块数据")
+        except Exception as e:
+            logger.error(f"插入板块数据失败: {e}")
+            raise
+
+    def insert_stocks(self, batch_id: int, stocks: List[Dict], mode: str = None):
+        """
+        批量插入股票数据
+
+        Args:
+            batch_id: 批次ID
+            stocks: 股票数据列表 [{board_name, stock_code, stock_name, sequence_num}, ...]
+            mode: 与Database接口一致，SQLite始终使用预编译语句批量插入
+        """
+        self.insert_stock_rows(batch_id, [
+            (s['board_name'], s['stock_code'], s['stock_name'], s.get('sequence_num'))
+            for s in stocks
+        ], mode)
+
+    def insert_stock_rows(self, batch_id: int, stocks: List[tuple], mode: str = None):
+        """
+        批量插入股票数据（写入线程直接传元组，不构造字典）
+
+        Args:
+            batch_id: 批次ID
+            stocks: [(板块名称, 股票代码, 股票名称, 原始序号), ...]
+            mode: 与Database接口一致
+        """
+        if not stocks:
+            return
+
+        try:
+            self.connection.executemany(
+                """
+                INSERT INTO `成分股`
+                (`批次ID`, `板块名称`, `股票代码`, `股票名称`, `原始序号`)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(batch_id, name, code, stock_name, seq) for name, code, stock_name, seq in stocks]
+            )
+            self._commit()
+            logger.info(f"✓ 插入 {len(stocks)} 条股票数据")
+        except Exception as e:
+            logger.error(f"插入股票数据失败: {e}")
+            raise
+
+    def close_removed_boards(self, batch_id: int) -> int:
+        """与Database接口一致（SQLite只支持snapshot存储方式，无区间需要结束）"""
+        return 0
+
+    def validate_batch_integrity(self, batch_id: int) -> tuple[bool, str]:
+        """
+        验证批次数据完整性
+
+        检查项：
+        1. 板块-股票一致性：确保每个板块都有股票数据
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            (is_valid, error_message): 验证结果和错误信息
+        """
+        try:
+            orphan_boards = self.connection.execute(
+                """
+                SELECT b.`板块名称`
+                FROM `板块信息` b
+                LEFT JOIN `成分股` s
+                    ON s.`批次ID` = b.`批次ID` AND s.`板块名称` = b.`板块名称`
+                WHERE b.`批次ID` = ?
+                GROUP BY b.`板块名称`
+                HAVING COUNT(s.`记录ID`) = 0
+                """,
+                (batch_id,)
+            ).fetchall()
+
+            if orphan_boards:
+                board_names = [b['板块名称'] for b in orphan_boards]
+                error_msg = f"发现 {len(orphan_boards)} 个板块没有股票数据: {', '.join(board_names[:5])}"
+                if len(orphan_boards) > 5:
+                    error_msg += f" 等（共{len(orphan_boards)}个）"
+                logger.error(f"✗ 数据完整性校验失败: {error_msg}")
+                return (False, error_msg)
+
+            logger.info(f"✓ 批次 #{batch_id} 数据完整性校验通过")
+            return (True, None)
+
+        except Exception as e:
+            error_msg = f"数据完整性校验异常: {e}"
+            logger.error(error_msg)
+            return (False, error_msg)
+
+    def delete_batch_data(self, batch_id: int):
+        """
+        删除批次的所有数据（用于清理不完整数据）
+
+        Args:
+            batch_id: 批次ID
+        """
+        try:
+            # 外键级联删除会自动删除关联的板块信息和成分股
+            self.connection.execute("DELETE FROM `爬取记录` WHERE `批次ID` = ?", (batch_id,))
+            self.connection.commit()
+            logger.info(f"✓ 删除批次 #{batch_id} 的所有数据")
+        except Exception as e:
+            logger.error(f"删除批次数据失败: {e}")
+            raise
+
+    def discard_batch_data(self, batch_id: int):
+        """
+        清除被中断批次已写入的数据，保留批次记录（已完成的板块在抓取日志中，--resume时重新写入）
+
+        Args:
+            batch_id: 批次ID
+        """
+        try:
+            for table in ('板块信息', '成分股', '板块重叠'):
+                self.connection.execute(f"DELETE FROM `{table}` WHERE `批次ID` = ?", (batch_id,))
+            self.connection.commit()
+            logger.info(f"✓ 清除被中断批次 #{batch_id} 已写入的数据")
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"清除批次数据失败: {e}")
+            raise
+
+    def reopen_batch(self, batch_id: int) -> bool:
+        """
+        继续一个未完成的批次（--resume）：清除其已写入的板块信息/成分股，状态改回"进行中"
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            bool: False表示批次不存在、已成功或不是最新批次（不能继续）
+        """
+        try:
+            row = self.connection.execute(
+                "SELECT `执行状态` FROM `爬取记录` WHERE `批次ID` = ?", (batch_id,)).fetchone()
+            if row is None or row['执行状态'] == '成功' or batch_id != self.get_latest_batch_id():
+                return False
+
+            for table in ('板块信息', '成分股', '板块重叠'):
+                self.connection.execute(f"DELETE FROM `{table}` WHERE `批次ID` = ?", (batch_id,))
+            self.connection.execute(
+                "UPDATE `爬取记录` SET `执行状态` = '进行中', `结束时间` = NULL, `错误信息` = NULL WHERE `批次ID` = ?",
+                (batch_id,)
+            )
+            self.connection.commit()
+            logger.info(f"✓ 继续批次 #{batch_id} (类型: {self.board_type})")
+            return True
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"继续批次失败: {e}")
+            raise
+
+    def purge_batches(self, days: int) -> int:
+        """
+        删除抓取时间早于N天前的批次（保留最近一次成功批次，增量模式依赖它）
+
+        Args:
+            days: 保留天数
+
+        Returns:
+            删除的批次数
+        """
+        try:
+            keep = self.get_latest_success_batch_id()
+            rows = self.connection.execute(
+                "SELECT `批次ID` FROM `爬取记录` WHERE `抓取时间` < datetime('now', 'localtime', ?) ORDER BY `批次ID`",
+                (f'-{int(days)} days',)
+            ).fetchall()
+            batch_ids = [row['批次ID'] for row in rows if row['批次ID'] != keep]
+            if not batch_ids:
+                logger.info(f"✓ {self.database_name} 没有 {days} 天前的批次需要清理")
+                return 0
+
+            # 外键级联删除会自动删除关联的板块信息和成分股
+            self.connection.executemany(
+                "DELETE FROM `爬取记录` WHERE `批次ID` = ?", [(batch_id,) for batch_id in batch_ids])
+            self.connection.commit()
+            logger.info(f"✓ {self.database_name} 清理 {len(batch_ids)} 个 {days} 天前的批次"
+                        f"（#{batch_ids[0]} ~ #{batch_ids[-1]}）")
+            return len(batch_ids)
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"清理历史批次失败: {e}")
+            raise
+
+    def get_latest_batch_id(self) -> Optional[int]:
+        """获取最新的批次ID"""
+        try:
+            row = self.connection.execute("SELECT MAX(`批次ID`) AS max_id FROM `爬取记录`").fetchone()
+            return row['max_id'] if row and row['max_id'] else None
+        except Exception as e:
+            logger.error(f"获取最新批次ID失败: {e}")
+            return None
+
+    def get_last_request_rate(self) -> Optional[float]:
+        """获取最近一次成功批次收敛的请求速率"""
+        try:
+            row = self.connection.execute(
+                """
+                SELECT `请求速率` FROM `爬取记录`
+                WHERE `执行状态` = '成功' AND `请求速率` IS NOT NULL
+                ORDER BY `批次ID` DESC
+                LIMIT 1
+                """
+            ).fetchone()
+            return float(row['请求速率']) if row else None
+        except Exception as e:
+            logger.error(f"获取上次请求速率失败: {e}")
+            return None
+
+    def get_latest_success_batch_id(self) -> Optional[int]:
+        """获取最近一次成功批次的ID"""
+        try:
+            row = self.connection.execute(
+                "SELECT MAX(`批次ID`) AS max_id FROM `爬取记录` WHERE `执行状态` = '成功'"
+            ).fetchone()
+            return row['max_id'] if row and row['max_id'] else None
+        except Exception as e:
+            logger.error(f"获取最近成功批次ID失败: {e}")
+            return None
+
+    def get_batch_boards(self, batch_id: int) -> List[Dict]:
+        """
+        获取批次的板块信息
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            板块信息列表（板块名称、来源链接、驱动事件、成分股数量）
+        """
+        rows = self.connection.execute(
+            """
+            SELECT `板块名称`, `来源链接`, `驱动事件`, `成分股数量`
+            FROM `板块信息` WHERE `批次ID` = ?
+            """,
+            (batch_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_batch_stocks(self, batch_id: int) -> List[Dict]:
+        """
+        获取批次的成分股明细
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            成分股列表（板块名称、股票代码、股票名称、原始序号），按记录ID排序
+        """
+        rows = self.connection.execute(
+            """
+            SELECT `板块名称`, `股票代码`, `股票名称`, `原始序号`
+            FROM `成分股` WHERE `批次ID` = ?
+            ORDER BY `记录ID`
+            """,
+            (batch_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def replace_board_overlaps(self, batch_id: int, pairs: List[tuple]):
+        """
+        写入批次的板块重叠结果（先删除该批次已有的结果）
+
+        Args:
+            batch_id: 批次ID
+            pairs: [(板块名称, 相关板块, 共同成分股数, 相似度, 排名), ...]（analytics.OverlapPair）
+        """
+        try:
+            self.connection.execute("DELETE FROM `板块重叠` WHERE `批次ID` = ?", (batch_id,))
+            self.connection.executemany(
+                """
+                INSERT INTO `板块重叠`
+                (`批次ID`, `板块名称`, `相关板块`, `共同成分股数`, `相似度`, `排名`)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(batch_id, board, other, shared, jaccard, rank) for board, other, shared, jaccard, rank in pairs]
+            )
+            self._commit()
+            logger.info(f"✓ 批次 #{batch_id} 写入 {len(pairs)} 条板块重叠")
+        except Exception as e:
+            logger.error(f"写入板块重叠失败: {e}")
+            raise
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._held_lock:
+            held = list(self._held.values())
+            self._held.clear()
+        for connection in held:
+            connection.close()
+        logger.info(f"数据库连接已关闭: {self.database_name}")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML表格单遍解析模块
+用str.find在<tbody>范围内顺序扫描<tr>/<td>，只对需要的字段切片，
+替代原来 tbody/tr/link/date/total/code_name/seq 多个正则对同一段文本的反复扫描
+"""
+
+from typing import Iterator, NamedTuple, Optional
+
+
+class IndexRow(NamedTuple):
+    """列表页的一行（板块）"""
+    date: str     # 日期，缺失为'--'
+    name: str     # 板块名称
+    link: str     # 来源链接
+    event: str    # 驱动事件，缺失为'--'
+    count: str    # 成分股数量，缺失为'--'
+
+
+class CodeRow(NamedTuple):
+    """详情页的一行（成分股）"""
+    seq: str      # 原始序号
+    code: str     # 股票代码
+    name: str     # 股票名称
+
+
+def find_tbody(html: str) -> Optional[tuple[int, int]]:
+    """
+    定位第一个<tbody>的内容范围
+
+    Args:
+        html: 页面HTML
+
+    Returns:
+        (start, end) 内容起止下标，没有<tbody>时返回None
+    """
+    start = html.find('<tbody>')
+    if start < 0:
+        return None
+    start += len('<tbody>')
+    end = html.find('</tbody>', start)
+    if end < 0:
+        return None
+    return start, end
+
+
+def _iter_rows(html: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    """逐个给出[start, end)范围内<tr>的内容范围"""
+    pos = start
+    while True:
+        tr = html.find('<tr', pos, end)
+        if tr < 0:
+            return
+        gt = html.find('>', tr + 3, end)
+        if gt < 0:
+            return
+        close = html.find('</tr>', gt, end)
+        if close < 0:
+            return
+        # 跳过<track>等以<tr开头的其他标签
+        if gt == tr + 3 or html[tr + 3] in ' \t\r\n':
+            yield gt + 1, close
+        pos = close + len('</tr>')
+
+
+def _iter_cells(html: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    """逐个给出一行内<td>的内容范围"""
+    pos = start
+    while True:
+        td = html.find('<td', pos, end)
+        if td < 0:
+            return
+        gt = html.find('>', td + 3, end)
+        if gt < 0:
+            return
+        close = html.find('</td>', gt, end)
+        if close < 0:
+            return
+        yield gt + 1, close
+        pos = close + len('</td>')
+
+
+def _anchor(html: str, start: int, end: int) -> Optional[tuple[str, str]]:
+    """
+    提取单元格中第一个链接
+
+    Returns:
+        (href, 链接文字)，单元格不含链接时返回None
+    """
+    href = html.find('href="', start, end)
+    if href < 0:
+        return None
+    href += len('href="')
+    quote = html.find('"', href, end)
+    if quote < 0:
+        return None
+    gt = html.find('>', quote, end)
+    if gt < 0:
+        return None
+    close = html.find('</a>', gt, end)
+    if close < 0 or close == gt + 1:
+        return None
+    return html[href:quote], html[gt + 1:close]
+
+
+def _is_digits(text: str) -> bool:
+    """是否为非空的纯ASCII数字"""
+    return text.isascii() and text.isdigit()
+
+
+def _is_date(text: str) -> bool:
+    """是否为10位日期（YYYY-MM-DD）"""
+    return len(text) == 10 and text.isascii() and text.replace('-', '').isdigit()
+
+
+def iter_index_rows(html: str, start: int, end: int) -> Iterator[IndexRow]:
+    """
+    解析列表页表格
+
+    第一个链接为板块名称和来源链接；恰好两个链接时第二个为驱动事件；
+    恰好一个10位日期单元格为日期；恰好一个纯数字单元格为成分股数量
+
+    Args:
+        html: 页面HTML
+        start: <tbody>内容起始下标
+        end: <tbody>内容结束下标
+
+    Yields:
+        IndexRow
+    """
+    for row_start, row_end in _iter_rows(html, start, end):
+        # 没有链接的行直接跳过，不切片
+        if html.find('href="', row_start, row_end) < 0:
+            continue
+
+        anchors = []
+        date = None
+        dates = 0
+        count = None
+        counts = 0
+        for cell_start, cell_end in _iter_cells(html, row_start, row_end):
+            if html.find('href="', cell_start, cell_end) >= 0:
+                anchor = _anchor(html, cell_start, cell_end)
+                if anchor is not None:
+                    anchors.append(anchor)
+                continue
+            # 链接以外的单元格都很短，只有这里切片
+            text = html[cell_start:cell_end]
+            if _is_date(text):
+                dates += 1
+                date = text
+            elif _is_digits(text):
+                counts += 1
+                count = text
+
+        if not anchors:
+            continue
+        link, name = anchors[0]
+        yield IndexRow(
+            date if dates == 1 else '--',
+            name,
+            link,
+            anchors[1][1] if len(anchors) == 2 else '--',
+            count if counts == 1 else '--'
+        )
+
+
+def iter_code_rows(html: str, start: int, end: int) -> Iterator[CodeRow]:
+    """
+    解析成分股详情页表格
+
+    序号为链接之前的第一个纯数字单元格，前两个链接的文字分别为股票代码和名称
+
+    Args:
+        html: 页面HTML
+        start: <tbody>内容起始下标
+        end: <tbody>内容结束下标
+
+    Yields:
+        CodeRow
+    """
+    for row_start, row_end in _iter_rows(html, start, end):
+        if html.find('href="', row_start, row_end) < 0:
+            continue
+
+        seq = None
+        texts = []
+        for cell_start, cell_end in _iter_cells(html, row_start, row_end):
+            if html.find('href="', cell_start, cell_end) >= 0:
+                if seq is None:
+                    break
+                anchor = _anchor(html, cell_start, cell_end)
+                if anchor is not None:
+                    texts.append(anchor[1])
+                    if len(texts) == 2:
+                        break
+            elif seq is None and cell_end - cell_start <= 10:
+                text = html[cell_start:cell_end]
+                if _is_digits(text):
+                    seq = text
+
+        if len(texts) == 2:
+            yield CodeRow(seq, texts[0], texts[1])
+
+
+def parse_index_rows(html: str) -> Optional[list[IndexRow]]:
+    """
+    解析列表页
+
+    Args:
+        html: 列表页HTML
+
+    Returns:
+        板块行列表，页面不含<tbody>（未正常返回）时返回None
+    """
+    bounds = find_tbody(html)
+    if bounds is None:
+        return None
+    return list(iter_index_rows(html, *bounds))
+
+
+def parse_code_rows(html: str) -> list[CodeRow]:
+    """
+    解析成分股详情页
+
+    Args:
+        html: 详情页HTML
+
+    Returns:
+        成分股行列表，页面不含<tbody>时为空
+    """
+    bounds = find_tbody(html)
+    if bounds is None:
+        return []
+    return list(iter_code_rows(html, *bounds))
+
+
+def page_count(html: str) -> Optional[int]:
+    """
+    读取分页信息 <span class="page_info">当前页/总页数</span>
+
+    Args:
+        html: 页面HTML
+
+    Returns:
+        总页数，页面没有分页信息时返回None
+    """
+    info = html.find('page_info')
+    if info < 0:
+        return None
+    slash = html.find('/', info)
+    if slash < 0:
+        return None
+    lt = html.find('<', slash)
+    if lt < 0 or not _is_digits(html[slash + 1:lt]):
+        return None
+    return int(html[slash + 1:lt])
@@ -0,0 +1,110 @@
+-- ============================================
+-- 10jqka板块爬虫数据库升级脚本
+-- 说明: 已用 init_databases.sql 初始化的数据库执行本脚本补齐新增字段
+-- 用法: mysql -u root -p < upgrade_databases.sql
+-- ============================================
+
+-- --------------------------------------------
+-- 爬取记录.请求速率（自适应速率控制）
+-- --------------------------------------------
+ALTER TABLE `同花顺行业板块`.`爬取记录`
+  ADD COLUMN `请求速率` DECIMAL(10,3) DEFAULT NULL COMMENT '本次抓取收敛的请求速率（次/秒）' AFTER `爬取耗时秒数`;
+
+ALTER TABLE `概念板块`.`爬取记录`
+  ADD COLUMN `请求速率` DECIMAL(10,3) DEFAULT NULL COMMENT '本次抓取收敛的请求速率（次/秒）' AFTER `爬取耗时秒数`;
+
+ALTER TABLE `地域板块`.`爬取记录`
+  ADD COLUMN `请求速率` DECIMAL(10,3) DEFAULT NULL COMMENT '本次抓取收敛的请求速率（次/秒）' AFTER `爬取耗时秒数`;
+
+-- --------------------------------------------
+-- 成分股区间（成员区间存储方式）
+-- --------------------------------------------
+USE `同花顺行业板块`;
+CREATE TABLE IF NOT EXISTS `成分股区间` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '所属板块名称',
+  `股票代码` VARCHAR(10) NOT NULL COMMENT '股票代码（如600000）',
+  `股票名称` VARCHAR(100) NOT NULL COMMENT '股票名称（如浦发银行）',
+  `原始序号` INT DEFAULT NULL COMMENT '区间开始时在10jqka页面的原始排序',
+  `起始批次ID` INT NOT NULL COMMENT '首次出现的批次ID（含）',
+  `截止批次ID` INT DEFAULT NULL COMMENT '不再出现的批次ID（不含），NULL表示仍有效',
+  INDEX `idx_区间` (`起始批次ID`, `截止批次ID`),
+  INDEX `idx_有效板块` (`截止批次ID`, `板块名称`),
+  INDEX `idx_股票代码` (`股票代码`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股区间表（只记录成员变化）';
+
+USE `概念板块`;
+CREATE TABLE IF NOT EXISTS `成分股区间` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '所属板块名称',
+  `股票代码` VARCHAR(10) NOT NULL COMMENT '股票代码（如600000）',
+  `股票名称` VARCHAR(100) NOT NULL COMMENT '股票名称（如浦发银行）',
+  `原始序号` INT DEFAULT NULL COMMENT '区间开始时在10jqka页面的原始排序',
+  `起始批次ID` INT NOT NULL COMMENT '首次出现的批次ID（含）',
+  `截止批次ID` INT DEFAULT NULL COMMENT '不再出现的批次ID（不含），NULL表示仍有效',
+  INDEX `idx_区间` (`起始批次ID`, `截止批次ID`),
+  INDEX `idx_有效板块` (`截止批次ID`, `板块名称`),
+  INDEX `idx_股票代码` (`股票代码`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股区间表（只记录成员变化）';
+
+USE `地域板块`;
+CREATE TABLE IF NOT EXISTS `成分股区间` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '所属板块名称',
+  `股票代码` VARCHAR(10) NOT NULL COMMENT '股票代码（如600000）',
+  `股票名称` VARCHAR(100) NOT NULL COMMENT '股票名称（如浦发银行）',
+  `原始序号` INT DEFAULT NULL COMMENT '区间开始时在10jqka页面的原始排序',
+  `起始批次ID` INT NOT NULL COMMENT '首次出现的批次ID（含）',
+  `截止批次ID` INT DEFAULT NULL COMMENT '不再出现的批次ID（不含），NULL表示仍有效',
+  INDEX `idx_区间` (`起始批次ID`, `截止批次ID`),
+  INDEX `idx_有效板块` (`截止批次ID`, `板块名称`),
+  INDEX `idx_股票代码` (`股票代码`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股区间表（只记录成员变化）';
+
+-- --------------------------------------------
+-- 板块重叠（analytics.py）
+-- --------------------------------------------
+USE `同花顺行业板块`;
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `批次ID` INT NOT NULL COMMENT '关联的批次ID',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '板块名称',
+  `相关板块` VARCHAR(100) NOT NULL COMMENT '有共同成分股的板块名称',
+  `共同成分股数` INT NOT NULL COMMENT '两个板块共同的成分股数',
+  `相似度` DECIMAL(7,6) NOT NULL COMMENT 'Jaccard相似度（共同成分股数/两板块成分股并集）',
+  `排名` SMALLINT NOT NULL COMMENT '在该板块的相关板块中的排名（从1开始）',
+  FOREIGN KEY (`批次ID`) REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  INDEX `idx_批次板块` (`批次ID`, `板块名称`, `排名`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股重叠表';
+
+USE `概念板块`;
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `批次ID` INT NOT NULL COMMENT '关联的批次ID',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '板块名称',
+  `相关板块` VARCHAR(100) NOT NULL COMMENT '有共同成分股的板块名称',
+  `共同成分股数` INT NOT NULL COMMENT '两个板块共同的成分股数',
+  `相似度` DECIMAL(7,6) NOT NULL COMMENT 'Jaccard相似度（共同成分股数/两板块成分股并集）',
+  `排名` SMALLINT NOT NULL COMMENT '在该板块的相关板块中的排名（从1开始）',
+  FOREIGN KEY (`批次ID`) REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  INDEX `idx_批次板块` (`批次ID`, `板块名称`, `排名`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股重叠表';
+
+USE `地域板块`;
+CREATE TABLE IF NOT EXISTS `板块重叠` (
+  `记录ID` BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录唯一标识（自增）',
+  `批次ID` INT NOT NULL COMMENT '关联的批次ID',
+  `板块名称` VARCHAR(100) NOT NULL COMMENT '板块名称',
+  `相关板块` VARCHAR(100) NOT NULL COMMENT '有共同成分股的板块名称',
+  `共同成分股数` INT NOT NULL COMMENT '两个板块共同的成分股数',
+  `相似度` DECIMAL(7,6) NOT NULL COMMENT 'Jaccard相似度（共同成分股数/两板块成分股并集）',
+  `排名` SMALLINT NOT NULL COMMENT '在该板块的相关板块中的排名（从1开始）',
+  FOREIGN KEY (`批次ID`) REFERENCES `爬取记录`(`批次ID`) ON DELETE CASCADE,
+  INDEX `idx_批次板块` (`批次ID`, `板块名称`, `排名`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='板块成分股重叠表';
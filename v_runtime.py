@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+v参数（反爬虫签名）JS运行时模块
+常驻Node进程只加载一次v_new.js，通过管道逐行返回get_v()结果；
+多个进程组成池，供多线程并发调用。
+VTokenPool在后台预先生成v值，请求路径直接取用
+"""
+
+import json
+import logging
+import shutil
+import subprocess
+from collections import deque
+from queue import Queue, Empty
+from threading import Lock, Condition, Thread
+from time import monotonic
+from typing import Optional
+
+import execjs
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Node常驻进程引导脚本：加载v_new.js（屏蔽其末尾的console.log），之后每读到一行输出一个v
+NODE_BOOTSTRAP = r'''
+const fs = require('fs'), vm = require('vm'), readline = require('readline');
+const log = console.log;
+console.log = function () {};
+vm.runInThisContext(fs.readFileSync(process.argv[1], 'utf8'), { filename: 'v_new.js' });
+console.log = log;
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', () => {
+    let out;
+    try { out = { v: get_v() }; } catch (e) { out = { error: String(e) }; }
+    process.stdout.write(JSON.stringify(out) + '\n');
+});
+'''
+
+DEFAULT_V_WORKERS = 4
+DEFAULT_V_POOL_SIZE = 64
+DEFAULT_V_MAX_AGE = 10
+CALL_TIMEOUT = 10
+
+
+class NodeVWorker:
+    """单个常驻Node进程（输出由后台线程逐行读取，调用方带超时等待）"""
+
+    def __init__(self, js_path: str, node_binary: str = 'node', timeout: float = CALL_TIMEOUT):
+        """
+        启动Node进程并加载v_new.js
+
+        Args:
+            js_path: v_new.js路径
+            node_binary: node可执行文件
+            timeout: 等待一个v值的最长秒数，超时后重启进程
+        """
+        self.js_path = js_path
+        self.node_binary = node_binary
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._lines: Queue = Queue()
+        self._lock = Lock()
+        self._start()
+
+    def _start(self):
+        """启动进程和读取其输出的线程（每个进程一个新队列，旧进程迟到的输出不会被读到）"""
+        self.process = subprocess.Popen(
+            [self.node_binary, '-e', NODE_BOOTSTRAP, self.js_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        )
+        self._lines = Queue()
+        Thread(target=self._read_loop, args=(self.process.stdout, self._lines),
+               name='node-v-reader', daemon=True).start()
+
+    @staticmethod
+    def _read_loop(stdout, lines: Queue):
+        """逐行读取进程输出，进程退出时放入空行"""
+        try:
+            for line in iter(stdout.readline, ''):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put('')
+
+    def is_alive(self) -> bool:
+        """检查进程是否存活"""
+        return self.process is not None and self.process.poll() is None
+
+    def get_v(self) -> str:
+        """
+        请求一个v值
+
+        Returns:
+            v参数字符串
+        """
+        with self._lock:
+            if not self.is_alive():
+                logger.warning("Node进程已退出，正在重启...")
+                self._start()
+            self.process.stdin.write('\n')
+            self.process.stdin.flush()
+            try:
+                line = self._lines.get(timeout=self.timeout)
+            except Empty:
+                # 进程卡住：结束并重启，不让该进程的其他调用方（含VTokenPool后台线程）一直等待
+                logger.warning(f"Node进程 {self.timeout:g} 秒内无响应，正在重启...")
+                self.close()
+                self._start()
+                raise RuntimeError("Node进程响应超时")
+
+        if not line:
+            raise RuntimeError("Node进程无响应")
+        result = json.loads(line)
+        if 'error' in result:
+            raise RuntimeError(f"get_v执行失败: {result['error']}")
+        return result['v']
+
+    def close(self):
+        """终止进程"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.terminate()
+            self.process.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        except Exception as e:
+            logger.warning(f"终止Node进程时出错: {e}")
+        finally:
+            self.process = None
+
+
+class NodeVRuntime:
+    """常驻Node进程池（线程安全）"""
+
+    def __init__(self, js_path: str, size: int = DEFAULT_V_WORKERS, node_binary: str = 'node'):
+        """
+        Args:
+            js_path: v_new.js路径
+            size: Node进程数
+            node_binary: node可执行文件
+        """
+        if size < 1:
+            raise ValueError(f"Node进程数必须大于0: {size}")
+
+        self.size = size
+        self._idle: Queue = Queue()
+        self._workers = [NodeVWorker(js_path, node_binary) for _ in range(size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+        # 预热并验证脚本可以正常执行
+        self.get_v()
+        logger.info(f"✓ v参数运行时已启动: {size} 个常驻Node进程")
+
+    def get_v(self) -> str:
+        """从空闲进程获取一个v值"""
+        try:
+            worker = self._idle.get(timeout=CALL_TIMEOUT)
+        except Empty:
+            raise RuntimeError("等待空闲Node进程超时")
+        try:
+            return worker.get_v()
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        """终止所有Node进程"""
+        for worker in self._workers:
+            worker.close()
+
+
+class ExecJSVRuntime:
+    """原execjs调用方式（无node时的后备，每次调用启动一个外部进程）"""
+
+    size = 1
+
+    def __init__(self, js_path: str):
+        """
+        Args:
+            js_path: v_new.js路径
+        """
+        with open(js_path, 'r') as f:
+            self.js_ctx = execjs.compile(f.read())
+
+    def get_v(self) -> str:
+        """生成一个v值"""
+        return self.js_ctx.call('get_v')  # type: ignore
+
+    def close(self):
+        """无常驻资源"""
+
+
+class VTokenPool:
+    """预生成v值的环形缓冲区（后台线程补充，超过最大存活时间的值丢弃）"""
+
+    def __init__(self, runtime, capacity: int = DEFAULT_V_POOL_SIZE, max_age: float = DEFAULT_V_MAX_AGE):
+        """
+        启动后台生成线程
+
+        Args:
+            runtime: v参数运行时（NodeVRuntime/ExecJSVRuntime）
+            capacity: 缓冲区容量
+            max_age: v值最大存活时间（秒）
+        """
+        if capacity < 1:
+            raise ValueError(f"v值池容量必须大于0: {capacity}")
+
+        self.runtime = runtime
+        self.capacity = capacity
+        self.max_age = max_age
+        self._tokens: deque = deque(maxlen=capacity)  # (生成时间, v值)
+        self._cond = Condition()
+        self._closed = False
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._age_total = 0.0
+        self._age_max = 0.0
+
+        self._producer = Thread(target=self._produce_loop, name='v-token-producer', daemon=True)
+        self._producer.start()
+
+    def _purge_expired(self, now: float):
+        """丢弃过期的v值（调用方持有锁）"""
+        while self._tokens and now - self._tokens[0][0] > self.max_age:
+            self._tokens.popleft()
+            self.expired += 1
+
+    def _produce_loop(self):
+        """后台生成循环：缓冲区不满时持续补充"""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    self._purge_expired(monotonic())
+                    if len(self._tokens) < self.capacity:
+                        break
+                    # 已满：等到最旧的值过期或被取走
+                    wait = self.max_age - (monotonic() - self._tokens[0][0])
+                    self._cond.wait(timeout=max(wait, 0.01))
+                if self._closed:
+                    return
+
+            try:
+                token = self.runtime.get_v()
+            except Exception as e:
+                logger.warning(f"预生成v值失败: {e}")
+                with self._cond:
+                    self._cond.wait(timeout=1)
+                continue
+
+            with self._cond:
+                self._tokens.append((monotonic(), token))
+
+    def get(self, generate: bool = True) -> Optional[str]:
+        """
+        取出一个未过期的v值，池中无可用值时同步生成
+
+        Args:
+            generate: 为False时池中无可用值直接返回None（不计入未命中，供协程调用方改在线程中调用get()）
+
+        Returns:
+            v参数字符串，generate为False且池为空时为None
+        """
+        with self._cond:
+            now = monotonic()
+            self._purge_expired(now)
+            if self._tokens:
+                created, token = self._tokens.popleft()
+                age = now - created
+                self.hits += 1
+                self._age_total += age
+                self._age_max = max(self._age_max, age)
+                self._cond.notify_all()
+                return token
+            if not generate:
+                return None
+            self.misses += 1
+            self._cond.notify_all()
+
+        return self.runtime.get_v()
+
+    def stats(self) -> dict:
+        """
+        获取v值池统计
+
+        Returns:
+            dict: size, capacity, hits, misses, expired, hit_rate, avg_age, max_age_at_use
+        """
+        with self._cond:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._tokens),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': self.hits / total if total else 0.0,
+                'avg_age': self._age_total / self.hits if self.hits else 0.0,
+                'max_age_at_use': self._age_max
+            }
+
+    def close(self):
+        """停止后台生成线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._producer.join(timeout=CALL_TIMEOUT)
+
+
+def create_v_runtime(js_path: str, size: int = DEFAULT_V_WORKERS):
+    """
+    创建v参数运行时，优先使用常驻Node进程池
+
+    Args:
+        js_path: v_new.js路径
+        size: Node进程数
+
+    Returns:
+        NodeVRuntime或ExecJSVRuntime
+    """
+    node_binary = shutil.which('node') or shutil.which('nodejs')
+    if node_binary:
+        try:
+            return NodeVRuntime(js_path, size, node_binary)
+        except Exception as e:
+            logger.warning(f"常驻Node进程启动失败，回退到execjs: {e}")
+    else:
+        logger.warning("未找到node，回退到execjs（每次调用启动新进程）")
+    return ExecJSVRuntime(js_path)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻工作线程池模块
+工作线程在整个爬取过程中保持运行，从任务队列取任务，任一任务完成后立即补位；
+GroupScheduler 让多组任务（各板块类型）轮流使用同一个线程池
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Thread, Lock, Condition, Event
+from time import time
+from typing import Callable, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """常驻工作线程池（任务队列 + Future）"""
+
+    def __init__(self, size: int, name: str = 'worker'):
+        """
+        初始化并启动工作线程
+
+        Args:
+            size: 工作线程数
+            name: 线程名前缀
+        """
+        if size < 1:
+            raise ValueError(f"工作线程数必须大于0: {size}")
+
+        self.size = size
+        self.name = name
+        self._tasks: Queue = Queue()
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+        self._closed = False
+
+        # 统计信息
+        self._pending = 0          # 已提交未完成的任务数（含排队和执行中）
+        self._busy = 0             # 正在执行任务的线程数
+        self._completed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+        self._peak_queue_depth = 0
+        self._stats_since = time()
+
+        self._threads: list[Thread] = []
+        for i in range(size):
+            thread = Thread(target=self._worker_loop, name=f'{name}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.debug(f"工作线程池已启动: {size} 个线程")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        提交任务到队列
+
+        Args:
+            fn: 要执行的函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            Future: 任务结果
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("工作线程池已关闭")
+            self._pending += 1
+            self._tasks.put((future, fn, args, kwargs))
+            self._peak_queue_depth = max(self._peak_queue_depth, self._tasks.qsize())
+        return future
+
+    def _worker_loop(self):
+        """工作线程主循环"""
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                self._finish(None, failed=False)
+                continue
+
+            with self._lock:
+                self._busy += 1
+            started = time()
+            failed = False
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                failed = True
+                future.set_exception(e)
+            finally:
+                self._finish(time() - started, failed)
+
+    def _finish(self, busy_seconds: Optional[float], failed: bool):
+        """记录任务完成并唤醒join()（busy_seconds为None表示任务未执行）"""
+        with self._lock:
+            if busy_seconds is not None:
+                self._busy -= 1
+                self._busy_seconds += busy_seconds
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def join(self, stop_event: Optional[Event] = None, poll: float = 0.1) -> bool:
+        """
+        等待所有已提交任务完成（包括任务执行中再提交的任务）
+
+        Args:
+            stop_event: 停止标志，被设置时立即返回
+            poll: 检查停止标志的间隔（秒）
+
+        Returns:
+            bool: True表示全部完成，False表示被stop_event中断
+        """
+        with self._lock:
+            while self._pending > 0:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                self._idle.wait(timeout=poll)
+        return True
+
+    def queue_depth(self) -> int:
+        """排队等待执行的任务数"""
+        return self._tasks.qsize()
+
+    def stats(self) -> dict:
+        """
+        获取线程池运行统计
+
+        Returns:
+            dict: workers, busy, queue_depth, peak_queue_depth, pending,
+                  completed, failed, utilisation
+        """
+        with self._lock:
+            elapsed = max(time() - self._stats_since, 1e-9)
+            return {
+                'workers': self.size,
+                'busy': self._busy,
+                'queue_depth': self._tasks.qsize(),
+                'peak_queue_depth': self._peak_queue_depth,
+                'pending': self._pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'utilisation': min(1.0, self._busy_seconds / (self.size * elapsed))
+            }
+
+    def reset_stats(self):
+        """重置累计统计（按阶段统计利用率时使用）"""
+        with self._lock:
+            self._completed = 0
+            self._failed = 0
+            self._busy_seconds = 0.0
+            self._peak_queue_depth = self._tasks.qsize()
+            self._stats_since = time()
+
+    def shutdown(self, wait: bool = True):
+        """
+        关闭线程池，取消尚未开始的任务
+
+        Args:
+            wait: 是否等待工作线程退出
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        while True:
+            try:
+                item = self._tasks.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+                self._finish(None, failed=False)
+
+        for _ in self._threads:
+            self._tasks.put(None)
+
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout=2)
+
+        logger.debug("工作线程池已关闭")
+
+
+class GroupScheduler:
+    """
+    多组任务共用一个WorkerPool
+
+    各组任务分别排队，按组轮流交给线程池，线程池中的在途任务不超过window个，
+    一组排队的大量任务不会挡住其他组；某组已提交的任务（含执行中再提交的任务）全部完成后，
+    该组出现在 wait() 的返回值中
+    """
+
+    def __init__(self, pool: WorkerPool, window: Optional[int] = None):
+        """
+        Args:
+            pool: 工作线程池
+            window: 同时交给线程池的任务数上限，默认为线程数的2倍
+        """
+        self.pool = pool
+        self.window = window or pool.size * 2
+        self._lock = Lock()
+        self._queues: dict = {}          # 组 -> deque[(fn, args)]
+        self._pending: dict = {}         # 组 -> 已提交未完成的任务数
+        self._turns: deque = deque()     # 有排队任务的组（轮转顺序）
+        self._in_flight = 0
+        self._drained: Queue = Queue()   # 任务全部完成的组
+        self._cancelled: set = set()     # 已取消的组（新提交的任务被忽略）
+        self._idle = Condition(self._lock)
+
+    def submit(self, group, fn: Callable, *args, urgent: bool = False) -> None:
+        """
+        提交一个任务
+
+        Args:
+            group: 任务所属的组（可哈希对象）
+            fn: 要执行的函数
+            *args: 函数参数
+            urgent: 排到本组队首（如已开始板块的剩余页，尽快完成以释放内存）
+        """
+        self.submit_many(group, fn, [args], urgent)
+
+    def submit_many(self, group, fn: Callable, args_list: list, urgent: bool = False) -> None:
+        """
+        一次提交一组任务（全部入队后才开始计数完成，不会在提交途中被判定为已完成）
+
+        Args:
+            group: 任务所属的组
+            fn: 要执行的函数
+            args_list: 每个任务的参数元组
+            urgent: 排到本组队首
+        """
+        tasks = [(fn, tuple(args)) for args in args_list]
+        with self._lock:
+            if group in self._cancelled:
+                return
+            if not tasks:
+                if not self._pending.get(group):
+                    self._drained.put(group)
+                return
+            queue = self._queues.setdefault(group, deque())
+            if not queue:
+                self._turns.append(group)
+            if urgent:
+                queue.extendleft(reversed(tasks))
+            else:
+                queue.extend(tasks)
+            self._pending[group] = self._pending.get(group, 0) + len(tasks)
+            ready = self._take()
+        self._dispatch(ready)
+
+    def _take(self) -> list:
+        """按组轮流取出任务，直到在途任务达到window（调用方持有_lock）"""
+        ready = []
+        while self._turns and self._in_flight < self.window:
+            group = self._turns.popleft()
+            queue = self._queues[group]
+            fn, args = queue.popleft()
+            if queue:
+                self._turns.append(group)
+            self._in_flight += 1
+            ready.append((group, fn, args))
+        return ready
+
+    def _dispatch(self, ready: list) -> None:
+        for group, fn, args in ready:
+            self.pool.submit(self._run, group, fn, args)
+
+    def _run(self, group, fn: Callable, args: tuple) -> None:
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error(f"任务异常: {e}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._pending[group] -= 1
+                if self._pending[group] == 0:
+                    if group in self._cancelled:
+                        self._idle.notify_all()
+                    else:
+                        self._drained.put(group)
+                ready = self._take()
+            self._dispatch(ready)
+
+    def cancel(self, group, timeout: Optional[float] = None) -> bool:
+        """
+        取消一组任务：丢弃排队的任务，忽略之后提交的任务，并等待已交给线程池的任务执行完
+
+        用于中断时先让该组停止写入，再关闭其写入器/日志；取消的组不会出现在 wait() 的返回值中
+
+        Args:
+            group: 任务所属的组
+            timeout: 最长等待秒数，默认一直等待
+
+        Returns:
+            bool: 该组的任务是否已全部结束（超时返回False）
+        """
+        with self._idle:
+            self._cancelled.add(group)
+            queue = self._queues.pop(group, None)
+            if queue:
+                self._pending[group] -= len(queue)
+                self._turns.remove(group)
+            done = self._idle.wait_for(lambda: not self._pending.get(group), timeout)
+            if done:
+                self._pending.pop(group, None)
+                self._cancelled.discard(group)
+            return done
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        等待某一组的任务全部完成
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            完成的组，超时返回None
+        """
+        try:
+            return self._drained.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def queue_depth(self, group=None) -> int:
+        """排队（尚未交给线程池）的任务数，指定group时只统计该组"""
+        with self._lock:
+            if group is not None:
+                return len(self._queues.get(group, ()))
+            return sum(len(queue) for queue in self._queues.values())